@@ -0,0 +1,21 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "003_add_last_accessed_at"
+down_revision: Union[str, None] = "002_add_blob_data"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "blob_metadata",
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("blob_metadata", "last_accessed_at")
@@ -0,0 +1,21 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "004_add_blob_checksum"
+down_revision: Union[str, None] = "003_add_last_accessed_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "blob_metadata",
+        sa.Column("checksum", sa.String(64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("blob_metadata", "checksum")
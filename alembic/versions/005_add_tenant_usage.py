@@ -0,0 +1,36 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "005_add_tenant_usage"
+down_revision: Union[str, None] = "004_add_blob_checksum"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "blob_metadata",
+        sa.Column("tenant_id", sa.String(63), nullable=False, server_default="default"),
+    )
+    op.create_index("ix_blob_metadata_tenant_id", "blob_metadata", ["tenant_id"])
+    op.create_table(
+        "tenant_usage",
+        sa.Column("tenant_id", sa.String(length=63), nullable=False),
+        sa.Column("bytes_used", sa.BigInteger(), nullable=False),
+        sa.Column("blob_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("tenant_id"),
+    )
+    op.execute(
+        "INSERT INTO tenant_usage (tenant_id, bytes_used, blob_count, updated_at) "
+        "SELECT tenant_id, SUM(size), COUNT(*), CURRENT_TIMESTAMP FROM blob_metadata GROUP BY tenant_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tenant_usage")
+    op.drop_index("ix_blob_metadata_tenant_id", table_name="blob_metadata")
+    op.drop_column("blob_metadata", "tenant_id")
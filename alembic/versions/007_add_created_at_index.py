@@ -0,0 +1,17 @@
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "007_add_created_at_index"
+down_revision: Union[str, None] = "006_add_upload_sessions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_blob_metadata_created_at", "blob_metadata", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_blob_metadata_created_at", table_name="blob_metadata")
@@ -0,0 +1,48 @@
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "010_backfill_local_storage_path"
+down_revision: Union[str, None] = "009_add_inline_data"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Older rows of the local backend recorded the blob ID as storage_path, but the
+# file was written under the sanitized ID. The reconciler matches files by the
+# recorded key, so those rows must record the file name they were written to.
+_UNSAFE = re.compile(r"[^a-zA-Z0-9._-]")
+
+blob_metadata = sa.table(
+    "blob_metadata",
+    sa.column("id", sa.String),
+    sa.column("storage_backend", sa.String),
+    sa.column("storage_path", sa.String),
+)
+
+
+def _legacy_key(blob_id: str) -> str:
+    return _UNSAFE.sub("_", blob_id).replace("..", "_")
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(blob_metadata.c.id).where(
+            blob_metadata.c.storage_backend == "local",
+            blob_metadata.c.storage_path == blob_metadata.c.id,
+        )
+    ).scalars().all()
+    for blob_id in rows:
+        key = _legacy_key(blob_id)
+        if key != blob_id:
+            connection.execute(
+                blob_metadata.update().where(blob_metadata.c.id == blob_id).values(storage_path=key)
+            )
+
+
+def downgrade() -> None:
+    # Recording the file name is correct for every schema version.
+    pass
@@ -0,0 +1,21 @@
+"""Debug routes, mounted only when profiling is enabled."""
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import PlainTextResponse
+
+from app.dependencies import require_scope
+from app.utils.profiler import profiler
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_scope("admin"))])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(route: str | None = None, operation: str | None = None):
+    """Collapsed stacks of profiled requests, filtered by route template and operation prefix."""
+    return PlainTextResponse(profiler.collapsed(route, operation))
+
+
+@router.delete("/profile", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_profile():
+    """Discard collected samples."""
+    profiler.reset()
@@ -1,29 +1,62 @@
 """API v1 routes."""
 
-import base64
+from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.schemas import BlobCreateRequest, BlobResponse
+from app.api.v1.schemas import (
+    BlobCreateRequest,
+    BlobInfoResponse,
+    BlobResponse,
+    ImportResponse,
+    PresignedUrlResponse,
+    UploadCreateRequest,
+    UploadSessionResponse,
+    UploadUrlRequest,
+    UsageResponse,
+)
 from app.database import get_db
+from app.models.tenant_usage import TenantUsage
+from app.services.archive import ArchiveService
 from app.services.blob_service import BlobService
+from app.config import settings
+from app.services.uploads import UploadService, part_count, received_ranges
+from app.services.usage import tenant_quota
 from app.storage import get_storage_backend
-from app.dependencies import verify_token
-from app.utils.base64_validator import decode_base64
+from app.dependencies import admit_request, require_scope
+from app.utils.admission import AdmissionTicket
+from app.utils.auth import Principal
+from app.utils.base64_validator import encode_base64_stream
 from app.utils.exceptions import BlobAlreadyExistsError, BlobNotFoundError, InvalidBase64Error
+from app.utils.offload import offloader
+from app.utils.tracing import stage
 
-router = APIRouter(prefix="/v1", tags=["blobs"], dependencies=[Depends(verify_token)])
+router = APIRouter(prefix="/v1", tags=["blobs"], dependencies=[Depends(admit_request)])
+
+
+def _etag(checksum: str | None) -> str | None:
+    return f'"{checksum}"' if checksum else None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
 
 
 @router.post("/blobs", response_model=BlobResponse, status_code=status.HTTP_201_CREATED)
 async def create_blob(
     request: BlobCreateRequest,
+    response: Response,
+    principal: Principal = Depends(require_scope("blobs:write")),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new blob."""
     try:
-        data = decode_base64(request.data)
+        with stage("base64_decode"):
+            data = await offloader.b64decode(request.data)
     except InvalidBase64Error as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,11 +66,13 @@ async def create_blob(
     try:
         storage_backend = await get_storage_backend(db)
         blob_service = BlobService(storage_backend, db)
-        metadata = await blob_service.create_blob(request.id, data)
+        metadata = await blob_service.create_blob(principal.namespace(request.id), data, principal.tenant)
+        response.headers["ETag"] = _etag(metadata.checksum)
 
-        encoded_data = base64.b64encode(data).decode("utf-8")
+        with stage("base64_encode"):
+            encoded_data = await offloader.b64encode(data)
         return BlobResponse(
-            id=metadata.id,
+            id=request.id,
             data=encoded_data,
             size=metadata.size,
             created_at=metadata.created_at,
@@ -49,20 +84,73 @@ async def create_blob(
         )
 
 
+async def _stream_blob_response(
+    blob_service: BlobService, blob_id: str, metadata, etag: str | None, ticket: AdmissionTicket
+) -> StreamingResponse:
+    """The ``BlobResponse`` document, byte for byte, with the data streamed and encoded chunk by chunk."""
+    ticket.reserve(settings.stream_chunk_size)
+    chunks = blob_service.stream_blob(metadata.id, metadata, settings.stream_chunk_size)
+    # Read the first chunk before answering, so a missing object is still a 404.
+    first = await anext(chunks)
+
+    envelope = JSONResponse(jsonable_encoder(BlobResponse(
+        id=blob_id,
+        data="",
+        size=metadata.size,
+        created_at=metadata.created_at,
+    ))).body
+    # Base64 needs no JSON escaping, so the encoded data goes straight between the quotes.
+    split = envelope.index(b'"data":""') + len(b'"data":"')
+
+    async def data():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    async def body():
+        try:
+            yield envelope[:split]
+            async for encoded in encode_base64_stream(data()):
+                yield encoded
+            yield envelope[split:]
+        finally:
+            await chunks.aclose()
+
+    headers = {"Content-Length": str(len(envelope) + 4 * -(-metadata.size // 3))}
+    if etag is not None:
+        headers["ETag"] = etag
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
 @router.get("/blobs/{blob_id}", response_model=BlobResponse)
 async def get_blob(
     blob_id: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    ticket: AdmissionTicket = Depends(admit_request),
+    principal: Principal = Depends(require_scope("blobs:read")),
     db: AsyncSession = Depends(get_db),
 ):
     """Retrieve a blob by ID."""
     try:
         storage_backend = await get_storage_backend(db)
         blob_service = BlobService(storage_backend, db)
-        data, metadata = await blob_service.get_blob(blob_id)
+        metadata = await blob_service.get_metadata(principal.namespace(blob_id))
+        etag = _etag(metadata.checksum)
+        if etag is not None and if_none_match is not None and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        if 0 < settings.stream_response_threshold <= metadata.size:
+            return await _stream_blob_response(blob_service, blob_id, metadata, etag, ticket)
+        ticket.reserve(metadata.size)
+
+        data, metadata = await blob_service.get_blob(metadata.id, metadata)
+        if etag is not None:
+            response.headers["ETag"] = etag
 
-        encoded_data = base64.b64encode(data).decode("utf-8")
+        with stage("base64_encode"):
+            encoded_data = await offloader.b64encode(data)
         return BlobResponse(
-            id=metadata.id,
+            id=blob_id,
             data=encoded_data,
             size=metadata.size,
             created_at=metadata.created_at,
@@ -72,3 +160,253 @@ async def get_blob(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         )
+
+
+def _presign_unsupported() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail=f"Direct transfers are not supported by the {settings.storage_backend} backend",
+    )
+
+
+@router.post(
+    "/blobs/{blob_id}/upload-url", response_model=PresignedUrlResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_upload_url(
+    blob_id: str,
+    request: UploadUrlRequest,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Presigned URL for uploading a blob directly to the storage backend."""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.presigned_url_expiry)
+    try:
+        storage_backend = await get_storage_backend(db)
+        blob_service = BlobService(storage_backend, db)
+        url, headers = await blob_service.create_upload_url(
+            principal.namespace(blob_id), request.size, request.sha256, principal.tenant
+        )
+    except NotImplementedError:
+        raise _presign_unsupported()
+    except BlobAlreadyExistsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    return PresignedUrlResponse(url=url, method="PUT", headers=headers, expires_at=expires_at)
+
+
+@router.post("/blobs/{blob_id}/complete", response_model=BlobInfoResponse, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    blob_id: str,
+    response: Response,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Record a blob uploaded through a presigned URL."""
+    try:
+        storage_backend = await get_storage_backend(db)
+        blob_service = BlobService(storage_backend, db)
+        metadata = await blob_service.complete_upload(principal.namespace(blob_id), principal.tenant)
+    except NotImplementedError:
+        raise _presign_unsupported()
+    except BlobAlreadyExistsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    except BlobNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No upload found for blob {blob_id}",
+        )
+    etag = _etag(metadata.checksum)
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return BlobInfoResponse(
+        id=blob_id,
+        size=metadata.size,
+        checksum=metadata.checksum,
+        created_at=metadata.created_at,
+    )
+
+
+@router.get("/blobs/{blob_id}/download-url", response_model=PresignedUrlResponse)
+async def create_download_url(
+    blob_id: str,
+    principal: Principal = Depends(require_scope("blobs:read")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Presigned URL for downloading a blob directly from the storage backend."""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.presigned_url_expiry)
+    try:
+        storage_backend = await get_storage_backend(db)
+        blob_service = BlobService(storage_backend, db)
+        url = await blob_service.create_download_url(principal.namespace(blob_id))
+    except NotImplementedError:
+        raise _presign_unsupported()
+    except BlobNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    return PresignedUrlResponse(url=url, method="GET", expires_at=expires_at)
+
+
+def _upload_response(session, parts, blob_id: str) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=session.id,
+        id=blob_id,
+        size=session.size,
+        chunk_size=session.chunk_size,
+        parts=part_count(session.size, session.chunk_size),
+        received=received_ranges(session, parts),
+        expires_at=session.expires_at,
+    )
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    request: UploadCreateRequest,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Start a resumable upload."""
+    storage_backend = await get_storage_backend(db)
+    upload_service = UploadService(storage_backend, db)
+    session = await upload_service.create_session(
+        principal.namespace(request.id), request.size, request.chunk_size, principal.tenant
+    )
+    return _upload_response(session, [], request.id)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: str,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """State of a resumable upload, including the byte ranges received so far."""
+    storage_backend = await get_storage_backend(db)
+    upload_service = UploadService(storage_backend, db)
+    session = await upload_service.get_session(upload_id, principal.tenant)
+    parts = await upload_service.get_parts(session)
+    return _upload_response(session, parts, principal.local_id(session.blob_id))
+
+
+@router.put("/uploads/{upload_id}/parts/{part_number}", status_code=status.HTTP_204_NO_CONTENT)
+async def put_upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upload one part as raw bytes. Parts may be sent in any order and resent."""
+    data = await request.body()
+    storage_backend = await get_storage_backend(db)
+    upload_service = UploadService(storage_backend, db)
+    await upload_service.put_part(upload_id, part_number, data, principal.tenant)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=BlobInfoResponse, status_code=status.HTTP_201_CREATED)
+async def complete_resumable_upload(
+    upload_id: str,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Assemble the received parts into the blob."""
+    storage_backend = await get_storage_backend(db)
+    upload_service = UploadService(storage_backend, db)
+    try:
+        metadata = await upload_service.commit(upload_id, principal.tenant)
+    except BlobAlreadyExistsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    return BlobInfoResponse(
+        id=principal.local_id(metadata.id),
+        size=metadata.size,
+        checksum=metadata.checksum,
+        created_at=metadata.created_at,
+    )
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: str,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Abort a resumable upload and discard its parts."""
+    storage_backend = await get_storage_backend(db)
+    upload_service = UploadService(storage_backend, db)
+    await upload_service.abort(upload_id, principal.tenant)
+
+
+@router.delete("/blobs/{blob_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_blob(
+    blob_id: str,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a blob by ID."""
+    try:
+        storage_backend = await get_storage_backend(db)
+        blob_service = BlobService(storage_backend, db)
+        await blob_service.delete_blob(principal.namespace(blob_id))
+    except BlobNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+
+
+@router.get("/export")
+async def export_blobs(
+    prefix: str = "",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    principal: Principal = Depends(require_scope("blobs:read")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a tar archive of the caller's blobs, optionally filtered by ID prefix and creation time."""
+    storage_backend = await get_storage_backend(db)
+    archive_service = ArchiveService(
+        BlobService(storage_backend, db), settings.archive_concurrency, settings.archive_chunk_size
+    )
+    return StreamingResponse(
+        archive_service.export(principal, prefix, since, until),
+        media_type="application/x-tar",
+        headers={"Content-Disposition": 'attachment; filename="blobs.tar"'},
+    )
+
+
+@router.post("/import", response_model=ImportResponse)
+async def import_blobs(
+    request: Request,
+    principal: Principal = Depends(require_scope("blobs:write")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Store the blobs of a tar archive sent as the request body; IDs that exist are skipped."""
+    storage_backend = await get_storage_backend(db)
+    archive_service = ArchiveService(
+        BlobService(storage_backend, db), settings.archive_concurrency, settings.archive_chunk_size
+    )
+    return ImportResponse(**await archive_service.import_archive(principal, request.stream()))
+
+
+@router.get("/usage", response_model=UsageResponse)
+async def get_usage(
+    principal: Principal = Depends(require_scope("blobs:read")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Storage used by the caller's tenant."""
+    usage = await db.get(TenantUsage, principal.tenant)
+    return UsageResponse(
+        tenant=principal.tenant,
+        bytes_used=usage.bytes_used if usage is not None else 0,
+        blob_count=usage.blob_count if usage is not None else 0,
+        quota_bytes=tenant_quota(principal.tenant) or None,
+    )
@@ -25,3 +25,79 @@ class BlobResponse(BaseModel):
             datetime: lambda v: v.isoformat() + "Z"
         }
 
+
+class BlobInfoResponse(BaseModel):
+    """Response schema for blob metadata without its data."""
+
+    id: str
+    size: int
+    checksum: str | None = None
+    created_at: datetime
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat() + "Z"
+        }
+
+
+class UploadUrlRequest(BaseModel):
+    """Request schema for a presigned upload URL."""
+
+    size: int = Field(..., ge=0, description="Exact size of the upload in bytes")
+    sha256: str | None = Field(None, pattern="^[0-9a-f]{64}$", description="Hex SHA-256 of the data")
+
+
+class PresignedUrlResponse(BaseModel):
+    """Response schema for a presigned URL."""
+
+    url: str
+    method: str
+    headers: dict[str, str] = Field(default_factory=dict, description="Headers to send unchanged")
+    expires_at: datetime
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat() + "Z"
+        }
+
+
+class UploadCreateRequest(BaseModel):
+    """Request schema for starting a resumable upload."""
+
+    id: str = Field(..., min_length=1)
+    size: int = Field(..., ge=0, description="Total size of the blob in bytes")
+    chunk_size: int = Field(..., gt=0, description="Size of every part except the last")
+
+
+class UploadSessionResponse(BaseModel):
+    """Response schema for a resumable upload session."""
+
+    upload_id: str
+    id: str
+    size: int
+    chunk_size: int
+    parts: int
+    received: list[tuple[int, int]] = Field(default_factory=list, description="Received byte ranges [start, end)")
+    expires_at: datetime
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat() + "Z"
+        }
+
+
+class UsageResponse(BaseModel):
+    """Response schema for tenant storage usage."""
+
+    tenant: str
+    bytes_used: int
+    blob_count: int
+    quota_bytes: int | None = None
+
+
+class ImportResponse(BaseModel):
+    """Response schema for an archive import."""
+
+    imported: int
+    skipped: int
+    bytes: int
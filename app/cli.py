@@ -0,0 +1,125 @@
+"""Administrative commands, run against the configured database and backends::
+
+    python -m app.cli migrate --from database --to s3 --concurrency 8 --rate 50
+    python -m app.cli export --tenant acme --prefix reports/ --since 2024-01-01 --output reports.tar
+    python -m app.cli import reports.tar --tenant acme
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.services.archive import ArchiveService
+from app.services.blob_service import BlobService
+from app.services.migration import BlobMigrator
+from app.storage import get_storage_backend
+from app.storage.multi_volume import shutdown_volume_executors
+from app.storage.s3_compatible import close_http_clients
+from app.utils.auth import DEFAULT_TENANT, Principal
+from app.utils.offload import offloader
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("migrate", help="move blobs from one storage backend to another")
+    command.add_argument("--from", dest="source", required=True, help="backend the blobs are recorded on")
+    command.add_argument("--to", dest="target", default=settings.storage_backend, help="default: STORAGE_BACKEND")
+    command.add_argument("--concurrency", type=int, default=4, help="blobs copied at a time")
+    command.add_argument("--rate", type=float, default=0.0, help="MiB/s copied, 0 for unlimited")
+    command.add_argument("--no-verify", dest="verify", action="store_false", help="skip reading back each copy")
+    command.add_argument("--delete-source", action="store_true", help="remove each blob from the source once moved")
+
+    command = commands.add_parser("export", help="write a tar archive of a tenant's blobs")
+    command.add_argument("--output", default="-", help="archive file, default standard output")
+    command.add_argument("--tenant", default=DEFAULT_TENANT)
+    command.add_argument("--prefix", default="", help="only blobs whose ID starts with this")
+    command.add_argument("--since", type=datetime.fromisoformat, help="only blobs created at or after this time")
+    command.add_argument("--until", type=datetime.fromisoformat, help="only blobs created before this time")
+    command.add_argument("--concurrency", type=int, default=settings.archive_concurrency, help="blobs read ahead")
+
+    command = commands.add_parser("import", help="store the blobs of a tar archive")
+    command.add_argument("input", help="archive file, - for standard input")
+    command.add_argument("--tenant", default=DEFAULT_TENANT)
+    return parser.parse_args(argv)
+
+
+async def migrate(args: argparse.Namespace) -> dict[str, int]:
+    migrator = BlobMigrator(
+        args.source,
+        args.target,
+        concurrency=args.concurrency,
+        bytes_per_second=args.rate * 1024 * 1024,
+        verify=args.verify,
+        delete_source=args.delete_source,
+    )
+    return await migrator.run()
+
+
+async def export(args: argparse.Namespace) -> None:
+    principal = Principal(args.tenant, frozenset())
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        async with AsyncSessionLocal() as session:
+            archive_service = ArchiveService(
+                BlobService(await get_storage_backend(session), session), args.concurrency, settings.archive_chunk_size
+            )
+            async for data in archive_service.export(principal, args.prefix, args.since, args.until):
+                output.write(data)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    source = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while chunk := source.read(settings.archive_chunk_size):
+            yield chunk
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+async def import_(args: argparse.Namespace) -> dict[str, int]:
+    principal = Principal(args.tenant, frozenset())
+    async with AsyncSessionLocal() as session:
+        archive_service = ArchiveService(
+            BlobService(await get_storage_backend(session), session), chunk_size=settings.archive_chunk_size
+        )
+        return await archive_service.import_archive(principal, _read_file(args.input))
+
+
+COMMANDS = {"migrate": migrate, "export": export, "import": import_}
+
+
+async def run(args: argparse.Namespace):
+    try:
+        return await COMMANDS[args.command](args)
+    finally:
+        await close_http_clients()
+        await engine.dispose()
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    offloader.configure(settings.offload_threshold, settings.offload_workers)
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        shutdown_volume_executors()
+        offloader.shutdown()
+    if result is not None:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,128 @@ class Settings(BaseSettings):
     storage_backend: str = "local"
     database_url: str = "sqlite:///./simpledrive.db"
     local_storage_path: str = "./storage"
+    local_storage_volumes: str = ""
+    local_volume_threads: int = 4
+    local_rebalance_interval: float = 3600.0
+    local_rebalance_rate: float = 50 * 1024 * 1024
     api_token: str = "dev-token"
+    api_tokens: list[dict] = []
+    jwt_secret: str = ""
+    jwt_jwks_url: str = ""
+    jwt_algorithms: str = "HS256"
+    jwt_audience: str = ""
+    jwt_issuer: str = ""
+    jwt_tenant_claim: str = "tenant"
+    jwks_cache_seconds: float = 300.0
+    auth_cache_size: int = 10000
+    auth_cache_ttl: float = 300.0
+    default_quota_bytes: int = 0
+    tenant_quotas: dict[str, int] = {}
+    usage_reconcile_interval: float = 3600.0
     debug: bool = False
+    metrics_enabled: bool = True
+    checksum_verification: str = "sampled"
+    checksum_verification_sample_rate: float = 0.01
+    single_flight_enabled: bool = True
+    inline_blob_threshold: int = 0
+    group_commit_enabled: bool = False
+    group_commit_max_delay: float = 0.002
+    group_commit_max_batch: int = 64
+    existence_index_enabled: bool = False
+    existence_index_path: str = "./existence-index.bin"
+    existence_index_error_rate: float = 0.01
+    existence_index_refresh_interval: float = 10.0
+    existence_index_rebuild_interval: float = 24 * 3600
+    existence_index_page_size: int = 2000
+    stream_response_threshold: int = 1024 * 1024
+    stream_chunk_size: int = 192 * 1024
+    archive_concurrency: int = 4
+    archive_chunk_size: int = 1024 * 1024
+    offload_threshold: int = 1024 * 1024
+    offload_workers: int = 4
+
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.01
+    tracing_exporter: str = "file"
+    tracing_file_path: str = "./traces.jsonl"
+
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_interval: float = 0.005
+    profiling_header: str = "X-Debug-Profile"
+    profiling_max_stacks: int = 10000
     
     s3_endpoint_url: str = ""
     s3_access_key_id: str = ""
     s3_secret_access_key: str = ""
     s3_bucket_name: str = ""
     s3_region: str = "us-east-1"
+    s3_connect_timeout: float = 5.0
+    s3_read_timeout: float = 30.0
+    s3_presign_endpoint_url: str = ""
+    presigned_url_expiry: int = 900
+
+    upload_min_chunk_size: int = 5 * 1024 * 1024
+    upload_max_chunk_size: int = 64 * 1024 * 1024
+    upload_max_parts: int = 10000
+    # Backends without in-place assembly join the parts in memory on completion.
+    upload_max_in_memory_size: int = 256 * 1024 * 1024
+    upload_session_ttl: float = 24 * 3600
+    upload_cleanup_interval: float = 3600.0
     
     ftp_host: str | None = None
     ftp_port: int = 21
     ftp_username: str = "anonymous"
     ftp_password: str = ""
     ftp_base_dir: str = "/"
+    ftp_connect_timeout: float = 5.0
+    ftp_read_timeout: float = 30.0
+
+    rate_limit_per_second: float = 0.0
+    rate_limit_burst: float = 0.0
+    inflight_bytes_per_token: int = 0
+    admission_retry_after: float = 1.0
+    local_max_concurrency: int = 0
+    database_max_concurrency: int = 0
+    s3_max_concurrency: int = 0
+    ftp_max_concurrency: int = 0
+    s3_max_connections: int = 100
+
+    hedge_remote_reads: bool = False
+    hedge_percentile: float = 0.95
+
+    resilience_enabled: bool = True
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.05
+    retry_max_delay: float = 1.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    tier_hot_backend: str = "local"
+    tier_cold_backend: str = "s3"
+    tier_demote_after_seconds: int = 7 * 24 * 3600
+    tier_hot_max_size: int = 64 * 1024 * 1024
+    tier_promote_after_reads: int = 3
+    tier_migration_interval: float = 300.0
+    tier_migration_batch_size: int = 100
+
+    replica_backends: str = ""
+    replica_write_quorum: int = 2
+    replica_hedge_percentile: float = 0.95
+    replica_repair_interval: float = 60.0
+    replica_repair_batch_size: int = 100
+
+    erasure_backends: str = ""
+    erasure_data_shards: int = 4
+    erasure_parity_shards: int = 2
+
+    reconcile_enabled: bool = False
+    reconcile_backend: str = ""
+    reconcile_interval: float = 3600.0
+    reconcile_repair: bool = False
+    reconcile_io_rate: float = 50.0
+    reconcile_page_size: int = 500
+    reconcile_grace_period: float = 3600.0
     
     class Config:
         env_file = ".env"
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
+from app.utils.metrics import Gauge, db_sessions_active, registry
+from app.utils.tracing import tracer
 
 # Create async engine
 engine = create_async_engine(
@@ -19,8 +21,30 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+def _pool_stats() -> dict[tuple[str, ...], float]:
+    pool = engine.sync_engine.pool
+    stats = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, state, None)
+        if callable(method):
+            stats[(state,)] = method()
+    return stats
+
+
+registry.register(Gauge(
+    "simpledrive_db_pool_connections", "Metadata database connection pool state.", ("state",), callback=_pool_stats,
+))
+
+
 async def get_db() -> AsyncSession:
     """Get database session."""
     async with AsyncSessionLocal() as session:
-        yield session
+        with tracer.span("db.get_session"):
+            # Check out the pooled connection up front so pool waits are attributed here.
+            await session.connection()
+        db_sessions_active.inc()
+        try:
+            yield session
+        finally:
+            db_sessions_active.dec()
 
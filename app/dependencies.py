@@ -1,17 +1,57 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.config import settings
+from app.utils.admission import AdmissionTicket, admission
+from app.utils.auth import Authenticator, Principal
+from app.utils.tracing import tracer
 
 security = HTTPBearer()
 
+_authenticator: Authenticator | None = None
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    if token != settings.api_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-        )
-    return token
 
+def get_authenticator() -> Authenticator:
+    global _authenticator
+    if _authenticator is None:
+        _authenticator = Authenticator.from_settings(settings)
+    return _authenticator
+
+
+def reset_authenticator() -> None:
+    """Rebuild the authenticator from settings on the next request."""
+    global _authenticator
+    _authenticator = None
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    with tracer.span("auth.verify_token"):
+        principal = await get_authenticator().authenticate(credentials.credentials)
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication token",
+            )
+        return principal
+
+
+def require_scope(scope: str):
+    async def check_scope(principal: Principal = Depends(verify_token)) -> Principal:
+        if not principal.has_scope(scope):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Token lacks the {scope} scope",
+            )
+        return principal
+
+    return check_scope
+
+
+async def admit_request(request: Request, principal: Principal = Depends(verify_token)):
+    """Apply the tenant's rate limit and hold its request body against the in-flight byte budget."""
+    ticket: AdmissionTicket = admission.admit(principal.tenant)
+    try:
+        ticket.reserve(int(request.headers.get("content-length") or 0))
+        yield ticket
+    finally:
+        ticket.release()
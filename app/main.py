@@ -1,19 +1,99 @@
+import math
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.api.debug import router as debug_router
 from app.api.v1.router import router as v1_router
+from app.config import settings
+from app.services.background import start_background_tasks, stop_background_tasks
+from app.services.existence import existence_index
+from app.services.group_commit import group_commit
+from app.storage.multi_volume import shutdown_volume_executors
+from app.storage.s3_compatible import close_http_clients
+from app.utils.admission import admission
 from app.utils.exceptions import (
+    AdmissionRejectedError,
+    BackendUnavailableError,
     BlobAlreadyExistsError,
     BlobNotFoundError,
     InvalidBase64Error,
+    InvalidBlobIdError,
+    InvalidUploadError,
+    QuotaExceededError,
     SimpleDriveError,
     StorageBackendError,
+    UploadNotFoundError,
+)
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.offload import offloader
+from app.utils.profiler import ProfilingMiddleware, profiler
+from app.utils.tracing import InMemorySpanExporter, JsonLinesSpanExporter, TracingMiddleware, tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.existence_index_enabled:
+        existence_index.claim()
+    tasks = start_background_tasks()
+    yield
+    await stop_background_tasks(tasks)
+    existence_index.release()
+    await close_http_clients()
+    shutdown_volume_executors()
+    offloader.shutdown()
+
+
+app = FastAPI(title="Simple Drive", version="1.0.0", lifespan=lifespan)
+
+admission.configure(
+    settings.rate_limit_per_second,
+    settings.rate_limit_burst,
+    settings.inflight_bytes_per_token,
+    settings.admission_retry_after,
+)
+offloader.configure(settings.offload_threshold, settings.offload_workers)
+existence_index.configure(
+    settings.existence_index_path,
+    settings.existence_index_error_rate,
+    settings.existence_index_rebuild_interval,
 )
 
-app = FastAPI(title="Simple Drive", version="1.0.0")
+group_commit.configure(
+    settings.group_commit_enabled,
+    settings.group_commit_max_delay,
+    settings.group_commit_max_batch,
+)
 
 app.include_router(v1_router)
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+if settings.tracing_enabled:
+    if settings.tracing_exporter == "file":
+        span_exporter = JsonLinesSpanExporter(settings.tracing_file_path)
+    else:
+        span_exporter = InMemorySpanExporter()
+    tracer.configure(span_exporter, settings.tracing_sample_rate)
+    app.add_middleware(TracingMiddleware)
+
+if settings.profiling_enabled:
+    profiler.interval = settings.profiling_interval
+    profiler.max_stacks = settings.profiling_max_stacks
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        header=settings.profiling_header,
+        token=settings.api_token,
+    )
+    app.include_router(debug_router)
+
 
 @app.exception_handler(InvalidBase64Error)
 async def invalid_base64_handler(request, exc):
@@ -39,6 +119,56 @@ async def blob_already_exists_handler(request, exc):
     )
 
 
+@app.exception_handler(InvalidBlobIdError)
+async def invalid_blob_id_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"error": "Invalid blob ID", "detail": str(exc)},
+    )
+
+
+@app.exception_handler(UploadNotFoundError)
+async def upload_not_found_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={"error": "Upload not found", "detail": str(exc)},
+    )
+
+
+@app.exception_handler(InvalidUploadError)
+async def invalid_upload_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"error": "Invalid upload", "detail": str(exc)},
+    )
+
+
+@app.exception_handler(QuotaExceededError)
+async def quota_exceeded_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_403_FORBIDDEN,
+        content={"error": "Quota exceeded", "detail": str(exc)},
+    )
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"error": "Too many requests", "detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+@app.exception_handler(BackendUnavailableError)
+async def backend_unavailable_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"error": "Storage backend unavailable", "detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 @app.exception_handler(StorageBackendError)
 async def storage_backend_handler(request, exc):
     return JSONResponse(
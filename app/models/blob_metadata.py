@@ -2,7 +2,7 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -15,7 +15,14 @@ class BlobMetadata(Base):
 
     id = Column(String(255), primary_key=True)
     size = Column(Integer, nullable=False)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), index=True
+    )
     storage_backend = Column(String(50), nullable=False)
     storage_path = Column(String(512), nullable=True)
+    last_accessed_at = Column(DateTime(timezone=True), nullable=True)
+    checksum = Column(String(64), nullable=True)
+    tenant_id = Column(String(63), nullable=False, default="default", server_default="default", index=True)
+    # The data of blobs smaller than INLINE_BLOB_THRESHOLD, which are stored in the row itself.
+    inline_data = Column(LargeBinary, nullable=True)
 
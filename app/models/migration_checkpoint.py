@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+
+from app.models.blob_metadata import Base
+
+
+class MigrationCheckpoint(Base):
+    """Progress of a backend-to-backend migration: every blob ID up to ``cursor`` has been handled."""
+
+    __tablename__ = "migration_checkpoints"
+
+    id = Column(String(120), primary_key=True)
+    cursor = Column(String(255), nullable=True)
+    migrated = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    bytes_migrated = Column(BigInteger, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
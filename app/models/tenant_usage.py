@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+
+from app.models.blob_metadata import Base
+
+
+class TenantUsage(Base):
+    """Bytes and blobs stored per tenant, maintained in the same transactions as ``blob_metadata``."""
+
+    __tablename__ = "tenant_usage"
+
+    tenant_id = Column(String(63), primary_key=True)
+    bytes_used = Column(BigInteger, nullable=False, default=0)
+    blob_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+
+from app.models.blob_metadata import Base
+
+
+class UploadSession(Base):
+    """A resumable upload whose parts are staged in the storage backend until it is committed."""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)
+    blob_id = Column(String(255), nullable=False)
+    tenant_id = Column(String(63), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    storage_backend = Column(String(50), nullable=False)
+    backend_upload_id = Column(String(1024), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class UploadPart(Base):
+    """A received part of an upload session. ``etag`` is the backend's token for the staged part."""
+
+    __tablename__ = "upload_parts"
+
+    session_id = Column(String(32), ForeignKey("upload_sessions.id", ondelete="CASCADE"), primary_key=True)
+    part_number = Column(Integer, primary_key=True)
+    size = Column(Integer, nullable=False)
+    etag = Column(String(255), nullable=True)
+    received_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
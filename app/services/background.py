@@ -0,0 +1,79 @@
+"""Periodic maintenance jobs started with the application."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from app.config import settings
+from app.services.existence import run_existence_index_refresh
+from app.services.rebalance import run_volume_rebalance
+from app.services.reconciler import run_reconciliation
+from app.services.replica_repair import run_replica_repair
+from app.services.tiering import run_tier_migration
+from app.services.uploads import run_upload_cleanup
+from app.services.usage import run_usage_reconciliation
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    name: str, interval: float, job: Callable[[], Awaitable[object]], initial_delay: float | None = None
+) -> None:
+    """Run ``job`` every ``interval`` seconds until cancelled, logging failures.
+
+    The first run is after ``initial_delay`` seconds, by default ``interval``.
+    """
+    delay = interval if initial_delay is None else initial_delay
+    while True:
+        await asyncio.sleep(delay)
+        delay = interval
+        try:
+            result = await job()
+            logger.debug("Background job %s finished: %s", name, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", name)
+
+
+def start_background_tasks() -> list[asyncio.Task]:
+    tasks = []
+    if settings.storage_backend == "tiered" and settings.tier_migration_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("tier-migration", settings.tier_migration_interval, run_tier_migration)
+        ))
+    if settings.storage_backend == "replicated" and settings.replica_repair_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("replica-repair", settings.replica_repair_interval, run_replica_repair)
+        ))
+    if settings.local_storage_volumes and settings.local_rebalance_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("volume-rebalance", settings.local_rebalance_interval, run_volume_rebalance)
+        ))
+    if settings.usage_reconcile_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("usage-reconcile", settings.usage_reconcile_interval, run_usage_reconciliation)
+        ))
+    if settings.upload_cleanup_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("upload-cleanup", settings.upload_cleanup_interval, run_upload_cleanup)
+        ))
+    if settings.existence_index_enabled and settings.existence_index_refresh_interval > 0:
+        # Built right away: lookups are not filtered until the first build.
+        tasks.append(asyncio.create_task(run_periodically(
+            "existence-index",
+            settings.existence_index_refresh_interval,
+            run_existence_index_refresh,
+            initial_delay=0,
+        )))
+    if settings.reconcile_enabled and settings.reconcile_interval > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically("reconcile", settings.reconcile_interval, run_reconciliation)
+        ))
+    return tasks
+
+
+async def stop_background_tasks(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
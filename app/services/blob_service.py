@@ -1,47 +1,306 @@
+import base64
+import hashlib
+import logging
+import random
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
+from app.config import settings
 from app.models.blob_metadata import BlobMetadata
+from app.models.tenant_usage import TenantUsage
+from app.services.existence import ExistenceIndex, existence_index
+from app.services.group_commit import GroupCommitWriter, group_commit
+from app.services.usage import charge_usage, tenant_quota
+from app.storage import create_recorded_backend
 from app.storage.base import StorageBackend
-from app.utils.exceptions import BlobAlreadyExistsError, BlobNotFoundError
+from app.utils.auth import DEFAULT_TENANT
+from app.utils.exceptions import (
+    BlobAlreadyExistsError,
+    BlobNotFoundError,
+    ChecksumMismatchError,
+    QuotaExceededError,
+)
+from app.utils.metrics import cache_requests, checksum_verifications
+from app.utils.offload import offloader
+from app.utils.single_flight import single_flight
+from app.utils.tracing import stage
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_VERIFICATION_MODES = ("off", "sampled", "always")
+# Recorded as the storage backend of blobs kept in their metadata row.
+INLINE_BACKEND = "inline"
 
 
 class BlobService:
-    def __init__(self, storage_backend: StorageBackend, db_session: AsyncSession):
+    def __init__(
+        self,
+        storage_backend: StorageBackend,
+        db_session: AsyncSession,
+        checksum_verification: str | None = None,
+        checksum_sample_rate: float | None = None,
+        single_flight: bool | None = None,
+        existence: ExistenceIndex | None = None,
+        inline_threshold: int | None = None,
+        writer: GroupCommitWriter | None = None,
+    ):
         self.storage_backend = storage_backend
         self.db_session = db_session
+        self.checksum_verification = checksum_verification or settings.checksum_verification
+        if self.checksum_verification not in CHECKSUM_VERIFICATION_MODES:
+            raise ValueError(f"Unknown checksum verification mode: {self.checksum_verification}")
+        self.checksum_sample_rate = (
+            settings.checksum_verification_sample_rate if checksum_sample_rate is None else checksum_sample_rate
+        )
+        self.single_flight = settings.single_flight_enabled if single_flight is None else single_flight
+        self.existence = existence_index if existence is None else existence
+        self.inline_threshold = settings.inline_blob_threshold if inline_threshold is None else inline_threshold
+        self.writer = group_commit if writer is None else writer
+        self._recorded_backends: dict[str, StorageBackend] = {}
+
+    async def create_blob(self, blob_id: str, data: bytes, tenant_id: str = DEFAULT_TENANT) -> BlobMetadata:
+        await self.ensure_new(blob_id)
+        quota = await self.check_quota(tenant_id, len(data))
+
+        with stage("checksum"):
+            checksum = await offloader.sha256_hex(data)
+        if len(data) < self.inline_threshold:
+            # Small enough to live in the metadata row: reads need no backend round trip.
+            return await self.record_blob(
+                blob_id, len(data), checksum, tenant_id, quota, inline_data=data, batched=True
+            )
+        await self.storage_backend.store(blob_id, data, checksum)
+        return await self.record_blob(blob_id, len(data), checksum, tenant_id, quota, batched=True)
+
+    async def create_upload_url(
+        self,
+        blob_id: str,
+        size: int,
+        checksum: str | None = None,
+        tenant_id: str = DEFAULT_TENANT,
+        expires_in: int | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        """Presigned PUT URL for uploading ``blob_id`` directly to the backend.
 
-    async def create_blob(self, blob_id: str, data: bytes) -> BlobMetadata:
-        existing = await self.db_session.get(BlobMetadata, blob_id)
+        Returns the URL and the headers the client must send with it. The size,
+        and the checksum when given, are signed, so the backend rejects any other
+        payload; ``complete_upload`` records the blob afterwards.
+        """
+        await self.ensure_new(blob_id)
+        await self.check_quota(tenant_id, size)
+        headers = {"content-length": str(size), "if-none-match": "*"}
+        if checksum is not None:
+            headers["x-amz-checksum-sha256"] = base64.b64encode(bytes.fromhex(checksum)).decode()
+        url = self.storage_backend.presign("PUT", blob_id, expires_in or settings.presigned_url_expiry, headers)
+        return url, headers
+
+    async def complete_upload(self, blob_id: str, tenant_id: str = DEFAULT_TENANT) -> BlobMetadata:
+        """Record a blob uploaded through a presigned URL, as found by a HEAD on the backend."""
+        await self.ensure_new(blob_id)
+        stored = await self.storage_backend.stat(blob_id)
+        return await self.record_blob(blob_id, stored.size, stored.checksum, tenant_id, tenant_quota(tenant_id))
+
+    async def create_download_url(self, blob_id: str, expires_in: int | None = None) -> str:
+        metadata = await self.get_metadata(blob_id)
+        if metadata.inline_data is not None:
+            raise NotImplementedError(f"Blob {blob_id} is stored inline")
+        return self.backend_for(metadata).presign("GET", blob_id, expires_in or settings.presigned_url_expiry)
+
+    def backend_for(self, metadata: BlobMetadata) -> StorageBackend:
+        """The backend holding a blob, per its metadata.
+
+        Usually the configured one; blobs written before a switch of
+        ``STORAGE_BACKEND`` are read from where they were written until they
+        are migrated.
+        """
+        if self.storage_backend.holds(metadata.storage_backend):
+            return self.storage_backend
+        backend = self._recorded_backends.get(metadata.storage_backend)
+        if backend is None:
+            backend = create_recorded_backend(metadata.storage_backend, self.db_session)
+            self._recorded_backends[metadata.storage_backend] = backend
+        return backend
+
+    async def ensure_new(self, blob_id: str) -> None:
+        with stage("metadata_lookup"):
+            existing = await self.db_session.get(BlobMetadata, blob_id)
         if existing:
             raise BlobAlreadyExistsError(f"Blob {blob_id} already exists")
 
-        await self.storage_backend.store(blob_id, data)
+    async def check_quota(self, tenant_id: str, size: int) -> int:
+        """Returns the tenant's quota, or raises if ``size`` more bytes would exceed it."""
+        quota = tenant_quota(tenant_id)
+        if quota > 0:
+            # Early rejection before uploading; the commit re-checks atomically.
+            usage = await self.db_session.get(TenantUsage, tenant_id)
+            if (usage.bytes_used if usage is not None else 0) + size > quota:
+                raise QuotaExceededError(f"Storing {size} bytes would exceed the quota of tenant {tenant_id}")
+        return quota
+
+    async def record_blob(
+        self,
+        blob_id: str,
+        size: int,
+        checksum: str | None,
+        tenant_id: str,
+        quota: int,
+        created_at: datetime | None = None,
+        inline_data: bytes | None = None,
+        batched: bool = False,
+    ) -> BlobMetadata:
+        """Commit metadata for data already in the backend, or for ``inline_data``, and charge it to the tenant.
 
+        With ``batched`` and the group commit writer enabled, the row is
+        committed along with those of concurrent writes; otherwise it is
+        committed in the session's transaction, with any changes pending there.
+        """
+        inline = inline_data is not None
         metadata = BlobMetadata(
             id=blob_id,
-            size=len(data),
-            created_at=datetime.now(timezone.utc),
-            storage_backend=self.storage_backend.__class__.__name__.replace("StorageBackend", "").lower(),
-            storage_path=blob_id,
+            size=size,
+            checksum=checksum,
+            created_at=created_at or datetime.now(timezone.utc),
+            storage_backend=INLINE_BACKEND if inline else self.storage_backend.name,
+            storage_path=None if inline else self.storage_backend.storage_key(blob_id),
+            tenant_id=tenant_id,
+            inline_data=inline_data,
         )
-        self.db_session.add(metadata)
-        await self.db_session.commit()
+        try:
+            with stage("metadata_commit"):
+                if batched and self.writer.enabled:
+                    await self.writer.insert(metadata, quota)
+                else:
+                    self.db_session.add(metadata)
+                    await charge_usage(self.db_session, tenant_id, size, 1, quota)
+                    await self.db_session.commit()
+        except BlobAlreadyExistsError:
+            raise
+        except IntegrityError as e:
+            # A concurrent upload committed the same ID first and owns the stored object.
+            await self.db_session.rollback()
+            raise BlobAlreadyExistsError(f"Blob {blob_id} already exists") from e
+        except Exception:
+            await self.db_session.rollback()
+            if not inline:
+                await self._discard(blob_id)
+            raise
+        self.existence.add(blob_id)
         return metadata
 
-    async def get_blob(self, blob_id: str) -> tuple[bytes, BlobMetadata]:
-        metadata = await self.db_session.get(BlobMetadata, blob_id)
+    async def delete_blob(self, blob_id: str) -> None:
+        metadata = await self.get_metadata(blob_id)
+        backend = self.backend_for(metadata) if metadata.inline_data is None else None
+        await self.db_session.delete(metadata)
+        with stage("metadata_commit"):
+            await charge_usage(self.db_session, metadata.tenant_id, -metadata.size, -1)
+            await self.db_session.commit()
+        if backend is None:
+            return
+        try:
+            await backend.delete(blob_id)
+        except Exception:
+            # The blob is gone for clients; the reconciler removes the orphaned object.
+            logger.warning("Could not remove data of deleted blob %s", blob_id, exc_info=True)
+
+    async def _discard(self, blob_id: str) -> None:
+        """Best-effort removal of data whose metadata was never committed."""
+        try:
+            await self.storage_backend.delete(blob_id)
+        except Exception:
+            logger.warning("Could not remove blob %s after a failed metadata commit", blob_id, exc_info=True)
+
+    async def get_metadata(self, blob_id: str) -> BlobMetadata:
+        if not self.existence.might_contain(blob_id):
+            cache_requests.inc("existence_index", "negative")
+            raise BlobNotFoundError(f"Blob {blob_id} not found")
+        with stage("metadata_lookup"):
+            if self.single_flight:
+                metadata, shared = await single_flight.do(("metadata", blob_id), lambda: self._load_metadata(blob_id))
+                cache_requests.inc("single_flight_metadata", "hit" if shared else "miss")
+                if metadata is not None:
+                    # Loaded in a session of its own: adopt a copy without querying again.
+                    metadata = await self.db_session.merge(metadata, load=False)
+            else:
+                metadata = await self.db_session.get(BlobMetadata, blob_id)
+        if self.existence.filter is not None:
+            cache_requests.inc("existence_index", "positive" if metadata else "false_positive")
         if not metadata:
             raise BlobNotFoundError(f"Blob {blob_id} not found")
+        return metadata
+
+    async def _load_metadata(self, blob_id: str) -> BlobMetadata | None:
+        # The lookup is shared and outlives the request that started it, so it cannot use that request's session.
+        async with AsyncSession(self.db_session.bind, expire_on_commit=False) as session:
+            return await session.get(BlobMetadata, blob_id)
 
-        data = await self.storage_backend.retrieve(blob_id)
+    async def get_blob(self, blob_id: str, metadata: BlobMetadata | None = None) -> tuple[bytes, BlobMetadata]:
+        if metadata is None:
+            metadata = await self.get_metadata(blob_id)
+        if metadata.inline_data is not None:
+            cache_requests.inc("inline", "hit")
+            return metadata.inline_data, metadata
+        cache_requests.inc("inline", "miss")
+        if not self.single_flight:
+            return await self._fetch(blob_id, metadata), metadata
+        # Concurrent readers of a blob share one backend read and one buffer.
+        data, shared = await single_flight.do(
+            ("data", metadata.storage_backend, blob_id), lambda: self._fetch(blob_id, metadata)
+        )
+        cache_requests.inc("single_flight_data", "hit" if shared else "miss")
         return data, metadata
 
+    async def stream_blob(
+        self, blob_id: str, metadata: BlobMetadata, chunk_size: int = 256 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Stream the data of a blob; a sampled checksum is verified once the last chunk was read.
+
+        A mismatch can only be raised after the data was handed out, so callers
+        must be able to abort the response.
+        """
+        if metadata.inline_data is not None:
+            for start in range(0, len(metadata.inline_data), chunk_size):
+                yield metadata.inline_data[start:start + chunk_size]
+            return
+        digest = hashlib.sha256() if self._should_verify(metadata) else None
+        async for chunk in self.backend_for(metadata).retrieve_stream(blob_id, chunk_size):
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+        if digest is not None:
+            self._check_digest(metadata, digest.hexdigest())
+
+    async def _fetch(self, blob_id: str, metadata: BlobMetadata) -> bytes:
+        data = await self.backend_for(metadata).retrieve(blob_id)
+        if self._should_verify(metadata):
+            await self._verify(metadata, data)
+        return data
+
+    def _should_verify(self, metadata: BlobMetadata) -> bool:
+        if metadata.checksum is None or self.checksum_verification == "off":
+            return False
+        return self.checksum_verification == "always" or random.random() < self.checksum_sample_rate
+
+    async def _verify(self, metadata: BlobMetadata, data: bytes) -> None:
+        with stage("checksum"):
+            actual = await offloader.sha256_hex(data)
+        self._check_digest(metadata, actual)
+
+    def _check_digest(self, metadata: BlobMetadata, actual: str) -> None:
+        if actual != metadata.checksum:
+            checksum_verifications.inc("mismatch")
+            raise ChecksumMismatchError(
+                f"Blob {metadata.id} is corrupt: expected sha256 {metadata.checksum}, got {actual}"
+            )
+        checksum_verifications.inc("ok")
+
     async def blob_exists(self, blob_id: str) -> bool:
-        metadata = await self.db_session.get(BlobMetadata, blob_id)
-        if metadata:
-            return True
-        return await self.storage_backend.exists(blob_id)
+        # Metadata is the source of truth: an object without a row is an orphan
+        # left by a failed upload, not a blob.
+        if not self.existence.might_contain(blob_id):
+            return False
+        return await self.db_session.get(BlobMetadata, blob_id) is not None
 
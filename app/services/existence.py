@@ -0,0 +1,175 @@
+"""In-process index of existing blob IDs for answering lookups of unknown IDs without a query."""
+
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SDXI"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBdd")
+
+# Rows are re-read this far behind the watermark: a row's created_at is set
+# before its commit, and other processes' clocks may lag ours.
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class ExistenceIndex:
+    """Bloom filter over all blob IDs in ``blob_metadata``.
+
+    An ID not in the filter certainly has no metadata row, so a lookup can be
+    answered as not found without querying the database; an ID in it may still
+    be missing (a false positive, or a deleted blob) and is looked up as usual.
+
+    The filter is built with one scan of ``blob_metadata``, then kept current
+    by this process's own writes and by a periodic refresh that reads the rows
+    created since the last one. Deleted IDs cannot be removed from a Bloom
+    filter, so it is rebuilt from scratch every ``rebuild_interval`` seconds,
+    and when it holds more IDs than it was sized for. After each refresh it is
+    saved to ``path``, so a restarted process resumes with a refresh instead of
+    a full scan.
+
+    Blobs created by other processes are only known after the next refresh,
+    and until then would be reported as not found. The index is therefore
+    only correct when a single process writes blobs: ``claim`` takes a lock
+    next to ``path`` and fails in any other process that tries to enable it.
+    """
+
+    def __init__(self, path: str = "", error_rate: float = 0.01, rebuild_interval: float = 24 * 3600):
+        self.filter: BloomFilter | None = None
+        self.watermark: datetime | None = None
+        self.built_at = 0.0
+        self._pending: set[str] | None = None
+        self._lock = asyncio.Lock()
+        self._claim = None
+        self.configure(path, error_rate, rebuild_interval)
+
+    def configure(self, path: str, error_rate: float, rebuild_interval: float) -> None:
+        self.path = path
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+
+    def claim(self) -> None:
+        """Make this process the only one using the index, or raise ``RuntimeError``."""
+        claim = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(claim, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            claim.close()
+            raise RuntimeError(
+                f"The existence index {self.path} is in use by another process; it requires a single worker"
+            ) from None
+        self._claim = claim
+
+    def release(self) -> None:
+        if self._claim is not None:
+            self._claim.close()
+            self._claim = None
+
+    def might_contain(self, blob_id: str) -> bool:
+        """False only if ``blob_id`` certainly has no metadata; always True before the first build."""
+        return self.filter is None or blob_id in self.filter
+
+    def add(self, blob_id: str) -> None:
+        if self.filter is not None:
+            self.filter.add(blob_id)
+        if self._pending is not None:
+            self._pending.add(blob_id)
+
+    async def refresh(self, db_session: AsyncSession, page_size: int = 2000) -> dict[str, int | str]:
+        """Bring the filter up to date, rebuilding it when due; loads the saved filter on first use."""
+        async with self._lock:
+            bloom = self.filter
+            if bloom is None and self.path:
+                bloom = await asyncio.to_thread(self._load)
+            rebuild = bloom is None or bloom.full or time.time() - self.built_at >= self.rebuild_interval
+            before = 0 if rebuild else bloom.count
+            # A new or loaded filter only goes live once filled; IDs written meanwhile are kept here.
+            self._pending = set()
+            try:
+                if rebuild:
+                    bloom = await self._build(db_session, page_size)
+                else:
+                    await self._catch_up(db_session, bloom, page_size)
+                bloom.update(self._pending)
+            finally:
+                self._pending = None
+            self.filter = bloom
+            if self.path:
+                await asyncio.to_thread(self._save)
+            return {
+                "mode": "rebuild" if rebuild else "refresh",
+                "added": bloom.count - before,
+                "ids": bloom.count,
+                "capacity": bloom.capacity,
+            }
+
+    async def _build(self, db_session: AsyncSession, page_size: int) -> BloomFilter:
+        rows = await db_session.scalar(select(func.count()).select_from(BlobMetadata))
+        # Room to grow until the next scheduled rebuild.
+        bloom = BloomFilter.for_capacity(max(2 * rows, 1024), self.error_rate)
+        started_at = datetime.now(timezone.utc)
+        result = await db_session.stream_scalars(select(BlobMetadata.id).execution_options(yield_per=page_size))
+        async for ids in result.partitions():
+            bloom.update(ids)
+        # Rows committed while the scan was running.
+        self.watermark = started_at
+        await self._catch_up(db_session, bloom, page_size)
+        self.built_at = time.time()
+        return bloom
+
+    async def _catch_up(self, db_session: AsyncSession, bloom: BloomFilter, page_size: int) -> None:
+        started_at = datetime.now(timezone.utc)
+        result = await db_session.stream_scalars(
+            select(BlobMetadata.id)
+            .where(BlobMetadata.created_at >= self.watermark - _REFRESH_OVERLAP)
+            .execution_options(yield_per=page_size)
+        )
+        async for ids in result.partitions():
+            bloom.update(ids)
+        self.watermark = started_at
+
+    def _save(self) -> None:
+        payload = _HEADER.pack(_MAGIC, _VERSION, self.watermark.timestamp(), self.built_at) + self.filter.to_bytes()
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(payload)
+        os.replace(temporary, self.path)
+
+    def _load(self) -> BloomFilter | None:
+        try:
+            with open(self.path, "rb") as f:
+                payload = f.read()
+            magic, version, watermark, built_at = _HEADER.unpack_from(payload)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Unknown format {magic!r} version {version}")
+            bloom = BloomFilter.from_bytes(payload[_HEADER.size:])
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Ignoring unreadable existence index %s", self.path, exc_info=True)
+            return None
+        self.watermark = datetime.fromtimestamp(watermark, timezone.utc)
+        self.built_at = built_at
+        return bloom
+
+
+existence_index = ExistenceIndex()
+
+
+async def run_existence_index_refresh() -> dict[str, int | str]:
+    async with AsyncSessionLocal() as session:
+        return await existence_index.refresh(session, settings.existence_index_page_size)
@@ -0,0 +1,134 @@
+"""Group commit of new blob metadata.
+
+Every write otherwise commits its own transaction, and under concurrent
+ingest the database spends most of its time syncing those commits to disk.
+With group commit enabled, writes hand their metadata row to a shared writer
+that collects rows for up to ``max_delay`` seconds, or until ``max_batch``
+rows are waiting, and inserts them in one transaction. Each write returns
+only once the transaction holding its row has committed, so an acknowledged
+blob is as durable as before; conflicts and quota rejections are still
+reported to the write they concern.
+"""
+
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.services.usage import charge_usage
+from app.utils.exceptions import BlobAlreadyExistsError, QuotaExceededError
+from app.utils.metrics import group_commit_batch_size
+
+
+def _resolve(future: asyncio.Future, error: BaseException | None = None) -> None:
+    # A waiter may have been cancelled while its row was being written.
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_delay: float = 0.002,
+        max_batch: int = 64,
+        session_factory=AsyncSessionLocal,
+    ):
+        self._pending: list[tuple[BlobMetadata, int, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self.configure(enabled, max_delay, max_batch, session_factory)
+
+    def configure(self, enabled: bool, max_delay: float, max_batch: int, session_factory=AsyncSessionLocal) -> None:
+        self.enabled = enabled
+        self.max_delay = max_delay
+        self.max_batch = max(max_batch, 1)
+        self.session_factory = session_factory
+
+    async def insert(self, metadata: BlobMetadata, quota: int) -> None:
+        """Insert ``metadata`` and charge it to its tenant, returning once committed.
+
+        Raises ``BlobAlreadyExistsError`` if the ID is taken and
+        ``QuotaExceededError`` if the tenant's quota does not allow it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((metadata, quota, future))
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+        await future
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch:
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.max_delay)
+                    except asyncio.TimeoutError:
+                        pass
+                self._full.clear()
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                await self._commit([item for item in batch if not item[2].done()])
+        finally:
+            self._flusher = None
+
+    async def _commit(self, batch: list[tuple[BlobMetadata, int, asyncio.Future]]) -> None:
+        if not batch:
+            return
+        group_commit_batch_size.observe(len(batch))
+        accepted = []
+        try:
+            async with self.session_factory() as session:
+                # Conflicts found up front, so that one taken ID does not fail the whole transaction.
+                ids = [metadata.id for metadata, _, _ in batch]
+                taken = set(await session.scalars(select(BlobMetadata.id).where(BlobMetadata.id.in_(ids))))
+                for metadata, quota, future in batch:
+                    if metadata.id in taken:
+                        _resolve(future, BlobAlreadyExistsError(f"Blob {metadata.id} already exists"))
+                        continue
+                    try:
+                        await charge_usage(session, metadata.tenant_id, metadata.size, 1, quota)
+                    except QuotaExceededError as e:
+                        _resolve(future, e)
+                        continue
+                    taken.add(metadata.id)
+                    session.add(metadata)
+                    accepted.append((metadata, quota, future))
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    # An ID was committed meanwhile outside this writer: commit the rows one by one instead.
+                    await session.rollback()
+                    await self._commit_each(session, accepted)
+                    return
+        except Exception as e:
+            for _, _, future in batch:
+                _resolve(future, e)
+            return
+        for _, _, future in accepted:
+            _resolve(future)
+
+    async def _commit_each(self, session, batch: list[tuple[BlobMetadata, int, asyncio.Future]]) -> None:
+        for metadata, quota, future in batch:
+            try:
+                await charge_usage(session, metadata.tenant_id, metadata.size, 1, quota)
+                session.add(metadata)
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                _resolve(future, BlobAlreadyExistsError(f"Blob {metadata.id} already exists"))
+            except Exception as e:
+                await session.rollback()
+                _resolve(future, e)
+            else:
+                _resolve(future)
+
+
+group_commit = GroupCommitWriter()
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, select, update
+
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.models.migration_checkpoint import MigrationCheckpoint
+from app.services.transfer import check_digest, write_stream
+from app.storage import create_recorded_backend
+from app.storage.base import StorageBackend
+from app.utils.exceptions import StorageBackendError
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class BlobMigrator:
+    """Moves every blob recorded on the ``source`` backend to the ``target`` backend.
+
+    Blobs are handled in pages in ID order, ``concurrency`` at a time, and the
+    copied bytes are throttled to ``bytes_per_second``. Each blob is read from
+    the source, checked against the size and checksum in its metadata, written
+    to the target (blobs larger than ``chunk_size`` are streamed through the
+    target's upload staging) and, with ``verify``, read back and checked
+    again. Only then is its metadata switched to the target, in a conditional
+    update: a blob deleted meanwhile is removed from the target instead.
+
+    An object the target already holds under the blob's key is never
+    overwritten. If no row references it and it matches the metadata, it is
+    a copy left by an interrupted run and is adopted; otherwise the blob
+    fails. A copy is only removed again while no row references its key, so
+    a blob re-created on the target during the copy is left alone.
+
+    After each page the position is saved in ``migration_checkpoints``, so an
+    interrupted run resumes where it stopped. Blobs that fail are skipped and
+    counted; once a run completes, the next one starts over and retries them.
+    The source copy is kept unless ``delete_source`` is set.
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        target_name: str,
+        concurrency: int = 4,
+        bytes_per_second: float = 0.0,
+        verify: bool = True,
+        delete_source: bool = False,
+        page_size: int = 100,
+        chunk_size: int = 8 * 1024 * 1024,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.source_name = source_name
+        self.target_name = target_name
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = TokenBucket(bytes_per_second, burst=chunk_size)
+        self.verify = verify
+        self.delete_source = delete_source
+        self.page_size = max(page_size, concurrency)
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+
+    @property
+    def checkpoint_id(self) -> str:
+        return f"{self.source_name}->{self.target_name}"
+
+    async def run(self) -> dict[str, int]:
+        async with self.session_factory() as session:
+            source = create_recorded_backend(self.source_name, session)
+            target = create_recorded_backend(self.target_name, session)
+            if target.holds(source.name):
+                raise StorageBackendError(f"{self.source_name} and {self.target_name} are the same backend")
+            self.recorded_source = source.name
+
+            checkpoint = await session.get(MigrationCheckpoint, self.checkpoint_id)
+            if checkpoint is None or checkpoint.completed_at is not None:
+                if checkpoint is not None:
+                    await session.delete(checkpoint)
+                    await session.flush()
+                checkpoint = MigrationCheckpoint(id=self.checkpoint_id, migrated=0, failed=0, bytes_migrated=0)
+                session.add(checkpoint)
+                await session.commit()
+            elif checkpoint.cursor is not None:
+                logger.info("Resuming migration %s after blob %s", self.checkpoint_id, checkpoint.cursor)
+
+            while True:
+                query = (
+                    select(BlobMetadata.id)
+                    .where(BlobMetadata.storage_backend == self.recorded_source)
+                    .order_by(BlobMetadata.id)
+                    .limit(self.page_size)
+                )
+                if checkpoint.cursor is not None:
+                    query = query.where(BlobMetadata.id > checkpoint.cursor)
+                page = list(await session.scalars(query))
+                if not page:
+                    checkpoint.completed_at = datetime.now(timezone.utc)
+                    await session.commit()
+                    break
+
+                results = await asyncio.gather(*(self._migrate(blob_id) for blob_id in page))
+                sizes = [size for outcome, size in results if outcome == "migrated"]
+                checkpoint.cursor = page[-1]
+                checkpoint.migrated += len(sizes)
+                checkpoint.failed += sum(outcome == "failed" for outcome, _ in results)
+                checkpoint.bytes_migrated += sum(sizes)
+                checkpoint.updated_at = datetime.now(timezone.utc)
+                await session.commit()
+                logger.info(
+                    "Migration %s: %d migrated, %d failed, up to blob %s",
+                    self.checkpoint_id, checkpoint.migrated, checkpoint.failed, checkpoint.cursor,
+                )
+            return {
+                "migrated": checkpoint.migrated,
+                "failed": checkpoint.failed,
+                "bytes": checkpoint.bytes_migrated,
+            }
+
+    async def _migrate(self, blob_id: str) -> tuple[str, int]:
+        """Migrate one blob; returns ``("migrated", size)``, ``("skipped", 0)`` or ``("failed", 0)``."""
+        async with self.semaphore, self.session_factory() as session:
+            try:
+                size = await self._migrate_blob(session, blob_id)
+            except Exception:
+                await session.rollback()
+                logger.warning("Could not migrate blob %s", blob_id, exc_info=True)
+                return "failed", 0
+            return ("skipped", 0) if size is None else ("migrated", size)
+
+    async def _migrate_blob(self, session, blob_id: str) -> int | None:
+        """Migrate one blob and return its size, or None if there was nothing to move."""
+        metadata = await session.get(BlobMetadata, blob_id)
+        if metadata is None or metadata.storage_backend != self.recorded_source:
+            return None
+        source = create_recorded_backend(self.source_name, session)
+        target = create_recorded_backend(self.target_name, session)
+
+        if await target.exists(blob_id):
+            if await self._referenced(session, target, blob_id) or metadata.checksum is None:
+                raise StorageBackendError(f"{self.target_name} already holds blob {blob_id}")
+            # Left by an interrupted run: adopted if intact, not written over.
+            await self._check(target, blob_id, metadata.size, metadata.checksum)
+            checksum = metadata.checksum
+            copied = False
+        else:
+            checksum = await self._copy(blob_id, metadata, source, target)
+            copied = True
+            if self.verify:
+                try:
+                    await self._check(target, blob_id, metadata.size, checksum)
+                except Exception:
+                    await self._discard(session, target, blob_id)
+                    raise
+
+        result = await session.execute(
+            update(BlobMetadata)
+            .where(BlobMetadata.id == blob_id, BlobMetadata.storage_backend == self.recorded_source)
+            .values(storage_backend=target.name, storage_path=target.storage_key(blob_id), checksum=checksum)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        if result.rowcount != 1:
+            # Deleted (or moved) while it was being copied.
+            if copied:
+                await self._discard(session, target, blob_id)
+            return None
+        if self.delete_source:
+            try:
+                await source.delete(blob_id)
+            except Exception:
+                logger.warning("Could not remove migrated blob %s from %s", blob_id, self.source_name, exc_info=True)
+        return metadata.size
+
+    async def _copy(self, blob_id: str, metadata: BlobMetadata, source: StorageBackend, target: StorageBackend) -> str:
+        """Copy the blob and return its checksum, once it has been checked against the metadata."""
+
+        async def throttled() -> AsyncIterator[bytes]:
+            async for chunk in source.retrieve_stream(blob_id, self.chunk_size):
+                await self.limiter.acquire(len(chunk))
+                yield chunk
+
+        return await write_stream(
+            target, blob_id, throttled(), metadata.size, metadata.checksum, self.chunk_size, exclusive=True
+        )
+
+    async def _referenced(self, session, target: StorageBackend, blob_id: str) -> bool:
+        """Whether a row records the target object under the blob's key as its data."""
+        key = target.storage_key(blob_id)
+        row = await session.scalar(
+            select(BlobMetadata.id)
+            .where(
+                BlobMetadata.storage_backend == target.name,
+                or_(BlobMetadata.id == blob_id, BlobMetadata.storage_path == key),
+            )
+            .limit(1)
+        )
+        return row is not None
+
+    async def _discard(self, session, target: StorageBackend, blob_id: str) -> None:
+        """Remove a copy that was not recorded, unless a row has come to reference its key."""
+        if await self._referenced(session, target, blob_id):
+            logger.warning("Keeping %s copy of blob %s: it is in use", self.target_name, blob_id)
+            return
+        await target.delete(blob_id)
+
+    async def _check(self, target: StorageBackend, blob_id: str, size: int, checksum: str) -> None:
+        digest = hashlib.sha256()
+        read = 0
+        async for chunk in target.retrieve_stream(blob_id, self.chunk_size):
+            digest.update(chunk)
+            read += len(chunk)
+        check_digest(blob_id, read, size, digest.hexdigest(), checksum)
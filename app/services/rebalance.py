@@ -0,0 +1,146 @@
+import fcntl
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import or_, select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.storage.local import STAGING_DIR, LocalStorageBackend
+from app.storage.multi_volume import MultiVolumeStorageBackend, parse_volumes
+from app.utils.exceptions import BlobAlreadyExistsError, BlobNotFoundError, SimpleDriveError
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class VolumeRebalancer:
+    """Moves blobs that are not on the volume the ring assigns them to.
+
+    After a volume is added, only the blobs it takes over are misplaced; each
+    pass walks every volume's directory and moves those. A blob is copied
+    through the target volume's staging area and linked into place, so
+    readers never see a partial copy, and only then removed from its old
+    volume. Copies are throttled to ``bytes_per_second`` so that moving does
+    not starve client I/O.
+
+    Every worker process runs the rebalancer, but a pass only proceeds while
+    holding a lock file on the first volume, so one process at a time moves
+    blobs. Whether a blob still exists is decided by its metadata row: a copy
+    of a blob deleted meanwhile is removed again, and a file without metadata
+    is left where it is for the reconciler. A copy is only put in place while
+    the row's checksum and creation time are those read before copying, and
+    never over an existing file, so a blob deleted and re-created under the
+    same ID during the move keeps its new data.
+    """
+
+    def __init__(
+        self,
+        backend: MultiVolumeStorageBackend,
+        bytes_per_second: float = 0.0,
+        chunk_size: int = 1024 * 1024,
+        page_size: int = 1000,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.backend = backend
+        self.limiter = TokenBucket(bytes_per_second, burst=chunk_size)
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.session_factory = session_factory
+
+    async def run_once(self) -> dict[str, int]:
+        report = {"checked": 0, "moved": 0, "bytes": 0, "failed": 0}
+        lock_path = Path(min(self.backend.volumes)) / STAGING_DIR / "rebalance.lock"
+        lock_path.parent.mkdir(exist_ok=True)
+        with open(lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("Volume rebalance is already running in another process")
+                return report
+            await self._run(report)
+        return report
+
+    async def _run(self, report: dict[str, int]) -> None:
+        for path, volume in self.backend.volumes.items():
+            async for page in volume.list_blobs(self.page_size):
+                for stored in page:
+                    report["checked"] += 1
+                    target = self.backend.volume(stored.key)
+                    if target is volume:
+                        continue
+                    recorded = await self._recorded(stored.key)
+                    if recorded is None:
+                        continue
+                    try:
+                        moved = await self._move(stored.key, volume, target, recorded)
+                    except SimpleDriveError:
+                        report["failed"] += 1
+                        logger.warning("Could not move %s from volume %s", stored.key, path, exc_info=True)
+                        continue
+                    report["moved"] += 1
+                    report["bytes"] += moved
+
+    async def _move(
+        self,
+        key: str,
+        source: LocalStorageBackend,
+        target: LocalStorageBackend,
+        recorded: tuple[str | None, datetime],
+    ) -> int:
+        upload_id = await target.begin_staged(key)
+        size = 0
+        try:
+            async for chunk in source.retrieve_stream(key, self.chunk_size):
+                await self.limiter.acquire(len(chunk))
+                await target.stage_part(key, upload_id, 0, size, chunk)
+                size += len(chunk)
+            if await self._recorded(key) != recorded:
+                raise BlobNotFoundError(f"Blob {key} was deleted or replaced while being moved")
+            await target.commit_staged_exclusive(key, upload_id)
+        except BlobAlreadyExistsError:
+            await target.abort_staged(key, upload_id, [])
+            if not await self._holds(target, key, recorded):
+                raise
+            # Moved by an earlier pass that was interrupted before removing the old copy.
+            await source.delete(key)
+            return 0
+        except BaseException:
+            await target.abort_staged(key, upload_id, [])
+            raise
+        if await self._recorded(key) is None:
+            # Deleted while being copied: the copy must not outlive it.
+            await target.delete(key)
+            raise BlobNotFoundError(f"Blob {key} was deleted while being moved")
+        await source.delete(key)
+        return size
+
+    async def _holds(self, volume: LocalStorageBackend, key: str, recorded: tuple[str | None, datetime]) -> bool:
+        """Whether ``volume`` holds the recorded blob under ``key``, by its checksum."""
+        checksum, _ = recorded
+        if checksum is None:
+            return False
+        digest = hashlib.sha256()
+        async for chunk in volume.retrieve_stream(key, self.chunk_size):
+            digest.update(chunk)
+        return digest.hexdigest() == checksum
+
+    async def _recorded(self, key: str) -> tuple[str | None, datetime] | None:
+        """The checksum and creation time of the blob stored under ``key``, or None if it has no row."""
+        # Older rows recorded the blob ID rather than the key as storage_path; both equal the key for most IDs.
+        async with self.session_factory() as session:
+            found = (await session.execute(
+                select(BlobMetadata.checksum, BlobMetadata.created_at)
+                .where(BlobMetadata.storage_backend == self.backend.name)
+                .where(or_(BlobMetadata.storage_path == key, BlobMetadata.id == key))
+                .limit(1)
+            )).first()
+        return None if found is None else tuple(found)
+
+
+async def run_volume_rebalance() -> dict[str, int]:
+    backend = MultiVolumeStorageBackend(parse_volumes(settings.local_storage_volumes), settings.local_volume_threads)
+    return await VolumeRebalancer(backend, settings.local_rebalance_rate).run_once()
@@ -0,0 +1,182 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.services.usage import charge_usage
+from app.storage import create_storage_backend
+from app.storage.base import STAGING_PREFIX, StorageBackend, StoredObject
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.metrics import reconcile_findings
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class Reconciler:
+    """Finds objects without metadata (orphans) and metadata without objects
+    (dangling rows) for one backend.
+
+    The backend inventory and ``blob_metadata`` are both walked one page at a
+    time, so memory use is bounded by ``page_size``. Every backend request and
+    every metadata page costs one token of ``limiter``. With ``repair`` set,
+    orphans are deleted and dangling rows removed, but only when they are older
+    than ``grace_period``: a blob is stored before its metadata is committed,
+    so a fresh orphan may be an upload still in flight.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        db_session: AsyncSession,
+        limiter: TokenBucket,
+        repair: bool = False,
+        grace_period: float = 3600.0,
+        page_size: int = 500,
+        max_examples: int = 20,
+    ):
+        self.backend = backend
+        self.db_session = db_session
+        self.limiter = limiter
+        self.repair = repair
+        self.grace_period = timedelta(seconds=grace_period)
+        self.page_size = page_size
+        self.max_examples = max_examples
+
+    async def run_once(self) -> dict:
+        self.cutoff = datetime.now(timezone.utc) - self.grace_period
+        self.report = {
+            "objects": 0,
+            "rows": 0,
+            "orphans": 0,
+            "dangling": 0,
+            "repaired": 0,
+            "examples": {"orphans": [], "dangling": []},
+        }
+        await self._find_orphans()
+        await self._find_dangling()
+        if self.report["orphans"] or self.report["dangling"]:
+            logger.warning("Reconciliation of %s backend found inconsistencies: %s", self.backend.name, self.report)
+        return self.report
+
+    def _old_enough(self, timestamp: datetime | None) -> bool:
+        if timestamp is None:
+            return False
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp < self.cutoff
+
+    def _record(self, kind: str, key: str, repaired: bool) -> None:
+        self.report[kind] += 1
+        self.report["repaired"] += repaired
+        examples = self.report["examples"][kind]
+        if len(examples) < self.max_examples:
+            examples.append(key)
+        reconcile_findings.inc(self.backend.name, kind, "repaired" if repaired else "reported")
+
+    async def _confirm_missing(self, key: str) -> bool:
+        # Some backends answer exists() with False on transport errors; a HEAD,
+        # or else the first chunk of a read, tells a missing object apart from
+        # an unreachable one without downloading it.
+        await self.limiter.acquire()
+        try:
+            try:
+                await self.backend.stat(key)
+            except NotImplementedError:
+                chunks = self.backend.retrieve_stream(key, 1)
+                try:
+                    await anext(chunks, None)
+                finally:
+                    await chunks.aclose()
+        except BlobNotFoundError:
+            return True
+        except StorageBackendError:
+            logger.warning("Could not confirm that %s is missing from %s", key, self.backend.name, exc_info=True)
+        return False
+
+    async def _find_orphans(self) -> None:
+        await self.limiter.acquire()
+        async for page in self.backend.list_blobs(self.page_size):
+            self.report["objects"] += len(page)
+            # Staged parts of resumable uploads are removed when their session ends.
+            page = [stored for stored in page if not stored.key.startswith(STAGING_PREFIX)]
+            for stored in await self._without_metadata(page):
+                repaired = False
+                if self.repair and self._old_enough(stored.modified_at):
+                    await self.limiter.acquire()
+                    await self.backend.delete(stored.key)
+                    repaired = True
+                self._record("orphans", stored.key, repaired)
+            await self.limiter.acquire()
+
+    async def _without_metadata(self, page: list[StoredObject]) -> list[StoredObject]:
+        keys = [stored.key for stored in page]
+        known = set(await self.db_session.scalars(select(BlobMetadata.id).where(BlobMetadata.id.in_(keys))))
+        candidates = [key for key in keys if key not in known]
+        if candidates:
+            # Backends that rewrite IDs into keys record the key in storage_path.
+            known.update(await self.db_session.scalars(
+                select(BlobMetadata.storage_path).where(BlobMetadata.storage_path.in_(candidates))
+            ))
+        return [stored for stored in page if stored.key not in known]
+
+    async def _find_dangling(self) -> None:
+        cursor = None
+        while True:
+            await self.limiter.acquire()
+            query = (
+                select(BlobMetadata)
+                .where(BlobMetadata.storage_backend == self.backend.name)
+                .order_by(BlobMetadata.id)
+                .limit(self.page_size)
+            )
+            if cursor is not None:
+                query = query.where(BlobMetadata.id > cursor)
+            rows = list(await self.db_session.scalars(query))
+            if not rows:
+                return
+            self.report["rows"] += len(rows)
+
+            remove = []
+            for metadata in rows:
+                await self.limiter.acquire()
+                # The recorded key, for blob IDs the backend maps to a different key than it does today.
+                key = metadata.storage_path or metadata.id
+                try:
+                    if await self.backend.exists(key) or not await self._confirm_missing(key):
+                        continue
+                except StorageBackendError:
+                    logger.warning("Could not check %s on %s", key, self.backend.name, exc_info=True)
+                    continue
+                repaired = self.repair and self._old_enough(metadata.created_at)
+                if repaired:
+                    remove.append(metadata.id)
+                    await charge_usage(self.db_session, metadata.tenant_id, -metadata.size, -1)
+                self._record("dangling", metadata.id, repaired)
+            if remove:
+                await self.db_session.execute(delete(BlobMetadata).where(BlobMetadata.id.in_(remove)))
+                await self.db_session.commit()
+
+            if len(rows) < self.page_size:
+                return
+            cursor = rows[-1].id
+            # Rows of this page are no longer needed; keep the identity map from growing.
+            self.db_session.expunge_all()
+
+
+async def run_reconciliation() -> dict:
+    async with AsyncSessionLocal() as session:
+        backend = create_storage_backend(settings.reconcile_backend or settings.storage_backend, session)
+        reconciler = Reconciler(
+            backend,
+            session,
+            TokenBucket(settings.reconcile_io_rate),
+            repair=settings.reconcile_repair,
+            grace_period=settings.reconcile_grace_period,
+            page_size=settings.reconcile_page_size,
+        )
+        return await reconciler.run_once()
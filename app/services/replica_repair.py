@@ -0,0 +1,66 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.storage import create_storage_backend
+from app.storage.replicated import ReplicatedStorageBackend, pending_repairs
+from app.utils.exceptions import SimpleDriveError
+
+
+class ReplicaRepairer:
+    """Fills in missing replicas.
+
+    Each pass first repairs blobs flagged by failed writes or read misses, then
+    checks the next page of ``blob_metadata`` so that every blob is eventually
+    verified even if the process restarted and lost its queue.
+    """
+
+    def __init__(
+        self,
+        backend: ReplicatedStorageBackend,
+        db_session: AsyncSession,
+        batch_size: int | None = None,
+        cursor: str | None = None,
+    ):
+        self.backend = backend
+        self.db_session = db_session
+        self.batch_size = batch_size or settings.replica_repair_batch_size
+        self.cursor = cursor
+
+    async def run_once(self) -> dict[str, int]:
+        queued = list(pending_repairs)
+        pending_repairs.difference_update(queued)
+        copies = await self._repair(queued)
+
+        query = select(BlobMetadata.id).order_by(BlobMetadata.id).limit(self.batch_size)
+        if self.cursor is not None:
+            query = query.where(BlobMetadata.id > self.cursor)
+        page = list(await self.db_session.scalars(query))
+        self.cursor = page[-1] if len(page) == self.batch_size else None
+        copies += await self._repair(page)
+
+        return {"checked": len(queued) + len(page), "copies": copies}
+
+    async def _repair(self, blob_ids: list[str]) -> int:
+        copies = 0
+        for blob_id in blob_ids:
+            try:
+                copies += await self.backend.repair(blob_id)
+            except SimpleDriveError:
+                pending_repairs.add(blob_id)
+        return copies
+
+
+_sweep_cursor: str | None = None
+
+
+async def run_replica_repair() -> dict[str, int]:
+    global _sweep_cursor
+    async with AsyncSessionLocal() as session:
+        backend = create_storage_backend("replicated", session)
+        repairer = ReplicaRepairer(backend, session, cursor=_sweep_cursor)
+        result = await repairer.run_once()
+        _sweep_cursor = repairer.cursor
+        return result
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.storage import create_storage_backend
+from app.storage.tiered import TieredStorageBackend
+from app.utils.exceptions import SimpleDriveError
+
+
+class TierMigrator:
+    """Moves blobs between the hot and cold tier of a ``TieredStorageBackend``.
+
+    Each pass persists the access times collected since the previous pass,
+    demotes hot blobs that went unread for too long or are too large, and
+    promotes cold blobs that were read repeatedly.
+    """
+
+    def __init__(
+        self,
+        backend: TieredStorageBackend,
+        db_session: AsyncSession,
+        demote_after: timedelta | None = None,
+        hot_max_size: int | None = None,
+        promote_after_reads: int | None = None,
+        batch_size: int | None = None,
+    ):
+        self.backend = backend
+        self.db_session = db_session
+        self.demote_after = demote_after or timedelta(seconds=settings.tier_demote_after_seconds)
+        self.hot_max_size = hot_max_size if hot_max_size is not None else settings.tier_hot_max_size
+        self.promote_after_reads = promote_after_reads or settings.tier_promote_after_reads
+        self.batch_size = batch_size or settings.tier_migration_batch_size
+
+    async def run_once(self) -> dict[str, int]:
+        last_access, cold_reads = self.backend.tracker.drain()
+        await self._flush_access_times(last_access)
+        demoted = await self._demote()
+        promoted = await self._promote(cold_reads)
+        return {"demoted": demoted, "promoted": promoted}
+
+    async def _flush_access_times(self, last_access: dict[str, datetime]) -> None:
+        if not last_access:
+            return
+        ids = list(last_access)
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start:start + self.batch_size]
+            known = await self.db_session.scalars(select(BlobMetadata.id).where(BlobMetadata.id.in_(chunk)))
+            rows = [{"id": blob_id, "last_accessed_at": last_access[blob_id]} for blob_id in known]
+            if rows:
+                await self.db_session.execute(update(BlobMetadata), rows)
+        await self.db_session.commit()
+
+    async def _demote(self) -> int:
+        cutoff = datetime.now(timezone.utc) - self.demote_after
+        result = await self.db_session.scalars(
+            select(BlobMetadata)
+            .where(BlobMetadata.storage_backend == self.backend.hot.name)
+            .where(or_(
+                func.coalesce(BlobMetadata.last_accessed_at, BlobMetadata.created_at) < cutoff,
+                BlobMetadata.size > self.hot_max_size,
+            ))
+            .limit(self.batch_size)
+        )
+        demoted = 0
+        for metadata in result.all():
+            try:
+                await self.backend.demote(metadata.id)
+                metadata.storage_backend = self.backend.cold.name
+                await self.db_session.commit()
+                await self.backend.hot.delete(metadata.id)
+            except SimpleDriveError:
+                await self.db_session.rollback()
+                continue
+            demoted += 1
+        return demoted
+
+    async def _promote(self, cold_reads: dict[str, int]) -> int:
+        candidates = [blob_id for blob_id, reads in cold_reads.items() if reads >= self.promote_after_reads]
+        promoted = 0
+        for start in range(0, len(candidates), self.batch_size):
+            result = await self.db_session.scalars(
+                select(BlobMetadata)
+                .where(BlobMetadata.id.in_(candidates[start:start + self.batch_size]))
+                .where(BlobMetadata.storage_backend == self.backend.cold.name)
+                .where(BlobMetadata.size <= self.hot_max_size)
+            )
+            for metadata in result.all():
+                try:
+                    await self.backend.promote(metadata.id)
+                    metadata.storage_backend = self.backend.hot.name
+                    metadata.last_accessed_at = datetime.now(timezone.utc)
+                    await self.db_session.commit()
+                    await self.backend.cold.delete(metadata.id)
+                except SimpleDriveError:
+                    await self.db_session.rollback()
+                    continue
+                promoted += 1
+        return promoted
+
+
+async def run_tier_migration() -> dict[str, int]:
+    async with AsyncSessionLocal() as session:
+        backend = create_storage_backend("tiered", session)
+        return await TierMigrator(backend, session).run_once()
@@ -0,0 +1,76 @@
+import hashlib
+from collections.abc import AsyncIterator
+
+from app.storage.base import StorageBackend
+from app.utils.exceptions import BlobAlreadyExistsError, ChecksumMismatchError
+
+
+async def rechunk(chunks: AsyncIterator[bytes], size: int) -> AsyncIterator[bytes]:
+    """Chunks of exactly ``size`` bytes, except the last: staged parts must be equal-sized."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def check_digest(blob_id: str, received: int, size: int, actual: str, checksum: str | None) -> None:
+    if received != size:
+        raise ChecksumMismatchError(f"Blob {blob_id} has {received} bytes, expected {size}")
+    if checksum is not None and actual != checksum:
+        raise ChecksumMismatchError(f"Blob {blob_id} is corrupt: expected sha256 {checksum}, got {actual}")
+
+
+async def write_stream(
+    backend: StorageBackend,
+    blob_id: str,
+    chunks: AsyncIterator[bytes],
+    size: int,
+    checksum: str | None = None,
+    chunk_size: int = 8 * 1024 * 1024,
+    exclusive: bool = False,
+) -> str:
+    """Store the ``size`` bytes of ``chunks`` as ``blob_id`` and return their checksum.
+
+    The data is checked against ``size`` and, if given, ``checksum`` before
+    it becomes visible in the backend. Blobs larger than ``chunk_size`` are
+    written through the backend's upload staging, one chunk at a time. With
+    ``exclusive``, an object written under the same key meanwhile is not
+    replaced: the write fails with ``BlobAlreadyExistsError`` instead.
+    """
+    digest = hashlib.sha256()
+    if size <= chunk_size:
+        data = b"".join([chunk async for chunk in chunks])
+        digest.update(data)
+        check_digest(blob_id, len(data), size, digest.hexdigest(), checksum)
+        if exclusive:
+            await _ensure_absent(backend, blob_id)
+        await backend.store(blob_id, data, digest.hexdigest())
+        return digest.hexdigest()
+
+    upload_id = await backend.begin_staged(blob_id)
+    parts: list[tuple[int, str | None]] = []
+    received = 0
+    try:
+        async for chunk in rechunk(chunks, chunk_size):
+            digest.update(chunk)
+            part_number = len(parts)
+            parts.append((part_number, await backend.stage_part(blob_id, upload_id, part_number, received, chunk)))
+            received += len(chunk)
+        check_digest(blob_id, received, size, digest.hexdigest(), checksum)
+        if exclusive:
+            await _ensure_absent(backend, blob_id)
+        await backend.commit_staged(blob_id, upload_id, parts)
+    except BaseException:
+        await backend.abort_staged(blob_id, upload_id, [part_number for part_number, _ in parts])
+        raise
+    return digest.hexdigest()
+
+
+async def _ensure_absent(backend: StorageBackend, blob_id: str) -> None:
+    # Backends have no conditional write; checking last keeps the window to the write itself.
+    if await backend.exists(blob_id):
+        raise BlobAlreadyExistsError(f"{backend.name} already holds blob {blob_id}")
@@ -0,0 +1,190 @@
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.models.upload_session import UploadPart, UploadSession
+from app.services.blob_service import BlobService
+from app.storage import create_storage_backend
+from app.storage.base import StorageBackend
+from app.utils.auth import DEFAULT_TENANT
+from app.utils.exceptions import InvalidUploadError, UploadNotFoundError
+from app.utils.tracing import stage
+
+logger = logging.getLogger(__name__)
+
+
+def part_count(size: int, chunk_size: int) -> int:
+    # An empty blob is still uploaded as one (empty) part.
+    return max(1, -(-size // chunk_size))
+
+
+def received_ranges(session: UploadSession, parts: list[UploadPart]) -> list[tuple[int, int]]:
+    """Byte ranges ``[start, end)`` covered by the received parts, merged where contiguous."""
+    ranges: list[tuple[int, int]] = []
+    for part in sorted(parts, key=lambda part: part.part_number):
+        start = part.part_number * session.chunk_size
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], start + part.size)
+        else:
+            ranges.append((start, start + part.size))
+    return ranges
+
+
+class UploadService:
+    """Resumable uploads.
+
+    A session fixes the blob's size and chunk size. Parts are numbered from 0,
+    may arrive in any order and concurrently, and are staged in the storage
+    backend as they arrive; the session and its received parts are kept in the
+    metadata database, so a client can ask what arrived and resume after a
+    dropped connection. Committing assembles the staged parts into the blob
+    and records its metadata in one transaction with the session's removal.
+    """
+
+    def __init__(self, storage_backend: StorageBackend, db_session: AsyncSession):
+        self.storage_backend = storage_backend
+        self.db_session = db_session
+        self.blobs = BlobService(storage_backend, db_session)
+
+    async def create_session(
+        self, blob_id: str, size: int, chunk_size: int, tenant_id: str = DEFAULT_TENANT
+    ) -> UploadSession:
+        if not settings.upload_min_chunk_size <= chunk_size <= settings.upload_max_chunk_size:
+            raise InvalidUploadError(
+                f"Chunk size must be between {settings.upload_min_chunk_size} "
+                f"and {settings.upload_max_chunk_size} bytes"
+            )
+        if part_count(size, chunk_size) > settings.upload_max_parts:
+            raise InvalidUploadError(f"Uploads are limited to {settings.upload_max_parts} parts")
+        if self.storage_backend.assembles_in_memory and size > settings.upload_max_in_memory_size:
+            raise InvalidUploadError(
+                f"Uploads to the {self.storage_backend.name} backend are limited to "
+                f"{settings.upload_max_in_memory_size} bytes"
+            )
+        await self.blobs.ensure_new(blob_id)
+        await self.blobs.check_quota(tenant_id, size)
+
+        now = datetime.now(timezone.utc)
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            blob_id=blob_id,
+            tenant_id=tenant_id,
+            size=size,
+            chunk_size=chunk_size,
+            storage_backend=self.storage_backend.name,
+            backend_upload_id=await self.storage_backend.begin_staged(blob_id),
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.upload_session_ttl),
+        )
+        self.db_session.add(session)
+        await self.db_session.commit()
+        return session
+
+    async def get_session(self, session_id: str, tenant_id: str = DEFAULT_TENANT) -> UploadSession:
+        with stage("metadata_lookup"):
+            session = await self.db_session.get(UploadSession, session_id)
+        if session is None or session.tenant_id != tenant_id or _expired(session):
+            raise UploadNotFoundError(f"Upload {session_id} not found")
+        if session.storage_backend != self.storage_backend.name:
+            raise InvalidUploadError(f"Upload {session_id} was started on the {session.storage_backend} backend")
+        return session
+
+    async def get_parts(self, session: UploadSession) -> list[UploadPart]:
+        result = await self.db_session.scalars(
+            select(UploadPart).where(UploadPart.session_id == session.id).order_by(UploadPart.part_number)
+        )
+        return list(result)
+
+    async def put_part(self, session_id: str, part_number: int, data: bytes, tenant_id: str = DEFAULT_TENANT) -> None:
+        session = await self.get_session(session_id, tenant_id)
+        parts = part_count(session.size, session.chunk_size)
+        if not 0 <= part_number < parts:
+            raise InvalidUploadError(f"Part number must be between 0 and {parts - 1}")
+        offset = part_number * session.chunk_size
+        expected = min(session.chunk_size, session.size - offset)
+        if len(data) != expected:
+            raise InvalidUploadError(f"Part {part_number} must be {expected} bytes, got {len(data)}")
+
+        etag = await self.storage_backend.stage_part(
+            session.blob_id, session.backend_upload_id, part_number, offset, data
+        )
+        part = UploadPart(session_id=session.id, part_number=part_number, size=len(data), etag=etag)
+        try:
+            await self.db_session.merge(part)
+            await self.db_session.commit()
+        except IntegrityError:
+            # The same part was resent while the first copy was being recorded.
+            await self.db_session.rollback()
+            await self.db_session.merge(part)
+            await self.db_session.commit()
+
+    async def commit(self, session_id: str, tenant_id: str = DEFAULT_TENANT) -> BlobMetadata:
+        session = await self.get_session(session_id, tenant_id)
+        parts = await self.get_parts(session)
+        missing = sorted(set(range(part_count(session.size, session.chunk_size))) - {p.part_number for p in parts})
+        if missing:
+            raise InvalidUploadError(f"Upload {session_id} is missing parts {missing[:10]}")
+        await self.blobs.ensure_new(session.blob_id)
+        quota = await self.blobs.check_quota(tenant_id, session.size)
+
+        await self.storage_backend.commit_staged(
+            session.blob_id, session.backend_upload_id, [(part.part_number, part.etag) for part in parts]
+        )
+        await self._forget(session)
+        return await self.blobs.record_blob(session.blob_id, session.size, None, tenant_id, quota)
+
+    async def abort(self, session_id: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        session = await self.get_session(session_id, tenant_id)
+        await self._abort(session)
+
+    async def _abort(self, session: UploadSession) -> None:
+        parts = await self.get_parts(session)
+        await self.storage_backend.abort_staged(
+            session.blob_id, session.backend_upload_id, [part.part_number for part in parts]
+        )
+        await self._forget(session)
+        await self.db_session.commit()
+
+    async def _forget(self, session: UploadSession) -> None:
+        # Parts are deleted explicitly: SQLite does not enforce ON DELETE CASCADE by default.
+        await self.db_session.execute(delete(UploadPart).where(UploadPart.session_id == session.id))
+        await self.db_session.delete(session)
+
+    async def purge_expired(self, limit: int = 100) -> int:
+        """Abort sessions past their expiry on this backend, oldest first."""
+        session_ids = list(await self.db_session.scalars(
+            select(UploadSession.id)
+            .where(UploadSession.expires_at < datetime.now(timezone.utc))
+            .where(UploadSession.storage_backend == self.storage_backend.name)
+            .order_by(UploadSession.expires_at)
+            .limit(limit)
+        ))
+        purged = 0
+        for session_id in session_ids:
+            try:
+                await self._abort(await self.db_session.get(UploadSession, session_id))
+                purged += 1
+            except Exception:
+                await self.db_session.rollback()
+                logger.warning("Could not abort expired upload %s", session_id, exc_info=True)
+        return purged
+
+
+def _expired(session: UploadSession) -> bool:
+    expires_at = session.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+async def run_upload_cleanup() -> int:
+    async with AsyncSessionLocal() as session:
+        backend = create_storage_backend(settings.storage_backend, session)
+        return await UploadService(backend, session).purge_expired()
@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.blob_metadata import BlobMetadata
+from app.models.tenant_usage import TenantUsage
+from app.utils.exceptions import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def tenant_quota(tenant_id: str) -> int:
+    """Quota in bytes for ``tenant_id``; 0 means unlimited."""
+    return settings.tenant_quotas.get(tenant_id, settings.default_quota_bytes)
+
+
+async def _ensure_usage_row(session: AsyncSession, tenant_id: str) -> None:
+    values = {"tenant_id": tenant_id, "bytes_used": 0, "blob_count": 0, "updated_at": datetime.now(timezone.utc)}
+    insert = _INSERTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        await session.execute(insert(TenantUsage).values(**values).on_conflict_do_nothing())
+    else:
+        session.add(TenantUsage(**values))
+        await session.flush()
+
+
+async def charge_usage(session: AsyncSession, tenant_id: str, size: int, count: int, quota: int = 0) -> None:
+    """Add ``size`` bytes and ``count`` blobs to the tenant's usage in the session's transaction.
+
+    With a positive ``quota`` and ``size`` the update is conditional on the
+    result staying within the quota, so concurrent writers cannot overshoot it
+    together; ``QuotaExceededError`` is raised when it would not.
+    """
+    statement = (
+        update(TenantUsage)
+        .where(TenantUsage.tenant_id == tenant_id)
+        .values(
+            bytes_used=TenantUsage.bytes_used + size,
+            blob_count=TenantUsage.blob_count + count,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if quota > 0 and size > 0:
+        statement = statement.where(TenantUsage.bytes_used + size <= quota)
+
+    for first_attempt in (True, False):
+        result = await session.execute(statement)
+        if result.rowcount == 1:
+            return
+        if not first_attempt:
+            break
+        exists = await session.scalar(select(TenantUsage.tenant_id).where(TenantUsage.tenant_id == tenant_id))
+        if exists is not None:
+            break
+        # First write of this tenant: create its row, then apply the update to it.
+        await _ensure_usage_row(session, tenant_id)
+    raise QuotaExceededError(f"Storing {size} bytes would exceed the {quota} byte quota of tenant {tenant_id}")
+
+
+class UsageReconciler:
+    """Corrects drift between ``tenant_usage`` and the sums over ``blob_metadata``.
+
+    Usage is maintained incrementally, so drift only comes from writes that
+    bypassed ``BlobService`` (manual fixes, reconciler repairs, migrations).
+    Each drifting tenant is recomputed with a single UPDATE.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def run_once(self) -> dict[str, int]:
+        actual = {
+            tenant_id: (size, count)
+            for tenant_id, size, count in await self.db_session.execute(
+                select(BlobMetadata.tenant_id, func.coalesce(func.sum(BlobMetadata.size), 0), func.count())
+                .group_by(BlobMetadata.tenant_id)
+            )
+        }
+        recorded = {
+            tenant_id: (size, count)
+            for tenant_id, size, count in await self.db_session.execute(
+                select(TenantUsage.tenant_id, TenantUsage.bytes_used, TenantUsage.blob_count)
+            )
+        }
+
+        corrected = 0
+        for tenant_id in actual.keys() | recorded.keys():
+            if actual.get(tenant_id, (0, 0)) == recorded.get(tenant_id, (0, 0)):
+                continue
+            logger.warning(
+                "Usage of tenant %s drifted: recorded %s, actual %s",
+                tenant_id, recorded.get(tenant_id), actual.get(tenant_id, (0, 0)),
+            )
+            if tenant_id not in recorded:
+                await _ensure_usage_row(self.db_session, tenant_id)
+            blobs = select(BlobMetadata).where(BlobMetadata.tenant_id == tenant_id).subquery()
+            await self.db_session.execute(
+                update(TenantUsage)
+                .where(TenantUsage.tenant_id == tenant_id)
+                .values(
+                    bytes_used=select(func.coalesce(func.sum(blobs.c.size), 0)).scalar_subquery(),
+                    blob_count=select(func.count()).select_from(blobs).scalar_subquery(),
+                    updated_at=datetime.now(timezone.utc),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            corrected += 1
+        await self.db_session.commit()
+        return {"tenants": len(actual.keys() | recorded.keys()), "corrected": corrected}
+
+
+async def run_usage_reconciliation() -> dict[str, int]:
+    async with AsyncSessionLocal() as session:
+        return await UsageReconciler(session).run_once()
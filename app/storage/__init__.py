@@ -4,37 +4,130 @@ from app.config import settings
 from app.database import get_db
 from app.storage.base import StorageBackend
 from app.storage.database import DatabaseStorageBackend
+from app.storage.erasure import ErasureCodedStorageBackend
 from app.storage.ftp import FTPStorageBackend
+from app.storage.instrumented import InstrumentedStorageBackend
+from app.storage.limited import ConcurrencyLimitedStorageBackend
 from app.storage.local import LocalStorageBackend
+from app.storage.multi_volume import MultiVolumeStorageBackend, parse_volumes
+from app.storage.replicated import ReplicatedStorageBackend
+from app.storage.resilient import ResilientStorageBackend
 from app.storage.s3_compatible import S3CompatibleStorageBackend
+from app.storage.tiered import TieredStorageBackend
+from app.utils.admission import get_concurrency_limit
 from app.utils.exceptions import StorageBackendError
+from app.utils.resilience import RetryPolicy, get_circuit_breaker
 
+HOT_TIER_BACKENDS = ("local", "database")
+COLD_TIER_BACKENDS = ("s3", "ftp")
+# The database backend shares the request session, which cannot be used concurrently.
+REPLICA_BACKENDS = ("local", "s3", "ftp")
+SHARD_BACKENDS = REPLICA_BACKENDS
+# Names recorded in BlobMetadata.storage_backend that differ from the STORAGE_BACKEND value.
+RECORDED_NAMES = {"s3compatible": "s3"}
 
-async def get_storage_backend(db_session: AsyncSession) -> StorageBackend:
-    if settings.storage_backend == "local":
-        return LocalStorageBackend(settings.local_storage_path)
-    elif settings.storage_backend == "database":
-        return DatabaseStorageBackend(db_session)
-    elif settings.storage_backend == "s3":
+
+def _wrap(backend_name: str, backend: StorageBackend, breaker_key: str | None = None) -> StorageBackend:
+    if breaker_key is not None and settings.resilience_enabled:
+        backend = ResilientStorageBackend(
+            backend,
+            RetryPolicy(settings.retry_max_attempts, settings.retry_base_delay, settings.retry_max_delay),
+            get_circuit_breaker(breaker_key, settings.circuit_failure_threshold, settings.circuit_reset_timeout),
+        )
+    max_concurrency = getattr(settings, f"{backend_name}_max_concurrency")
+    if max_concurrency > 0:
+        # Outside the retry layer, so retries of one operation hold a single slot.
+        backend = ConcurrencyLimitedStorageBackend(
+            backend,
+            get_concurrency_limit(breaker_key or backend_name, max_concurrency),
+            settings.admission_retry_after,
+        )
+    if settings.metrics_enabled or settings.tracing_enabled:
+        backend = InstrumentedStorageBackend(backend, backend_name)
+    return backend
+
+
+def create_storage_backend(backend_name: str, db_session: AsyncSession) -> StorageBackend:
+    if backend_name == "local":
+        if settings.local_storage_volumes:
+            volumes = parse_volumes(settings.local_storage_volumes)
+            return _wrap(backend_name, MultiVolumeStorageBackend(volumes, settings.local_volume_threads))
+        return _wrap(backend_name, LocalStorageBackend(settings.local_storage_path))
+    elif backend_name == "database":
+        return _wrap(backend_name, DatabaseStorageBackend(db_session))
+    elif backend_name == "s3":
         if not all([settings.s3_endpoint_url, settings.s3_access_key_id, settings.s3_secret_access_key, settings.s3_bucket_name]):
             raise StorageBackendError("S3 configuration incomplete. Required: endpoint_url, access_key_id, secret_access_key, bucket_name")
-        return S3CompatibleStorageBackend(
+        backend = S3CompatibleStorageBackend(
             settings.s3_endpoint_url,
             settings.s3_bucket_name,
             settings.s3_access_key_id,
             settings.s3_secret_access_key,
             settings.s3_region,
+            connect_timeout=settings.s3_connect_timeout,
+            read_timeout=settings.s3_read_timeout,
+            hedge_reads=settings.hedge_remote_reads,
+            hedge_percentile=settings.hedge_percentile,
+            max_connections=settings.s3_max_connections,
+            presign_endpoint_url=settings.s3_presign_endpoint_url or None,
         )
-    elif settings.storage_backend == "ftp":
+        return _wrap(backend_name, backend, f"s3:{settings.s3_endpoint_url}/{settings.s3_bucket_name}")
+    elif backend_name == "ftp":
         if not settings.ftp_host:
             raise StorageBackendError("FTP configuration incomplete. Required: ftp_host")
-        return FTPStorageBackend(
+        backend = FTPStorageBackend(
             settings.ftp_host,
             settings.ftp_port,
             settings.ftp_username,
             settings.ftp_password,
             settings.ftp_base_dir,
+            connect_timeout=settings.ftp_connect_timeout,
+            read_timeout=settings.ftp_read_timeout,
+            hedge_reads=settings.hedge_remote_reads,
+            hedge_percentile=settings.hedge_percentile,
+        )
+        return _wrap(backend_name, backend, f"ftp:{settings.ftp_host}:{settings.ftp_port}")
+    elif backend_name == "tiered":
+        if settings.tier_hot_backend not in HOT_TIER_BACKENDS:
+            raise StorageBackendError(f"Hot tier must be one of {HOT_TIER_BACKENDS}, got: {settings.tier_hot_backend}")
+        if settings.tier_cold_backend not in COLD_TIER_BACKENDS:
+            raise StorageBackendError(f"Cold tier must be one of {COLD_TIER_BACKENDS}, got: {settings.tier_cold_backend}")
+        return TieredStorageBackend(
+            create_storage_backend(settings.tier_hot_backend, db_session),
+            create_storage_backend(settings.tier_cold_backend, db_session),
+        )
+    elif backend_name == "replicated":
+        replica_names = [name.strip() for name in settings.replica_backends.split(",") if name.strip()]
+        if len(replica_names) < 2:
+            raise StorageBackendError("Replicated storage requires at least two REPLICA_BACKENDS")
+        for name in replica_names:
+            if name not in REPLICA_BACKENDS:
+                raise StorageBackendError(f"Replica backend must be one of {REPLICA_BACKENDS}, got: {name}")
+        return ReplicatedStorageBackend(
+            {name: create_storage_backend(name, db_session) for name in replica_names},
+            settings.replica_write_quorum,
+            settings.replica_hedge_percentile,
+        )
+    elif backend_name == "erasure":
+        shard_names = [name.strip() for name in settings.erasure_backends.split(",") if name.strip()]
+        if not shard_names:
+            raise StorageBackendError("Erasure-coded storage requires ERASURE_BACKENDS")
+        for name in shard_names:
+            if name not in SHARD_BACKENDS:
+                raise StorageBackendError(f"Shard backend must be one of {SHARD_BACKENDS}, got: {name}")
+        return ErasureCodedStorageBackend(
+            {name: create_storage_backend(name, db_session) for name in shard_names},
+            settings.erasure_data_shards,
+            settings.erasure_parity_shards,
         )
     else:
-        raise StorageBackendError(f"Unknown storage backend: {settings.storage_backend}")
+        raise StorageBackendError(f"Unknown storage backend: {backend_name}")
+
 
+def create_recorded_backend(recorded_name: str, db_session: AsyncSession) -> StorageBackend:
+    """The backend for blobs whose metadata records ``recorded_name``."""
+    return create_storage_backend(RECORDED_NAMES.get(recorded_name, recorded_name), db_session)
+
+
+async def get_storage_backend(db_session: AsyncSession) -> StorageBackend:
+    return create_storage_backend(settings.storage_backend, db_session)
@@ -1,15 +1,58 @@
+import uuid
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+# Key prefix of parts staged by the default upload staging.
+STAGING_PREFIX = ".uploads/"
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    """One entry of a backend inventory, keyed by ``StorageBackend.storage_key``."""
+
+    key: str
+    size: int | None = None
+    modified_at: datetime | None = None
+    checksum: str | None = None
 
 
 class StorageBackend(ABC):
+    @property
+    def name(self) -> str:
+        """Identifier recorded in ``BlobMetadata.storage_backend``."""
+        return self.__class__.__name__.replace("StorageBackend", "").lower()
+
+    def storage_key(self, blob_id: str) -> str:
+        """Key under which ``blob_id`` appears in the backend inventory."""
+        return blob_id
+
+    def holds(self, backend_name: str) -> bool:
+        """Whether blobs recorded with ``backend_name`` in their metadata are read through this backend."""
+        return backend_name == self.name
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        """Whether ``commit_staged`` joins the staged parts in memory, as the default does."""
+        return True
+
     @abstractmethod
-    async def store(self, blob_id: str, data: bytes) -> None:
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        """``checksum`` is the hex SHA-256 of ``data`` when the caller has already computed it."""
         pass
 
     @abstractmethod
     async def retrieve(self, blob_id: str) -> bytes:
         pass
 
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        """Stream the data of ``blob_id`` in chunks of at most ``chunk_size`` bytes.
+
+        The default reads the blob whole; backends that can read incrementally override it.
+        """
+        yield await self.retrieve(blob_id)
+
     @abstractmethod
     async def exists(self, blob_id: str) -> bool:
         pass
@@ -17,3 +60,46 @@ class StorageBackend(ABC):
     async def delete(self, blob_id: str) -> None:
         raise NotImplementedError("Delete operation not supported")
 
+    def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        """Stream the backend inventory in pages of at most ``page_size`` objects."""
+        raise NotImplementedError("Inventory listing not supported")
+
+    def presign(self, method: str, blob_id: str, expires_in: int, headers: dict[str, str] | None = None) -> str:
+        """Time-limited URL through which clients transfer ``blob_id`` without the API.
+
+        ``headers`` are signed into the URL and must be sent unchanged with the request.
+        """
+        raise NotImplementedError("Presigned URLs not supported")
+
+    async def stat(self, blob_id: str) -> StoredObject:
+        """Size and, when the backend keeps one, hex SHA-256 of the object behind ``blob_id``."""
+        raise NotImplementedError("Object metadata lookup not supported")
+
+    async def begin_staged(self, blob_id: str) -> str:
+        """Start staging parts of ``blob_id`` and return the backend's handle for the upload.
+
+        By default each part is stored as an object under ``STAGING_PREFIX``
+        and the parts are joined in memory on commit, so callers must bound
+        the blob size; backends that can assemble in place override the
+        staging methods and ``assembles_in_memory``.
+        """
+        return uuid.uuid4().hex
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        """Stage one part, which starts at byte ``offset`` of the blob.
+
+        Returns the token ``commit_staged`` needs for the part, if any.
+        """
+        await self.store(f"{STAGING_PREFIX}{upload_id}/{part_number}", data)
+        return None
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        """Assemble ``parts``, given in order as ``(part_number, token)``, into ``blob_id``."""
+        chunks = [await self.retrieve(f"{STAGING_PREFIX}{upload_id}/{number}") for number, _ in parts]
+        await self.store(blob_id, b"".join(chunks))
+        await self.abort_staged(blob_id, upload_id, [number for number, _ in parts])
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        """Discard the staged parts of an upload."""
+        for number in part_numbers:
+            await self.delete(f"{STAGING_PREFIX}{upload_id}/{number}")
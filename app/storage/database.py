@@ -1,8 +1,10 @@
+from collections.abc import AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.models.blob_data import BlobData
-from app.storage.base import StorageBackend
+from app.storage.base import StorageBackend, StoredObject
 from app.utils.exceptions import BlobNotFoundError, StorageBackendError
 
 
@@ -10,7 +12,7 @@ class DatabaseStorageBackend(StorageBackend):
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def store(self, blob_id: str, data: bytes) -> None:
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
         try:
             blob_data = BlobData(id=blob_id, data=data)
             self.db_session.add(blob_data)
@@ -47,3 +49,23 @@ class DatabaseStorageBackend(StorageBackend):
             await self.db_session.rollback()
             raise StorageBackendError(f"Failed to delete blob: {str(e)}") from e
 
+    async def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        cursor = None
+        while True:
+            query = (
+                select(BlobData.id, func.length(BlobData.data), BlobData.created_at)
+                .order_by(BlobData.id)
+                .limit(page_size)
+            )
+            if cursor is not None:
+                query = query.where(BlobData.id > cursor)
+            try:
+                rows = (await self.db_session.execute(query)).all()
+            except Exception as e:
+                raise StorageBackendError(f"Failed to list blobs: {str(e)}") from e
+            if not rows:
+                return
+            yield [StoredObject(blob_id, size, created_at) for blob_id, size, created_at in rows]
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1][0]
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import struct
+import zlib
+
+import numpy as np
+
+from app.storage.base import StorageBackend
+from app.utils.erasure import ReedSolomon
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.offload import offloader
+
+logger = logging.getLogger(__name__)
+
+# Magic, data shards, parity shards, shard index, blob size, CRC-32 of the shard.
+_HEADER = struct.Struct("<4sBBBQI")
+_MAGIC = b"SDEC"
+
+
+class ErasureCodedStorageBackend(StorageBackend):
+    """Splits every blob into ``data_shards`` data and ``parity_shards``
+    parity shards (Reed–Solomon) and stores them across ``backends``.
+
+    Storage costs ``(data_shards + parity_shards) / data_shards`` times the
+    blob size, and a blob can be read as long as any ``data_shards`` of its
+    shards can. Shards are assigned to backends round robin, starting at a
+    position derived from the blob ID so that load is spread evenly. Reads
+    fetch the data shards and only fall back to parity shards, and decoding,
+    when some are missing or corrupt. Every shard carries the blob size and a
+    CRC-32 of its content.
+
+    No backend may hold more shards of a blob than there are parity shards,
+    so that the loss of any one backend leaves every blob readable.
+
+    Writes succeed only once every shard is stored; shards lost afterwards
+    are not rewritten, so reads are degraded until the blob is written again.
+    """
+
+    def __init__(self, backends: dict[str, StorageBackend], data_shards: int, parity_shards: int):
+        if not backends:
+            raise StorageBackendError("Erasure coding requires at least one backend")
+        try:
+            self.codec = ReedSolomon(data_shards, parity_shards)
+        except ValueError as e:
+            raise StorageBackendError(str(e)) from e
+        per_backend = -(-self.codec.total_shards // len(backends))
+        if per_backend > parity_shards:
+            raise StorageBackendError(
+                f"With {len(backends)} backends, one holds up to {per_backend} of the {self.codec.total_shards} "
+                f"shards of a blob, more than the {parity_shards} parity shards: losing it would lose data"
+            )
+        self.backends = backends
+
+    @property
+    def name(self) -> str:
+        return "erasure"
+
+    def _shard_key(self, blob_id: str, index: int) -> str:
+        return f"{blob_id}.shard{index}"
+
+    def _placement(self, blob_id: str) -> list[tuple[int, StorageBackend]]:
+        backends = list(self.backends.values())
+        start = zlib.crc32(blob_id.encode()) % len(backends)
+        return [(index, backends[(start + index) % len(backends)]) for index in range(self.codec.total_shards)]
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        shards = await offloader.run(len(data), self.codec.encode, data)
+        codec = self.codec
+
+        async def store_shard(index: int, backend: StorageBackend) -> None:
+            payload = shards[index].tobytes()
+            header = _HEADER.pack(
+                _MAGIC, codec.data_shards, codec.parity_shards, index, len(data), zlib.crc32(payload)
+            )
+            await backend.store(self._shard_key(blob_id, index), header + payload)
+
+        results = await asyncio.gather(
+            *(store_shard(index, backend) for index, backend in self._placement(blob_id)),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self._delete_shards(blob_id)
+            raise StorageBackendError(
+                f"Stored {len(results) - len(errors)} of {len(results)} shards of blob {blob_id}: {errors[0]}"
+            ) from errors[0]
+
+    async def _fetch(
+        self, blob_id: str, placement: list[tuple[int, StorageBackend]]
+    ) -> tuple[dict[int, np.ndarray], int | None, list[BaseException]]:
+        """Valid shards among ``placement``, the blob size they record, and the errors met."""
+
+        async def fetch_shard(index: int, backend: StorageBackend) -> tuple[int, bytes]:
+            return index, await backend.retrieve(self._shard_key(blob_id, index))
+
+        results = await asyncio.gather(*(fetch_shard(i, backend) for i, backend in placement), return_exceptions=True)
+        shards, size, errors = {}, None, []
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(result)
+                continue
+            index, frame = result
+            try:
+                magic, data_shards, parity_shards, shard_index, blob_size, crc = _HEADER.unpack_from(frame)
+            except struct.error:
+                magic = None
+            payload = frame[_HEADER.size:]
+            if (
+                magic != _MAGIC
+                or (data_shards, parity_shards, shard_index) != (self.codec.data_shards, self.codec.parity_shards, index)
+                or len(payload) != self.codec.shard_size(blob_size)
+                or zlib.crc32(payload) != crc
+            ):
+                errors.append(StorageBackendError(f"Shard {index} of blob {blob_id} is corrupt"))
+                continue
+            shards[index] = np.frombuffer(payload, dtype=np.uint8)
+            size = blob_size
+        return shards, size, errors
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        placement = self._placement(blob_id)
+        k = self.codec.data_shards
+        shards, size, errors = await self._fetch(blob_id, placement[:k])
+        if len(shards) < k:
+            parity, parity_size, parity_errors = await self._fetch(blob_id, placement[k:])
+            shards.update(parity)
+            size = size if size is not None else parity_size
+            errors += parity_errors
+        if len(shards) < k:
+            if not shards and all(isinstance(error, BlobNotFoundError) for error in errors):
+                raise BlobNotFoundError(f"Blob {blob_id} not found")
+            raise StorageBackendError(
+                f"Only {len(shards)} of the {k} shards needed to read blob {blob_id} are available: {errors[0]}"
+            )
+        if errors:
+            logger.warning("Read blob %s from %d shards: %d unavailable", blob_id, len(shards), len(errors))
+        return await offloader.run(size, self.codec.decode, shards, size)
+
+    async def exists(self, blob_id: str) -> bool:
+        results = await asyncio.gather(
+            *(backend.exists(self._shard_key(blob_id, index)) for index, backend in self._placement(blob_id)),
+            return_exceptions=True,
+        )
+        return sum(result is True for result in results) >= self.codec.data_shards
+
+    async def _delete_shards(self, blob_id: str) -> list[BaseException]:
+        results = await asyncio.gather(
+            *(backend.delete(self._shard_key(blob_id, index)) for index, backend in self._placement(blob_id)),
+            return_exceptions=True,
+        )
+        return [
+            result for result in results
+            if isinstance(result, BaseException) and not isinstance(result, BlobNotFoundError)
+        ]
+
+    async def delete(self, blob_id: str) -> None:
+        errors = await self._delete_shards(blob_id)
+        if errors:
+            raise StorageBackendError(f"Failed to delete {len(errors)} shards of blob {blob_id}: {errors[0]}") from errors[0]
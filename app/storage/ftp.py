@@ -1,9 +1,18 @@
+import asyncio
 import os
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
 
 import aioftp
 
-from app.storage.base import StorageBackend
+from app.storage.base import StorageBackend, StoredObject
 from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.hedging import HedgeStats, get_latency_tracker, hedged
+
+hedge_stats = HedgeStats()
+
+_known_directories: set[tuple[str, int, str]] = set()
 
 
 class FTPStorageBackend(StorageBackend):
@@ -14,71 +23,128 @@ class FTPStorageBackend(StorageBackend):
         username: str = "anonymous",
         password: str = "",
         base_dir: str = "/",
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        hedge_reads: bool = False,
+        hedge_percentile: float = 0.95,
+        default_hedge_delay: float = 0.1,
     ):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.base_dir = base_dir.rstrip("/") or "/"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.hedge_reads = hedge_reads
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.latency = get_latency_tracker(f"ftp:{host}:{port}:get")
         self.client: aioftp.Client | None = None
 
+    async def _connect(self) -> aioftp.Client:
+        try:
+            client = aioftp.Client(
+                connection_timeout=self.connect_timeout,
+                socket_timeout=self.read_timeout,
+            )
+            await client.connect(self.host, self.port)
+            await client.login(self.username, self.password)
+            if self.base_dir != "/":
+                try:
+                    await client.change_directory(self.base_dir)
+                except Exception:
+                    await client.make_directory(self.base_dir)
+                    await client.change_directory(self.base_dir)
+            return client
+        except Exception as e:
+            raise StorageBackendError(f"Failed to connect to FTP server: {e}") from e
+
     async def _ensure_connected(self) -> None:
         if self.client is None:
-            try:
-                self.client = aioftp.Client()
-                await self.client.connect(self.host, self.port)
-                await self.client.login(self.username, self.password)
-                if self.base_dir != "/":
-                    try:
-                        await self.client.change_directory(self.base_dir)
-                    except Exception:
-                        await self.client.make_directory(self.base_dir)
-                        await self.client.change_directory(self.base_dir)
-            except Exception as e:
-                raise StorageBackendError(f"Failed to connect to FTP server: {e}") from e
+            self.client = await self._connect()
+
+    def _drop_connection(self, client: aioftp.Client) -> None:
+        """Close a connection left in an unknown state so the next call reconnects."""
+        client.close()
+        if self.client is client:
+            self.client = None
 
     def _get_path(self, blob_id: str) -> str:
         if self.base_dir == "/":
             return blob_id
         return f"{self.base_dir}/{blob_id}".replace("//", "/")
 
-    async def store(self, blob_id: str, data: bytes) -> None:
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
         await self._ensure_connected()
         if self.client is None:
             raise StorageBackendError("FTP client not connected")
         
         try:
             path = self._get_path(blob_id)
+            parent = os.path.dirname(path)
+            if "/" in blob_id and (self.host, self.port, parent) not in _known_directories:
+                # Tenant-namespaced IDs ("tenant/blob") live in per-tenant directories.
+                await self.client.make_directory(parent)
+                _known_directories.add((self.host, self.port, parent))
             async with self.client.upload_stream(path) as stream:
                 await stream.write(data)
         except Exception as e:
+            self._drop_connection(self.client)
             raise StorageBackendError(f"Failed to store blob {blob_id} via FTP: {e}") from e
 
     async def retrieve(self, blob_id: str) -> bytes:
         await self._ensure_connected()
         if self.client is None:
             raise StorageBackendError("FTP client not connected")
-        
+        if not self.hedge_reads:
+            return await self._retrieve_once(self.client, blob_id)
+
+        delay = self.latency.percentile(self.hedge_percentile, self.default_hedge_delay)
+        return await hedged(
+            [lambda: self._retrieve_primary(blob_id), lambda: self._retrieve_hedge(blob_id)],
+            delay,
+            hedge_stats,
+        )
+
+    async def _retrieve_primary(self, blob_id: str) -> bytes:
+        client = self.client
         try:
-            path = self._get_path(blob_id)
-            # Try to retrieve directly - download_stream will raise error if file doesn't exist
-            data = bytearray()
-            try:
-                async with self.client.download_stream(path) as stream:
-                    while True:
-                        chunk = await stream.read(8192)
-                        if not chunk:
-                            break
-                        data.extend(chunk)
-                return bytes(data)
-            except Exception as e:
-                # If download fails, check if file exists
-                if not await self.exists(blob_id):
-                    raise BlobNotFoundError(f"Blob {blob_id} not found on FTP server")
-                raise
-        except BlobNotFoundError:
+            return await self._retrieve_once(client, blob_id)
+        except asyncio.CancelledError:
+            # An interrupted transfer leaves the control connection unusable.
+            self._drop_connection(client)
             raise
+
+    async def _retrieve_hedge(self, blob_id: str) -> bytes:
+        # A control connection serves one transfer at a time, so the hedge needs its own.
+        client = await self._connect()
+        try:
+            return await self._retrieve_once(client, blob_id)
+        finally:
+            client.close()
+
+    async def _retrieve_once(self, client: aioftp.Client, blob_id: str) -> bytes:
+        path = self._get_path(blob_id)
+        data = bytearray()
+        try:
+            start = time.perf_counter()
+            async with client.download_stream(path) as stream:
+                while True:
+                    chunk = await stream.read(8192)
+                    if not chunk:
+                        break
+                    data.extend(chunk)
+            self.latency.observe(time.perf_counter() - start)
+            return bytes(data)
+        except aioftp.StatusCodeError as e:
+            # RETR answers 550 for a missing file, so no extra existence check is needed
+            if any(code.matches("550") for code in e.received_codes):
+                raise BlobNotFoundError(f"Blob {blob_id} not found on FTP server") from e
+            self._drop_connection(client)
+            raise StorageBackendError(f"Failed to retrieve blob {blob_id} via FTP: {e}") from e
         except Exception as e:
+            self._drop_connection(client)
             raise StorageBackendError(f"Failed to retrieve blob {blob_id} via FTP: {e}") from e
 
     async def exists(self, blob_id: str) -> bool:
@@ -114,3 +180,27 @@ class FTPStorageBackend(StorageBackend):
         except Exception as e:
             raise StorageBackendError(f"Failed to delete blob {blob_id} via FTP: {e}") from e
 
+    async def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        # Uses its own connection: the listing stays open while the caller works through pages.
+        client = await self._connect()
+        try:
+            page = []
+            async for path, info in client.list(self.base_dir, recursive=True, raw_command="MLSD"):
+                if info.get("type") != "file":
+                    continue
+                modify = info.get("modify")
+                modified_at = (
+                    datetime.strptime(modify[:14], "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc) if modify else None
+                )
+                size = info.get("size")
+                key = path.relative_to(self.base_dir).as_posix() if path.is_absolute() else path.as_posix()
+                page.append(StoredObject(key, int(size) if size else None, modified_at))
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+        except Exception as e:
+            raise StorageBackendError(f"Failed to list blobs via FTP: {e}") from e
+        finally:
+            client.close()
@@ -0,0 +1,177 @@
+import time
+from collections.abc import AsyncIterator
+
+from app.storage.base import StorageBackend, StoredObject
+from app.storage.ftp import hedge_stats as ftp_hedge_stats
+from app.storage.replicated import hedge_stats as replica_hedge_stats
+from app.storage.s3_compatible import hedge_stats as s3_hedge_stats
+from app.utils.exceptions import BlobNotFoundError
+from app.utils.metrics import Counter, backend_bytes, backend_operation_duration, registry
+from app.utils.profiler import profiler
+from app.utils.tracing import tracer
+
+
+class InstrumentedStorageBackend(StorageBackend):
+    """Records latency, outcome and transferred bytes of every backend operation,
+    and a trace span for it when the request is sampled."""
+
+    def __init__(self, inner: StorageBackend, label: str):
+        self.inner = inner
+        self.label = label
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    def storage_key(self, blob_id: str) -> str:
+        return self.inner.storage_key(blob_id)
+
+    def holds(self, backend_name: str) -> bool:
+        return self.inner.holds(backend_name)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return self.inner.assembles_in_memory
+
+    def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        return self.inner.list_blobs(page_size)
+
+    def presign(self, method: str, blob_id: str, expires_in: int, headers: dict[str, str] | None = None) -> str:
+        return self.inner.presign(method, blob_id, expires_in, headers)
+
+    def _observe(self, operation: str, start: float, outcome: str) -> None:
+        backend_operation_duration.observe(time.perf_counter() - start, self.label, operation, outcome)
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        span_name = f"storage.{self.label}.store"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id, size=len(data)):
+                await self.inner.store(blob_id, data, checksum)
+        except Exception:
+            self._observe("store", start, "error")
+            raise
+        self._observe("store", start, "ok")
+        backend_bytes.inc(self.label, "in", amount=len(data))
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        span_name = f"storage.{self.label}.retrieve"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id):
+                data = await self.inner.retrieve(blob_id)
+        except BlobNotFoundError:
+            self._observe("retrieve", start, "not_found")
+            raise
+        except Exception:
+            self._observe("retrieve", start, "error")
+            raise
+        self._observe("retrieve", start, "ok")
+        backend_bytes.inc(self.label, "out", amount=len(data))
+        return data
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        # No span: the stream is consumed by the response, outside the request's trace context.
+        start = time.perf_counter()
+        size = 0
+        try:
+            async for chunk in self.inner.retrieve_stream(blob_id, chunk_size):
+                size += len(chunk)
+                yield chunk
+        except BlobNotFoundError:
+            self._observe("retrieve_stream", start, "not_found")
+            raise
+        except Exception:
+            self._observe("retrieve_stream", start, "error")
+            raise
+        finally:
+            backend_bytes.inc(self.label, "out", amount=size)
+        self._observe("retrieve_stream", start, "ok")
+
+    async def exists(self, blob_id: str) -> bool:
+        span_name = f"storage.{self.label}.exists"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id):
+                result = await self.inner.exists(blob_id)
+        except Exception:
+            self._observe("exists", start, "error")
+            raise
+        self._observe("exists", start, "ok")
+        return result
+
+    async def delete(self, blob_id: str) -> None:
+        span_name = f"storage.{self.label}.delete"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id):
+                await self.inner.delete(blob_id)
+        except Exception:
+            self._observe("delete", start, "error")
+            raise
+        self._observe("delete", start, "ok")
+
+    async def stat(self, blob_id: str) -> StoredObject:
+        span_name = f"storage.{self.label}.stat"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id):
+                result = await self.inner.stat(blob_id)
+        except BlobNotFoundError:
+            self._observe("stat", start, "not_found")
+            raise
+        except Exception:
+            self._observe("stat", start, "error")
+            raise
+        self._observe("stat", start, "ok")
+        return result
+
+    async def begin_staged(self, blob_id: str) -> str:
+        return await self.inner.begin_staged(blob_id)
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        span_name = f"storage.{self.label}.stage_part"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id, size=len(data)):
+                token = await self.inner.stage_part(blob_id, upload_id, part_number, offset, data)
+        except Exception:
+            self._observe("stage_part", start, "error")
+            raise
+        self._observe("stage_part", start, "ok")
+        backend_bytes.inc(self.label, "in", amount=len(data))
+        return token
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        span_name = f"storage.{self.label}.commit_staged"
+        start = time.perf_counter()
+        try:
+            with profiler.operation(span_name), tracer.span(span_name, blob_id=blob_id, parts=len(parts)):
+                await self.inner.commit_staged(blob_id, upload_id, parts)
+        except Exception:
+            self._observe("commit_staged", start, "error")
+            raise
+        self._observe("commit_staged", start, "ok")
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        await self.inner.abort_staged(blob_id, upload_id, part_numbers)
+
+
+def _hedge_counts() -> dict[tuple[str, ...], float]:
+    values = {}
+    for component, stats in (
+        ("s3", s3_hedge_stats),
+        ("ftp", ftp_hedge_stats),
+        ("replicated", replica_hedge_stats),
+    ):
+        for event, count in stats.as_dict().items():
+            values[(component, event)] = count
+    return values
+
+
+registry.register(Counter(
+    "simpledrive_hedged_reads_total",
+    "Hedged read requests, hedges fired and hedges that returned first.",
+    ("component", "event"),
+    callback=_hedge_counts,
+))
@@ -0,0 +1,85 @@
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+
+from app.storage.base import StorageBackend, StoredObject
+from app.utils.admission import ConcurrencyLimit
+from app.utils.exceptions import AdmissionRejectedError
+from app.utils.metrics import admission_rejections
+
+T = TypeVar("T")
+
+
+class ConcurrencyLimitedStorageBackend(StorageBackend):
+    """Rejects operations beyond the backend's concurrency cap instead of queueing them."""
+
+    def __init__(self, inner: StorageBackend, limit: ConcurrencyLimit, retry_after: float = 1.0):
+        self.inner = inner
+        self.limit = limit
+        self.retry_after = retry_after
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    def storage_key(self, blob_id: str) -> str:
+        return self.inner.storage_key(blob_id)
+
+    def holds(self, backend_name: str) -> bool:
+        return self.inner.holds(backend_name)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return self.inner.assembles_in_memory
+
+    def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        return self.inner.list_blobs(page_size)
+
+    def presign(self, method: str, blob_id: str, expires_in: int, headers: dict[str, str] | None = None) -> str:
+        return self.inner.presign(method, blob_id, expires_in, headers)
+
+    async def _call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        if not self.limit.try_acquire():
+            admission_rejections.inc("backend_concurrency")
+            raise AdmissionRejectedError(f"Storage backend {self.name} is at its concurrency limit", self.retry_after)
+        try:
+            return await operation()
+        finally:
+            self.limit.release()
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        await self._call(lambda: self.inner.store(blob_id, data, checksum))
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        return await self._call(lambda: self.inner.retrieve(blob_id))
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        # The slot is held until the stream is consumed or closed.
+        if not self.limit.try_acquire():
+            admission_rejections.inc("backend_concurrency")
+            raise AdmissionRejectedError(f"Storage backend {self.name} is at its concurrency limit", self.retry_after)
+        try:
+            async for chunk in self.inner.retrieve_stream(blob_id, chunk_size):
+                yield chunk
+        finally:
+            self.limit.release()
+
+    async def exists(self, blob_id: str) -> bool:
+        return await self._call(lambda: self.inner.exists(blob_id))
+
+    async def delete(self, blob_id: str) -> None:
+        await self._call(lambda: self.inner.delete(blob_id))
+
+    async def stat(self, blob_id: str) -> StoredObject:
+        return await self._call(lambda: self.inner.stat(blob_id))
+
+    async def begin_staged(self, blob_id: str) -> str:
+        return await self._call(lambda: self.inner.begin_staged(blob_id))
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        return await self._call(lambda: self.inner.stage_part(blob_id, upload_id, part_number, offset, data))
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        await self._call(lambda: self.inner.commit_staged(blob_id, upload_id, parts))
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        await self._call(lambda: self.inner.abort_staged(blob_id, upload_id, part_numbers))
@@ -1,20 +1,49 @@
+import asyncio
+import itertools
 import os
 import re
+import uuid
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 
 import aiofiles
 from aiofiles import os as aios
 
-from app.storage.base import StorageBackend
-from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.storage.base import StorageBackend, StoredObject
+from app.utils.exceptions import BlobAlreadyExistsError, BlobNotFoundError, StorageBackendError
+
+# Not a possible sanitized ID, so staged uploads never collide with blobs.
+STAGING_DIR = "~uploads"
+_ESCAPED = re.compile(r'[^a-zA-Z0-9.-]')
+# A tenant blob's key, as listed in the inventory and passed back by the reconciler and rebalancer.
+_TENANT_KEY = re.compile(r'^[a-z0-9][a-z0-9-]*~(?:[a-zA-Z0-9.-]|~[0-9A-F]{2})*$')
+
+
+def _escape(match: re.Match) -> str:
+    return "".join(f"~{byte:02X}" for byte in match.group().encode())
 
 
 class LocalStorageBackend(StorageBackend):
-    def __init__(self, storage_path: str):
+    def __init__(self, storage_path: str, executor: Executor | None = None):
+        """File I/O runs on ``executor``, by default the event loop's."""
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.executor = executor
+
+    async def _run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
 
     def _sanitize_id(self, blob_id: str) -> str:
+        if _TENANT_KEY.match(blob_id):
+            return blob_id
+        tenant, separator, tenant_blob_id = blob_id.partition("/")
+        if separator:
+            # Tenant-namespaced IDs ("tenant/blob") are escaped reversibly behind "tenant~".
+            # Un-prefixed IDs are sanitized without "~", so no two IDs share a file across tenants.
+            return f"{self._sanitize_id(tenant)}~" + _ESCAPED.sub(_escape, tenant_blob_id)
         sanitized = re.sub(r'[^a-zA-Z0-9._-]', '_', blob_id)
         sanitized = re.sub(r'\.\.', '_', sanitized)
         return sanitized
@@ -23,10 +52,17 @@ class LocalStorageBackend(StorageBackend):
         sanitized = self._sanitize_id(blob_id)
         return self.storage_path / sanitized
 
-    async def store(self, blob_id: str, data: bytes) -> None:
+    def storage_key(self, blob_id: str) -> str:
+        return self._sanitize_id(blob_id)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return False
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
         try:
             file_path = self._get_file_path(blob_id)
-            async with aiofiles.open(file_path, 'wb') as f:
+            async with aiofiles.open(file_path, 'wb', executor=self.executor) as f:
                 await f.write(data)
         except Exception as e:
             raise StorageBackendError(f"Failed to store blob: {str(e)}") from e
@@ -34,28 +70,127 @@ class LocalStorageBackend(StorageBackend):
     async def retrieve(self, blob_id: str) -> bytes:
         try:
             file_path = self._get_file_path(blob_id)
-            if not await aios.path.exists(file_path):
+            if not await aios.path.exists(file_path, executor=self.executor):
                 raise BlobNotFoundError(f"Blob {blob_id} not found")
             
-            async with aiofiles.open(file_path, 'rb') as f:
+            async with aiofiles.open(file_path, 'rb', executor=self.executor) as f:
                 return await f.read()
         except BlobNotFoundError:
             raise
         except Exception as e:
             raise StorageBackendError(f"Failed to retrieve blob: {str(e)}") from e
 
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        try:
+            f = await aiofiles.open(self._get_file_path(blob_id), 'rb', executor=self.executor)
+        except FileNotFoundError:
+            raise BlobNotFoundError(f"Blob {blob_id} not found")
+        except Exception as e:
+            raise StorageBackendError(f"Failed to retrieve blob: {str(e)}") from e
+        try:
+            while True:
+                try:
+                    chunk = await f.read(chunk_size)
+                except Exception as e:
+                    raise StorageBackendError(f"Failed to retrieve blob: {str(e)}") from e
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            await f.close()
+
     async def exists(self, blob_id: str) -> bool:
         try:
             file_path = self._get_file_path(blob_id)
-            return await aios.path.exists(file_path)
+            return await aios.path.exists(file_path, executor=self.executor)
         except Exception as e:
             raise StorageBackendError(f"Failed to check blob existence: {str(e)}") from e
 
     async def delete(self, blob_id: str) -> None:
         try:
             file_path = self._get_file_path(blob_id)
-            if await aios.path.exists(file_path):
-                await aios.remove(file_path)
+            if await aios.path.exists(file_path, executor=self.executor):
+                await aios.remove(file_path, executor=self.executor)
         except Exception as e:
             raise StorageBackendError(f"Failed to delete blob: {str(e)}") from e
 
+    def _staging_path(self, upload_id: str) -> Path:
+        return self.storage_path / STAGING_DIR / self._sanitize_id(upload_id)
+
+    async def begin_staged(self, blob_id: str) -> str:
+        # Parts are written at their offsets into one file, so commit is a rename.
+        upload_id = uuid.uuid4().hex
+        path = self._staging_path(upload_id)
+
+        def create() -> None:
+            path.parent.mkdir(exist_ok=True)
+            path.touch()
+
+        try:
+            await self._run(create)
+        except OSError as e:
+            raise StorageBackendError(f"Failed to start staged upload: {e}") from e
+        return upload_id
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        def write() -> None:
+            fd = os.open(self._staging_path(upload_id), os.O_WRONLY)
+            try:
+                os.pwrite(fd, data, offset)
+            finally:
+                os.close(fd)
+
+        try:
+            await self._run(write)
+        except OSError as e:
+            raise StorageBackendError(f"Failed to stage part {part_number} of blob {blob_id}: {e}") from e
+        return None
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        try:
+            await self._run(os.replace, self._staging_path(upload_id), self._get_file_path(blob_id))
+        except OSError as e:
+            raise StorageBackendError(f"Failed to commit staged upload of blob {blob_id}: {e}") from e
+
+    async def commit_staged_exclusive(self, blob_id: str, upload_id: str) -> None:
+        """Like ``commit_staged``, but never replaces an existing file: a hard link fails instead."""
+        staging_path = self._staging_path(upload_id)
+
+        def link() -> None:
+            os.link(staging_path, self._get_file_path(blob_id))
+            staging_path.unlink()
+
+        try:
+            await self._run(link)
+        except FileExistsError as e:
+            raise BlobAlreadyExistsError(f"Blob {blob_id} already exists") from e
+        except OSError as e:
+            raise StorageBackendError(f"Failed to commit staged upload of blob {blob_id}: {e}") from e
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        try:
+            await self._run(self._staging_path(upload_id).unlink, missing_ok=True)
+        except OSError as e:
+            raise StorageBackendError(f"Failed to abort staged upload of blob {blob_id}: {e}") from e
+
+    async def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        def next_page(entries) -> list[StoredObject] | None:
+            batch = list(itertools.islice(entries, page_size))
+            if not batch:
+                return None
+            page = []
+            for entry in batch:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    modified_at = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+                    page.append(StoredObject(entry.name, stat.st_size, modified_at))
+            return page
+
+        try:
+            entries = await self._run(os.scandir, self.storage_path)
+        except OSError as e:
+            raise StorageBackendError(f"Failed to list blobs: {e}") from e
+        with entries:
+            while (page := await self._run(next_page, entries)) is not None:
+                if page:
+                    yield page
@@ -0,0 +1,147 @@
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from app.storage.base import StorageBackend, StoredObject
+from app.storage.local import LocalStorageBackend
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.hash_ring import HashRing
+
+
+def parse_volumes(spec: str) -> dict[str, float]:
+    """``/mnt/a=2,/mnt/b`` to ``{"/mnt/a": 2.0, "/mnt/b": 1.0}``."""
+    volumes = {}
+    for entry in spec.split(","):
+        path, _, weight = entry.strip().partition("=")
+        if not path:
+            continue
+        try:
+            volumes[path] = float(weight) if weight else 1.0
+        except ValueError:
+            raise StorageBackendError(f"Invalid weight for volume {path}: {weight}") from None
+    return volumes
+
+
+# Backends are created per request; threads and rings are shared by all of them.
+_executors: dict[str, ThreadPoolExecutor] = {}
+
+
+def _executor(path: str, threads: int) -> ThreadPoolExecutor:
+    executor = _executors.get(path)
+    if executor is None:
+        executor = _executors[path] = ThreadPoolExecutor(threads, thread_name_prefix="volume-io")
+    return executor
+
+
+@lru_cache(maxsize=16)
+def _ring(volumes: tuple[tuple[str, float], ...]) -> HashRing:
+    return HashRing(dict(volumes))
+
+
+def shutdown_volume_executors() -> None:
+    for executor in _executors.values():
+        executor.shutdown(wait=False)
+    _executors.clear()
+
+
+class MultiVolumeStorageBackend(StorageBackend):
+    """Local storage spread over several directories, typically one per drive.
+
+    Blobs are placed by a weighted consistent hash of their storage key, so
+    adding a volume moves only the share of blobs it takes over, and each
+    volume does its file I/O on its own threads: a slow drive does not hold up
+    the others. Until ``VolumeRebalancer`` has moved a blob to its volume,
+    reads fall back to the other volumes in ring order, which finds it on its
+    previous volume first.
+
+    Blobs are recorded as ``local``, so a single-directory deployment can add
+    volumes by listing its directory as the first one.
+    """
+
+    def __init__(self, volumes: dict[str, float], threads_per_volume: int = 4):
+        self.volumes = {path: LocalStorageBackend(path, _executor(path, threads_per_volume)) for path in volumes}
+        self.ring = _ring(tuple(volumes.items()))
+
+    @property
+    def name(self) -> str:
+        return "local"
+
+    def storage_key(self, blob_id: str) -> str:
+        return next(iter(self.volumes.values())).storage_key(blob_id)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return False
+
+    def volume(self, blob_id: str) -> LocalStorageBackend:
+        """The volume ``blob_id`` belongs on."""
+        return self.volumes[self.ring.node(self.storage_key(blob_id))]
+
+    def _candidates(self, blob_id: str) -> list[LocalStorageBackend]:
+        return [self.volumes[path] for path in self.ring.nodes(self.storage_key(blob_id))]
+
+    async def _locate(self, blob_id: str) -> LocalStorageBackend:
+        for volume in self._candidates(blob_id):
+            if await volume.exists(blob_id):
+                return volume
+        raise BlobNotFoundError(f"Blob {blob_id} not found")
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        await self.volume(blob_id).store(blob_id, data, checksum)
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        for volume in self._candidates(blob_id):
+            try:
+                return await volume.retrieve(blob_id)
+            except BlobNotFoundError:
+                continue
+        raise BlobNotFoundError(f"Blob {blob_id} not found")
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        volume = await self._locate(blob_id)
+        async for chunk in volume.retrieve_stream(blob_id, chunk_size):
+            yield chunk
+
+    async def exists(self, blob_id: str) -> bool:
+        try:
+            await self._locate(blob_id)
+        except BlobNotFoundError:
+            return False
+        return True
+
+    async def delete(self, blob_id: str) -> None:
+        # Every volume: a copy may be left behind by an interrupted move.
+        await asyncio.gather(*(volume.delete(blob_id) for volume in self.volumes.values()))
+
+    # Staging happens on the blob's volume, so committing stays a rename. The
+    # volume is part of the upload handle: it remains the target even if the
+    # ring changes while the upload is in progress.
+
+    def _staging_volume(self, upload_id: str) -> tuple[LocalStorageBackend, str]:
+        volume_upload_id, _, path = upload_id.partition("@")
+        if path not in self.volumes:
+            raise StorageBackendError(f"Staged upload {upload_id} is on an unknown volume")
+        return self.volumes[path], volume_upload_id
+
+    async def begin_staged(self, blob_id: str) -> str:
+        path = self.ring.node(self.storage_key(blob_id))
+        return f"{await self.volumes[path].begin_staged(blob_id)}@{path}"
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        volume, volume_upload_id = self._staging_volume(upload_id)
+        return await volume.stage_part(blob_id, volume_upload_id, part_number, offset, data)
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        volume, volume_upload_id = self._staging_volume(upload_id)
+        await volume.commit_staged(blob_id, volume_upload_id, parts)
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        volume, volume_upload_id = self._staging_volume(upload_id)
+        await volume.abort_staged(blob_id, volume_upload_id, part_numbers)
+
+    async def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        # A blob being moved can be listed twice; the reconciler only compares keys.
+        for volume in self.volumes.values():
+            async for page in volume.list_blobs(page_size):
+                yield page
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+from app.storage.base import StorageBackend
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.hedging import HedgeStats, get_latency_tracker, hedged
+
+# Blob IDs known to be missing on at least one replica, drained by the repair task.
+pending_repairs: set[str] = set()
+
+# Replica writes still running after the quorum acknowledged the store.
+_background_writes: set[asyncio.Task] = set()
+
+hedge_stats = HedgeStats()
+
+
+class ReplicatedStorageBackend(StorageBackend):
+    """Writes every blob to all replicas concurrently and acknowledges after
+    ``write_quorum`` of them succeed.
+
+    Reads go to the replica with the lowest recent latency and are hedged to
+    the next replica once the ``hedge_percentile`` latency has elapsed.
+    """
+
+    def __init__(
+        self,
+        replicas: dict[str, StorageBackend],
+        write_quorum: int,
+        hedge_percentile: float = 0.95,
+        default_hedge_delay: float = 0.05,
+    ):
+        if not 1 <= write_quorum <= len(replicas):
+            raise StorageBackendError(
+                f"Write quorum must be between 1 and {len(replicas)}, got: {write_quorum}"
+            )
+        self.replicas = replicas
+        self.write_quorum = write_quorum
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+
+    def _tracker(self, replica_name: str):
+        return get_latency_tracker(f"replica:{replica_name}")
+
+    def _read_order(self) -> list[str]:
+        def key(replica_name: str) -> tuple[bool, float]:
+            tracker = self._tracker(replica_name)
+            return (not tracker.healthy, tracker.percentile(0.5, 0.0))
+
+        return sorted(self.replicas, key=key)
+
+    async def _timed(self, replica_name: str, operation):
+        tracker = self._tracker(replica_name)
+        start = time.perf_counter()
+        try:
+            result = await operation
+        except BlobNotFoundError:
+            tracker.observe(time.perf_counter() - start)
+            raise
+        except Exception:
+            tracker.record_failure()
+            raise
+        tracker.observe(time.perf_counter() - start)
+        return result
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        tasks = {
+            asyncio.ensure_future(self._timed(name, replica.store(blob_id, data, checksum))): name
+            for name, replica in self.replicas.items()
+        }
+        pending = set(tasks)
+        succeeded = 0
+        errors: list[BaseException] = []
+
+        while pending and succeeded < self.write_quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    succeeded += 1
+                else:
+                    errors.append(task.exception())
+            if len(errors) > len(self.replicas) - self.write_quorum:
+                for task in pending:
+                    task.cancel()
+                raise StorageBackendError(
+                    f"Write quorum not reached for blob {blob_id}: "
+                    f"{succeeded}/{self.write_quorum} replicas acknowledged ({errors[0]})"
+                ) from errors[0]
+
+        if errors:
+            pending_repairs.add(blob_id)
+        for task in pending:
+            _background_writes.add(task)
+            task.add_done_callback(lambda t, blob_id=blob_id: self._finish_background_write(t, blob_id))
+
+    def _finish_background_write(self, task: asyncio.Task, blob_id: str) -> None:
+        _background_writes.discard(task)
+        if task.cancelled() or task.exception() is not None:
+            pending_repairs.add(blob_id)
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        order = self._read_order()
+        missing: list[str] = []
+
+        async def attempt(replica_name: str) -> bytes:
+            try:
+                return await self._timed(replica_name, self.replicas[replica_name].retrieve(blob_id))
+            except BlobNotFoundError:
+                missing.append(replica_name)
+                raise
+
+        delay = self._tracker(order[0]).percentile(self.hedge_percentile, self.default_hedge_delay)
+        data = await hedged([lambda name=name: attempt(name) for name in order], delay, hedge_stats)
+        if missing:
+            pending_repairs.add(blob_id)
+        return data
+
+    async def exists(self, blob_id: str) -> bool:
+        for replica_name in self._read_order():
+            try:
+                if await self.replicas[replica_name].exists(blob_id):
+                    return True
+            except StorageBackendError:
+                continue
+        return False
+
+    async def delete(self, blob_id: str) -> None:
+        results = await asyncio.gather(
+            *(replica.delete(blob_id) for replica in self.replicas.values()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, BlobNotFoundError):
+                raise StorageBackendError(f"Failed to delete blob {blob_id} on a replica: {result}") from result
+
+    async def repair(self, blob_id: str) -> int:
+        """Copy ``blob_id`` to every replica that lacks it. Returns the number of copies made."""
+        names = list(self.replicas)
+        present = await asyncio.gather(
+            *(self.replicas[name].exists(blob_id) for name in names),
+            return_exceptions=True,
+        )
+        holders = [name for name, ok in zip(names, present) if ok is True]
+        missing = [name for name, ok in zip(names, present) if ok is False]
+        if len(holders) + len(missing) < len(names):
+            pending_repairs.add(blob_id)
+        if not holders or not missing:
+            return 0
+
+        data = await self.replicas[holders[0]].retrieve(blob_id)
+        await asyncio.gather(*(self.replicas[name].store(blob_id, data) for name in missing))
+        return len(missing)
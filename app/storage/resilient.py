@@ -0,0 +1,128 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+
+from app.storage.base import StorageBackend, StoredObject
+from app.utils.exceptions import BackendUnavailableError, BlobNotFoundError, StorageBackendError
+from app.utils.resilience import CircuitBreaker, RetryPolicy
+
+T = TypeVar("T")
+
+
+class ResilientStorageBackend(StorageBackend):
+    """Retries failed backend operations and fails fast while the backend is down.
+
+    Reads, existence checks, deletes, stores that re-send the same content
+    under the same ID, and staged parts are idempotent from the caller's point
+    of view, so they are retried. Starting and committing a staged upload are
+    not: a lost answer to either leaves the backend changed (a leaked upload,
+    or an upload already completed that a retry no longer finds), so they are
+    attempted once and only go through the circuit breaker.
+    ``BlobNotFoundError`` is a normal answer: it is neither retried nor
+    counted against the circuit breaker.
+    """
+
+    def __init__(self, inner: StorageBackend, policy: RetryPolicy, breaker: CircuitBreaker):
+        self.inner = inner
+        self.policy = policy
+        self.breaker = breaker
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    def storage_key(self, blob_id: str) -> str:
+        return self.inner.storage_key(blob_id)
+
+    def holds(self, backend_name: str) -> bool:
+        return self.inner.holds(backend_name)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return self.inner.assembles_in_memory
+
+    def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        return self.inner.list_blobs(page_size)
+
+    def presign(self, method: str, blob_id: str, expires_in: int, headers: dict[str, str] | None = None) -> str:
+        return self.inner.presign(method, blob_id, expires_in, headers)
+
+    async def _call(self, operation: Callable[[], Awaitable[T]], retry: bool = True) -> T:
+        attempts = self.policy.max_attempts if retry else 1
+        for attempt in range(1, attempts + 1):
+            if not self.breaker.allow():
+                raise BackendUnavailableError(
+                    f"Storage backend {self.name} is unavailable",
+                    retry_after=self.breaker.retry_after(),
+                )
+            try:
+                result = await operation()
+            except BlobNotFoundError:
+                self.breaker.record_success()
+                raise
+            except BackendUnavailableError:
+                self.breaker.record_abandoned()
+                raise
+            except StorageBackendError:
+                self.breaker.record_failure()
+                if attempt == attempts:
+                    raise
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+            await asyncio.sleep(self.policy.backoff(attempt))
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        await self._call(lambda: self.inner.store(blob_id, data, checksum))
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        return await self._call(lambda: self.inner.retrieve(blob_id))
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        # Not retried: chunks already handed to the caller cannot be taken back.
+        if not self.breaker.allow():
+            raise BackendUnavailableError(
+                f"Storage backend {self.name} is unavailable",
+                retry_after=self.breaker.retry_after(),
+            )
+        try:
+            async for chunk in self.inner.retrieve_stream(blob_id, chunk_size):
+                yield chunk
+        except BlobNotFoundError:
+            self.breaker.record_success()
+            raise
+        except BackendUnavailableError:
+            self.breaker.record_abandoned()
+            raise
+        except StorageBackendError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Also reached when the caller stops reading (GeneratorExit) or is cancelled.
+            self.breaker.record_abandoned()
+            raise
+        self.breaker.record_success()
+
+    async def exists(self, blob_id: str) -> bool:
+        return await self._call(lambda: self.inner.exists(blob_id))
+
+    async def delete(self, blob_id: str) -> None:
+        await self._call(lambda: self.inner.delete(blob_id))
+
+    async def stat(self, blob_id: str) -> StoredObject:
+        return await self._call(lambda: self.inner.stat(blob_id))
+
+    async def begin_staged(self, blob_id: str) -> str:
+        return await self._call(lambda: self.inner.begin_staged(blob_id), retry=False)
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        return await self._call(lambda: self.inner.stage_part(blob_id, upload_id, part_number, offset, data))
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        await self._call(lambda: self.inner.commit_staged(blob_id, upload_id, parts), retry=False)
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        await self._call(lambda: self.inner.abort_staged(blob_id, upload_id, part_numbers))
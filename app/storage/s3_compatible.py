@@ -1,10 +1,58 @@
+import base64
 import hashlib
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import AsyncIterator
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
 
 import httpx
 
-from app.storage.base import StorageBackend
-from app.utils.aws_sigv4 import create_signature_v4
+from app.storage.base import StorageBackend, StoredObject
+from app.utils.aws_sigv4 import create_signature_v4, presign_url_v4
 from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.hedging import HedgeStats, get_latency_tracker, hedged
+from app.utils.offload import offloader
+from app.utils.tracing import current_traceparent
+
+hedge_stats = HedgeStats()
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+# Backends are created per request; sharing the client keeps connections pooled
+# across requests and bounds the number of concurrent connections to S3.
+_clients: dict[tuple[float, float, int], httpx.AsyncClient] = {}
+
+
+def get_http_client(connect_timeout: float, read_timeout: float, max_connections: int) -> httpx.AsyncClient:
+    key = (connect_timeout, read_timeout, max_connections)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = _clients[key] = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+    return client
+
+
+async def close_http_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _canonical_query(params: dict[str, str]) -> str:
+    return "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items()))
+
+
+def _child_text(element: ET.Element, name: str) -> str | None:
+    # S3 responses are namespaced, most compatible servers' are not.
+    for child in element:
+        if child.tag.rsplit("}", 1)[-1] == name:
+            return child.text
+    return None
 
 
 class S3CompatibleStorageBackend(StorageBackend):
@@ -15,25 +63,50 @@ class S3CompatibleStorageBackend(StorageBackend):
         access_key_id: str,
         secret_access_key: str,
         region: str = "us-east-1",
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        hedge_reads: bool = False,
+        hedge_percentile: float = 0.95,
+        default_hedge_delay: float = 0.1,
+        max_connections: int = 100,
+        presign_endpoint_url: str | None = None,
     ):
         self.endpoint_url = endpoint_url.rstrip("/")
+        # Clients may reach the bucket under a different host than the API does.
+        self.presign_endpoint_url = (presign_endpoint_url or endpoint_url).rstrip("/")
         self.bucket_name = bucket_name
         self.access_key_id = access_key_id
         self.secret_access_key = secret_access_key
         self.region = region
-        self.client = httpx.AsyncClient()
+        self.hedge_reads = hedge_reads
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.latency = get_latency_tracker(f"s3:{self.endpoint_url}/{self.bucket_name}:get")
+        self.client = get_http_client(connect_timeout, read_timeout, max_connections)
 
     def _get_url(self, blob_id: str) -> str:
         return f"{self.endpoint_url}/{self.bucket_name}/{blob_id}"
 
-    def _get_headers(self, method: str, url: str, payload: bytes) -> dict[str, str]:
+    def _get_headers(
+        self,
+        method: str,
+        url: str,
+        payload: bytes,
+        checksum: str | None = None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> dict[str, str]:
+        if not payload:
+            checksum = EMPTY_SHA256
+        elif checksum is None:
+            checksum = hashlib.sha256(payload).hexdigest()
         headers = {
             "host": httpx.URL(url).host or "",
-            "x-amz-content-sha256": hashlib.sha256(payload).hexdigest(),
+            "x-amz-content-sha256": checksum,
+            **(extra_headers or {}),
         }
         if payload:
             headers["content-length"] = str(len(payload))
-        return create_signature_v4(
+        headers = create_signature_v4(
             method,
             url,
             headers,
@@ -42,25 +115,44 @@ class S3CompatibleStorageBackend(StorageBackend):
             self.secret_access_key,
             self.region,
         )
+        # Left unsigned so tracing never changes the request signature.
+        traceparent = current_traceparent()
+        if traceparent is not None:
+            headers["traceparent"] = traceparent
+        return headers
 
-    async def store(self, blob_id: str, data: bytes) -> None:
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
         url = self._get_url(blob_id)
-        headers = self._get_headers("PUT", url, data)
+        if checksum is None:
+            checksum = await offloader.sha256_hex(data)
+        # S3 rejects the upload if the object it received has a different digest.
+        object_checksum = {"x-amz-checksum-sha256": base64.b64encode(bytes.fromhex(checksum)).decode()}
+        headers = self._get_headers("PUT", url, data, checksum, object_checksum)
         
         try:
             response = await self.client.put(url, content=data, headers=headers)
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
             raise StorageBackendError(f"S3 store failed: {e.response.status_code}") from e
+        except httpx.TimeoutException as e:
+            raise StorageBackendError(f"S3 store timed out: {e!r}") from e
         except Exception as e:
             raise StorageBackendError(f"S3 store error: {str(e)}") from e
 
     async def retrieve(self, blob_id: str) -> bytes:
+        if not self.hedge_reads:
+            return await self._retrieve_once(blob_id)
+        delay = self.latency.percentile(self.hedge_percentile, self.default_hedge_delay)
+        return await hedged([lambda: self._retrieve_once(blob_id)] * 2, delay, hedge_stats)
+
+    async def _retrieve_once(self, blob_id: str) -> bytes:
         url = self._get_url(blob_id)
         headers = self._get_headers("GET", url, b"")
         
         try:
+            start = time.perf_counter()
             response = await self.client.get(url, headers=headers)
+            self.latency.observe(time.perf_counter() - start)
             if response.status_code == 404:
                 raise BlobNotFoundError(f"Blob {blob_id} not found")
             response.raise_for_status()
@@ -69,6 +161,29 @@ class S3CompatibleStorageBackend(StorageBackend):
             raise
         except httpx.HTTPStatusError as e:
             raise StorageBackendError(f"S3 retrieve failed: {e.response.status_code}") from e
+        except httpx.TimeoutException as e:
+            raise StorageBackendError(f"S3 retrieve timed out: {e!r}") from e
+        except Exception as e:
+            raise StorageBackendError(f"S3 retrieve error: {str(e)}") from e
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        # Not hedged: a second stream would double the transfer for little gain on large objects.
+        url = self._get_url(blob_id)
+        headers = self._get_headers("GET", url, b"")
+
+        try:
+            async with self.client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 404:
+                    raise BlobNotFoundError(f"Blob {blob_id} not found")
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+        except BlobNotFoundError:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise StorageBackendError(f"S3 retrieve failed: {e.response.status_code}") from e
+        except httpx.TimeoutException as e:
+            raise StorageBackendError(f"S3 retrieve timed out: {e!r}") from e
         except Exception as e:
             raise StorageBackendError(f"S3 retrieve error: {str(e)}") from e
 
@@ -82,6 +197,90 @@ class S3CompatibleStorageBackend(StorageBackend):
         except Exception:
             return False
 
+    async def stat(self, blob_id: str) -> StoredObject:
+        url = self._get_url(blob_id)
+        headers = self._get_headers("HEAD", url, b"", extra_headers={"x-amz-checksum-mode": "ENABLED"})
+
+        try:
+            response = await self.client.head(url, headers=headers)
+            if response.status_code == 404:
+                raise BlobNotFoundError(f"Blob {blob_id} not found")
+            response.raise_for_status()
+        except BlobNotFoundError:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise StorageBackendError(f"S3 head failed: {e.response.status_code}") from e
+        except Exception as e:
+            raise StorageBackendError(f"S3 head error: {str(e)}") from e
+
+        # Only present when the object was uploaded with a SHA-256 checksum.
+        checksum = response.headers.get("x-amz-checksum-sha256")
+        modified = response.headers.get("last-modified")
+        return StoredObject(
+            blob_id,
+            int(response.headers.get("content-length", 0)),
+            parsedate_to_datetime(modified) if modified else None,
+            base64.b64decode(checksum).hex() if checksum else None,
+        )
+
+    def presign(self, method: str, blob_id: str, expires_in: int, headers: dict[str, str] | None = None) -> str:
+        return presign_url_v4(
+            method,
+            f"{self.presign_endpoint_url}/{self.bucket_name}/{blob_id}",
+            self.access_key_id,
+            self.secret_access_key,
+            self.region,
+            expires_in,
+            headers,
+        )
+
+    async def _multipart_request(
+        self, method: str, blob_id: str, params: dict[str, str], payload: bytes = b""
+    ) -> httpx.Response:
+        url = f"{self._get_url(blob_id)}?{_canonical_query(params)}"
+        headers = self._get_headers(method, url, payload, await offloader.sha256_hex(payload) if payload else None)
+        try:
+            response = await self.client.request(method, url, content=payload or None, headers=headers)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise StorageBackendError(f"S3 multipart {method} failed: {e.response.status_code}") from e
+        except httpx.TimeoutException as e:
+            raise StorageBackendError(f"S3 multipart {method} timed out: {e!r}") from e
+        except Exception as e:
+            raise StorageBackendError(f"S3 multipart {method} error: {str(e)}") from e
+        return response
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return False
+
+    async def begin_staged(self, blob_id: str) -> str:
+        response = await self._multipart_request("POST", blob_id, {"uploads": ""})
+        upload_id = _child_text(ET.fromstring(response.content), "UploadId")
+        if not upload_id:
+            raise StorageBackendError("S3 multipart upload was created without an UploadId")
+        return upload_id
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        # S3 part numbers start at 1.
+        params = {"partNumber": str(part_number + 1), "uploadId": upload_id}
+        response = await self._multipart_request("PUT", blob_id, params, data)
+        return response.headers.get("etag")
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        root = ET.Element("CompleteMultipartUpload")
+        for number, etag in parts:
+            part = ET.SubElement(root, "Part")
+            ET.SubElement(part, "PartNumber").text = str(number + 1)
+            ET.SubElement(part, "ETag").text = etag
+        response = await self._multipart_request("POST", blob_id, {"uploadId": upload_id}, ET.tostring(root))
+        # Completion can fail after S3 has already answered 200.
+        if response.content and ET.fromstring(response.content).tag.rsplit("}", 1)[-1] == "Error":
+            raise StorageBackendError(f"S3 multipart completion failed: {response.text}")
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        await self._multipart_request("DELETE", blob_id, {"uploadId": upload_id})
+
     async def delete(self, blob_id: str) -> None:
         url = self._get_url(blob_id)
         headers = self._get_headers("DELETE", url, b"")
@@ -92,3 +291,34 @@ class S3CompatibleStorageBackend(StorageBackend):
         except Exception as e:
             raise StorageBackendError(f"S3 delete error: {str(e)}") from e
 
+    async def list_blobs(self, page_size: int = 1000) -> AsyncIterator[list[StoredObject]]:
+        params = {"list-type": "2", "max-keys": str(min(page_size, 1000))}
+        while True:
+            url = f"{self.endpoint_url}/{self.bucket_name}?{_canonical_query(params)}"
+            headers = self._get_headers("GET", url, b"")
+            try:
+                response = await self.client.get(url, headers=headers)
+                response.raise_for_status()
+                root = ET.fromstring(response.content)
+            except httpx.HTTPStatusError as e:
+                raise StorageBackendError(f"S3 list failed: {e.response.status_code}") from e
+            except Exception as e:
+                raise StorageBackendError(f"S3 list error: {str(e)}") from e
+
+            page = []
+            for element in root:
+                if element.tag.rsplit("}", 1)[-1] != "Contents":
+                    continue
+                modified = _child_text(element, "LastModified")
+                page.append(StoredObject(
+                    _child_text(element, "Key"),
+                    int(_child_text(element, "Size") or 0),
+                    datetime.fromisoformat(modified.replace("Z", "+00:00")) if modified else None,
+                ))
+            if page:
+                yield page
+
+            token = _child_text(root, "NextContinuationToken")
+            if _child_text(root, "IsTruncated") != "true" or not token:
+                return
+            params["continuation-token"] = token
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+from app.storage.base import StorageBackend
+from app.utils.exceptions import BlobNotFoundError
+from app.utils.metrics import cache_requests
+
+
+class AccessTracker:
+    """In-memory record of blob reads, flushed periodically by the tier migrator."""
+
+    def __init__(self):
+        self._last_access: dict[str, datetime] = {}
+        self._cold_reads: dict[str, int] = {}
+
+    def record(self, blob_id: str, cold: bool) -> None:
+        self._last_access[blob_id] = datetime.now(timezone.utc)
+        if cold:
+            self._cold_reads[blob_id] = self._cold_reads.get(blob_id, 0) + 1
+
+    def drain(self) -> tuple[dict[str, datetime], dict[str, int]]:
+        last_access, cold_reads = self._last_access, self._cold_reads
+        self._last_access, self._cold_reads = {}, {}
+        return last_access, cold_reads
+
+
+access_tracker = AccessTracker()
+
+
+class TieredStorageBackend(StorageBackend):
+    """Keeps new and frequently read blobs on a hot tier, the rest on a cold tier.
+
+    Writes always land on the hot tier. Reads try the hot tier first and fall
+    back to the cold one; placement changes are made by ``TierMigrator``.
+    """
+
+    def __init__(
+        self,
+        hot: StorageBackend,
+        cold: StorageBackend,
+        tracker: AccessTracker = access_tracker,
+    ):
+        self.hot = hot
+        self.cold = cold
+        self.tracker = tracker
+
+    @property
+    def name(self) -> str:
+        return self.hot.name
+
+    def storage_key(self, blob_id: str) -> str:
+        return self.hot.storage_key(blob_id)
+
+    def holds(self, backend_name: str) -> bool:
+        return backend_name in (self.hot.name, self.cold.name)
+
+    @property
+    def assembles_in_memory(self) -> bool:
+        return self.hot.assembles_in_memory
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        await self.hot.store(blob_id, data, checksum)
+
+    async def begin_staged(self, blob_id: str) -> str:
+        return await self.hot.begin_staged(blob_id)
+
+    async def stage_part(self, blob_id: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str | None:
+        return await self.hot.stage_part(blob_id, upload_id, part_number, offset, data)
+
+    async def commit_staged(self, blob_id: str, upload_id: str, parts: list[tuple[int, str | None]]) -> None:
+        await self.hot.commit_staged(blob_id, upload_id, parts)
+
+    async def abort_staged(self, blob_id: str, upload_id: str, part_numbers: list[int]) -> None:
+        await self.hot.abort_staged(blob_id, upload_id, part_numbers)
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        try:
+            data = await self.hot.retrieve(blob_id)
+            self.tracker.record(blob_id, cold=False)
+            cache_requests.inc("hot_tier", "hit")
+            return data
+        except BlobNotFoundError:
+            pass
+
+        cache_requests.inc("hot_tier", "miss")
+        data = await self.cold.retrieve(blob_id)
+        self.tracker.record(blob_id, cold=True)
+        return data
+
+    async def exists(self, blob_id: str) -> bool:
+        if await self.hot.exists(blob_id):
+            return True
+        return await self.cold.exists(blob_id)
+
+    async def delete(self, blob_id: str) -> None:
+        if await self.hot.exists(blob_id):
+            await self.hot.delete(blob_id)
+        if await self.cold.exists(blob_id):
+            await self.cold.delete(blob_id)
+
+    async def demote(self, blob_id: str) -> None:
+        """Copy a blob from the hot tier to the cold tier."""
+        data = await self.hot.retrieve(blob_id)
+        await self.cold.store(blob_id, data)
+
+    async def promote(self, blob_id: str) -> None:
+        """Copy a blob from the cold tier to the hot tier."""
+        data = await self.cold.retrieve(blob_id)
+        await self.hot.store(blob_id, data)
@@ -0,0 +1,102 @@
+"""Admission control: per-token request rates and in-flight bytes, and
+per-backend concurrency caps.
+
+Every check is non-blocking. A request over a limit is rejected at once with
+``AdmissionRejectedError`` (429 with ``Retry-After``) instead of queueing on
+the event loop behind the work it would compete with.
+"""
+
+from app.utils.exceptions import AdmissionRejectedError
+from app.utils.metrics import admission_rejections
+from app.utils.rate_limit import TokenBucket
+
+
+class ByteBudget:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_reserve(self, nbytes: int) -> bool:
+        # A request larger than the whole budget is still let through when nothing else is in flight.
+        if self.limit > 0 and self.in_flight and self.in_flight + nbytes > self.limit:
+            return False
+        self.in_flight += nbytes
+        return True
+
+    def release(self, nbytes: int) -> None:
+        self.in_flight -= nbytes
+
+
+class ConcurrencyLimit:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.limit > 0 and self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+
+
+class AdmissionTicket:
+    """Limits held by one request; released together when the request ends."""
+
+    def __init__(self, budget: ByteBudget, retry_after: float):
+        self.budget = budget
+        self.retry_after = retry_after
+        self.reserved = 0
+
+    def reserve(self, nbytes: int) -> None:
+        if not self.budget.try_reserve(nbytes):
+            admission_rejections.inc("bytes_in_flight")
+            raise AdmissionRejectedError("Too many bytes in flight for this token", self.retry_after)
+        self.reserved += nbytes
+
+    def release(self) -> None:
+        self.budget.release(self.reserved)
+        self.reserved = 0
+
+
+class AdmissionController:
+    def __init__(self, rate: float = 0.0, burst: float = 0.0, inflight_bytes: int = 0, retry_after: float = 1.0):
+        self.configure(rate, burst, inflight_bytes, retry_after)
+
+    def configure(self, rate: float, burst: float, inflight_bytes: int, retry_after: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst or None
+        self.inflight_bytes = inflight_bytes
+        self.retry_after = retry_after
+        self.buckets: dict[str, TokenBucket] = {}
+        self.budgets: dict[str, ByteBudget] = {}
+
+    def admit(self, key: str) -> AdmissionTicket:
+        """Charge one request to ``key``'s rate limit and open a ticket for its bytes."""
+        if self.rate > 0:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.rate, self.burst)
+            wait = bucket.try_acquire()
+            if wait > 0:
+                admission_rejections.inc("rate_limit")
+                raise AdmissionRejectedError("Rate limit exceeded for this token", wait)
+        budget = self.budgets.get(key)
+        if budget is None:
+            budget = self.budgets[key] = ByteBudget(self.inflight_bytes)
+        return AdmissionTicket(budget, self.retry_after)
+
+
+admission = AdmissionController()
+
+_concurrency_limits: dict[str, ConcurrencyLimit] = {}
+
+
+def get_concurrency_limit(key: str, limit: int) -> ConcurrencyLimit:
+    """Shared limit for ``key``; backends are created per request, so the count must outlive them."""
+    concurrency_limit = _concurrency_limits.get(key)
+    if concurrency_limit is None:
+        concurrency_limit = _concurrency_limits[key] = ConcurrencyLimit(limit)
+    return concurrency_limit
@@ -0,0 +1,207 @@
+"""Token authentication for tenants.
+
+Static tokens are kept as SHA-256 digests, so the configuration never needs
+the plaintext and lookups do not compare secrets byte by byte. JWTs are
+verified against a shared secret or a JWKS document that is fetched once and
+cached. Verified JWTs are remembered in a small LRU until they expire, so the
+hot path is one hash and one dict lookup.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+from jose import JWTError, jwt
+
+from app.utils.exceptions import InvalidBlobIdError
+
+DEFAULT_TENANT = "default"
+SCOPES = frozenset({"blobs:read", "blobs:write", "admin"})
+_TENANT = re.compile(r"^[a-z0-9][a-z0-9-]{0,62}$")
+
+
+@dataclass(frozen=True)
+class Principal:
+    tenant: str
+    scopes: frozenset[str]
+
+    def has_scope(self, scope: str) -> bool:
+        return scope in self.scopes
+
+    def namespace(self, blob_id: str) -> str:
+        """Storage ID of a tenant's blob. The default tenant keeps un-prefixed IDs.
+
+        "/" is reserved as the tenant separator, so the default tenant cannot
+        use it: "acme/doc" would name tenant acme's blob "doc". Nor can it use
+        "~", which separates the tenant in local storage keys.
+        """
+        if self.tenant == DEFAULT_TENANT:
+            if "/" in blob_id or "~" in blob_id:
+                raise InvalidBlobIdError(f"Blob ID must not contain '/' or '~': {blob_id}")
+            return blob_id
+        return f"{self.tenant}/{blob_id}"
+
+    def local_id(self, storage_id: str) -> str:
+        """Inverse of ``namespace``: the ID the tenant knows a stored blob by."""
+        return storage_id.removeprefix(self.namespace(""))
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedTokenCache:
+    """LRU of verified tokens, keyed by token digest, with per-entry expiry."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.entries: OrderedDict[bytes, tuple[Principal, float]] = OrderedDict()
+
+    def get(self, digest: bytes) -> Principal | None:
+        entry = self.entries.get(digest)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if time.time() >= expires_at:
+            del self.entries[digest]
+            return None
+        self.entries.move_to_end(digest)
+        return principal
+
+    def put(self, digest: bytes, principal: Principal, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        self.entries[digest] = (principal, expires_at)
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class JWKSCache:
+    def __init__(self, url: str, ttl: float = 300.0, min_refresh_interval: float = 30.0):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.keys: dict[str, dict] = {}
+        self.fetched_at = 0.0
+
+    async def refresh(self) -> None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+        self.keys = {key.get("kid", ""): key for key in response.json().get("keys", [])}
+        self.fetched_at = time.monotonic()
+
+    async def get(self, kid: str | None) -> dict | None:
+        age = time.monotonic() - self.fetched_at
+        # Unknown key IDs trigger a refresh (key rotation), but at most every min_refresh_interval.
+        if age >= self.ttl or (kid not in self.keys and age >= self.min_refresh_interval):
+            await self.refresh()
+        if kid is None and len(self.keys) == 1:
+            return next(iter(self.keys.values()))
+        return self.keys.get(kid)
+
+
+class Authenticator:
+    def __init__(
+        self,
+        static_tokens: dict[bytes, Principal] | None = None,
+        jwt_secret: str = "",
+        jwks: JWKSCache | None = None,
+        jwt_algorithms: tuple[str, ...] = ("HS256",),
+        jwt_audience: str | None = None,
+        jwt_issuer: str | None = None,
+        jwt_tenant_claim: str = "tenant",
+        cache: VerifiedTokenCache | None = None,
+        cache_ttl: float = 300.0,
+    ):
+        self.static_tokens = static_tokens or {}
+        self.jwt_secret = jwt_secret
+        self.jwks = jwks
+        self.jwt_algorithms = list(jwt_algorithms)
+        self.jwt_audience = jwt_audience
+        self.jwt_issuer = jwt_issuer
+        self.jwt_tenant_claim = jwt_tenant_claim
+        self.cache = cache if cache is not None else VerifiedTokenCache()
+        self.cache_ttl = cache_ttl
+
+    @classmethod
+    def from_settings(cls, settings) -> "Authenticator":
+        static_tokens = {}
+        if settings.api_token:
+            static_tokens[token_digest(settings.api_token)] = Principal(DEFAULT_TENANT, SCOPES)
+        for entry in settings.api_tokens:
+            tenant = entry["tenant"]
+            if not _TENANT.match(tenant):
+                raise ValueError(f"Invalid tenant name: {tenant!r}")
+            scopes = frozenset(entry.get("scopes", ("blobs:read", "blobs:write")))
+            if not scopes <= SCOPES:
+                raise ValueError(f"Unknown scopes for tenant {tenant}: {sorted(scopes - SCOPES)}")
+            if "token_sha256" in entry:
+                digest = bytes.fromhex(entry["token_sha256"])
+            else:
+                digest = token_digest(entry["token"])
+            static_tokens[digest] = Principal(tenant, scopes)
+        return cls(
+            static_tokens,
+            jwt_secret=settings.jwt_secret,
+            jwks=JWKSCache(settings.jwt_jwks_url, settings.jwks_cache_seconds) if settings.jwt_jwks_url else None,
+            jwt_algorithms=tuple(a.strip() for a in settings.jwt_algorithms.split(",") if a.strip()),
+            jwt_audience=settings.jwt_audience or None,
+            jwt_issuer=settings.jwt_issuer or None,
+            jwt_tenant_claim=settings.jwt_tenant_claim,
+            cache=VerifiedTokenCache(settings.auth_cache_size),
+            cache_ttl=settings.auth_cache_ttl,
+        )
+
+    async def authenticate(self, token: str) -> Principal | None:
+        # Static tokens are matched by digest: how long the lookup takes can
+        # depend on the digest, but says nothing about the token that produced it.
+        digest = token_digest(token)
+        principal = self.static_tokens.get(digest)
+        if principal is not None:
+            return principal
+
+        principal = self.cache.get(digest)
+        if principal is not None:
+            return principal
+
+        if token.count(".") == 2 and (self.jwt_secret or self.jwks is not None):
+            return await self._verify_jwt(token, digest)
+        return None
+
+    async def _verify_jwt(self, token: str, digest: bytes) -> Principal | None:
+        try:
+            key = self.jwt_secret
+            if self.jwks is not None:
+                key = await self.jwks.get(jwt.get_unverified_header(token).get("kid"))
+                if key is None:
+                    return None
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=self.jwt_algorithms,
+                audience=self.jwt_audience,
+                issuer=self.jwt_issuer,
+                options={"verify_aud": self.jwt_audience is not None},
+            )
+        except (JWTError, httpx.HTTPError):
+            return None
+
+        tenant = claims.get(self.jwt_tenant_claim)
+        if not isinstance(tenant, str) or not _TENANT.match(tenant) or tenant == DEFAULT_TENANT:
+            return None
+        scopes = claims.get("scope", claims.get("scopes", ""))
+        if isinstance(scopes, str):
+            scopes = scopes.split()
+        principal = Principal(tenant, frozenset(scopes) & SCOPES)
+
+        expires_at = time.time() + self.cache_ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        self.cache.put(digest, principal, expires_at)
+        return principal
+
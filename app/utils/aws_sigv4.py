@@ -1,7 +1,7 @@
 import hashlib
 import hmac
 from datetime import datetime, timezone
-from urllib.parse import quote, urlparse
+from urllib.parse import parse_qsl, quote, urlparse
 
 
 def _sha256(data: bytes) -> bytes:
@@ -80,7 +80,8 @@ def create_signature_v4(
     uri = parsed.path or "/"
     query = parsed.query
     
-    payload_hash = hashlib.sha256(payload).hexdigest()
+    # Callers that already hashed the payload pass the digest in the header.
+    payload_hash = headers.get("x-amz-content-sha256") or hashlib.sha256(payload).hexdigest()
     
     if "x-amz-date" not in headers:
         headers["x-amz-date"] = timestamp
@@ -104,3 +105,49 @@ def create_signature_v4(
     headers["Authorization"] = auth_header
     return headers
 
+
+def presign_url_v4(
+    method: str,
+    url: str,
+    access_key: str,
+    secret_key: str,
+    region: str = "us-east-1",
+    expires_in: int = 900,
+    headers: dict[str, str] | None = None,
+    service: str = "s3",
+    now: datetime | None = None,
+) -> str:
+    """Query-string signed URL valid for ``expires_in`` seconds.
+
+    ``headers`` become signed headers that the client must send unchanged,
+    e.g. ``content-length`` or ``x-amz-checksum-sha256`` to pin an upload.
+    The payload itself is not signed.
+    """
+    now = now or datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = now.strftime("%Y%m%d")
+
+    parsed = urlparse(url)
+    uri = _url_encode(parsed.path or "/", safe="/-_.~")
+    signed = {k.lower(): v for k, v in (headers or {}).items()}
+    signed["host"] = parsed.netloc
+    _, signed_headers = _canonical_headers(signed)
+
+    scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    params = dict(parse_qsl(parsed.query))
+    params.update({
+        "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+        "X-Amz-Credential": f"{access_key}/{scope}",
+        "X-Amz-Date": timestamp,
+        "X-Amz-Expires": str(expires_in),
+        "X-Amz-SignedHeaders": signed_headers,
+    })
+    query = "&".join(
+        f"{_url_encode(k, safe='-_.~')}={_url_encode(v, safe='-_.~')}" for k, v in sorted(params.items())
+    )
+
+    canonical_req = _canonical_request(method, uri, query, signed, "UNSIGNED-PAYLOAD")
+    string_to_sign = _string_to_sign(timestamp, date_stamp, region, service, canonical_req)
+    signing_key = _get_signature_key(secret_key, date_stamp, region, service)
+    signature = _hmac_sha256(signing_key, string_to_sign.encode()).hex()
+    return f"{parsed.scheme}://{parsed.netloc}{uri}?{query}&X-Amz-Signature={signature}"
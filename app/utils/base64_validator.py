@@ -1,6 +1,7 @@
 """Base64 validation and decoding utilities."""
 
 import base64
+from collections.abc import AsyncIterator
 
 from app.utils.exceptions import InvalidBase64Error
 
@@ -17,7 +18,29 @@ def validate_base64(data: str) -> None:
 
 
 def decode_base64(data: str) -> bytes:
-    """Decode Base64 string to bytes."""
-    validate_base64(data)
-    return base64.b64decode(data)
+    """Decode Base64 string to bytes, validating it in the same pass."""
+    if not data:
+        raise InvalidBase64Error("Base64 string cannot be empty")
+    
+    try:
+        return base64.b64decode(data, validate=True)
+    except Exception as e:
+        raise InvalidBase64Error(f"Invalid Base64 encoding: {str(e)}") from e
+
+
+async def encode_base64_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Base64-encode a byte stream incrementally.
 
+    Chunks are encoded on 3-byte boundaries, with the remainder carried into
+    the next chunk, so the concatenated output equals encoding the whole input.
+    """
+    carry = b""
+    async for chunk in chunks:
+        if carry:
+            chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        carry = chunk[cut:]
+        if cut:
+            yield base64.b64encode(memoryview(chunk)[:cut])
+    if carry:
+        yield base64.b64encode(carry)
@@ -0,0 +1,91 @@
+"""Bloom filter over string keys."""
+
+import hashlib
+import math
+import struct
+from collections.abc import Iterable
+
+_HEADER = struct.Struct("<QQIQ")
+_DIGEST = struct.Struct("<QQ")
+
+
+class BloomFilter:
+    """Set membership with no false negatives and a bounded false-positive rate.
+
+    Each key is hashed once with BLAKE2b, and its ``hashes`` bit positions are
+    derived from the two halves of the digest (double hashing). Unlike
+    ``hash()`` the digest is the same in every process, so a filter can be
+    saved and loaded elsewhere.
+    """
+
+    def __init__(self, capacity: int, bits: int, hashes: int, data: bytearray | None = None, count: int = 0):
+        self.capacity = capacity
+        self.bits = bits
+        self.hashes = hashes
+        self.data = data if data is not None else bytearray((bits + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> "BloomFilter":
+        """A filter sized for ``capacity`` keys at the given false-positive rate."""
+        capacity = max(capacity, 1)
+        bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return cls(capacity, bits, hashes)
+
+    def _positions(self, key: str) -> list[int]:
+        h1, h2 = _DIGEST.unpack(hashlib.blake2b(key.encode(), digest_size=16).digest())
+        h2 |= 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; returns whether it was new, as far as the filter can tell."""
+        data = self.data
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not data[position >> 3] & mask:
+                data[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def update(self, keys: Iterable[str]) -> None:
+        """Bulk ``add``, with the per-key work inlined."""
+        data, bits, rounds = self.data, self.bits, range(self.hashes)
+        blake2b, unpack = hashlib.blake2b, _DIGEST.unpack
+        added = 0
+        for key in keys:
+            h1, h2 = unpack(blake2b(key.encode(), digest_size=16).digest())
+            h2 |= 1
+            new = False
+            for i in rounds:
+                position = (h1 + i * h2) % bits
+                byte, mask = position >> 3, 1 << (position & 7)
+                if not data[byte] & mask:
+                    data[byte] |= mask
+                    new = True
+            added += new
+        self.count += added
+
+    def __contains__(self, key: str) -> bool:
+        data = self.data
+        return all(data[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        """More keys than the filter was sized for: its false-positive rate is above target."""
+        return self.count > self.capacity
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(self.capacity, self.bits, self.hashes, self.count) + bytes(self.data)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "BloomFilter":
+        capacity, bits, hashes, count = _HEADER.unpack_from(payload)
+        data = bytearray(payload[_HEADER.size:])
+        if len(data) != (bits + 7) // 8 or hashes < 1:
+            raise ValueError("Truncated or corrupt Bloom filter")
+        return cls(capacity, bits, hashes, data, count)
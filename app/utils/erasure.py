@@ -0,0 +1,146 @@
+"""Systematic Reed–Solomon erasure coding over GF(256)."""
+
+from functools import lru_cache
+
+import numpy as np
+
+# x^8 + x^4 + x^3 + x^2 + 1, the usual generator polynomial for GF(256).
+_POLYNOMIAL = 0x11D
+# 16-bit words combined per step, so that the partial result stays in cache.
+_BLOCK = 128 * 1024
+
+
+def _tables() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    exp = np.zeros(510, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= _POLYNOMIAL
+    exp[255:] = exp[:255]
+    mul = np.zeros((256, 256), dtype=np.uint8)
+    mul[1:, 1:] = exp[log[1:, None] + log[None, 1:]]
+    return exp, log, mul
+
+
+_EXP, _LOG, _MUL = _tables()
+
+
+@lru_cache(maxsize=256)
+def _pair_table(coefficient: int) -> np.ndarray:
+    """Products of ``coefficient`` with both bytes of every 16-bit word.
+
+    Looking up two bytes at once halves the lookups, and a 16-bit index is
+    used by ``take`` without first converting the shard to a wider type.
+    """
+    row = _MUL[coefficient].astype(np.uint16)
+    words = np.arange(65536, dtype=np.uint16).view(np.uint8).reshape(-1, 2)
+    return (row[words[:, 0]] | (row[words[:, 1]] << 8)).astype(np.uint16)
+
+
+def gf_inverse(a: int) -> int:
+    if a == 0:
+        raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return int(_EXP[255 - _LOG[a]])
+
+
+def gf_invert_matrix(matrix: list[list[int]]) -> list[list[int]]:
+    """Inverse of a square matrix over GF(256), by Gauss–Jordan elimination."""
+    n = len(matrix)
+    rows = [list(row) + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    for column in range(n):
+        pivot = next((r for r in range(column, n) if rows[r][column]), None)
+        if pivot is None:
+            raise ValueError("Matrix is singular")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        scale = _MUL[gf_inverse(rows[column][column])]
+        rows[column] = [int(scale[value]) for value in rows[column]]
+        for r in range(n):
+            factor = rows[r][column]
+            if r != column and factor:
+                multiple = _MUL[factor]
+                rows[r] = [value ^ int(multiple[pivot_value]) for value, pivot_value in zip(rows[r], rows[column])]
+    return [row[n:] for row in rows]
+
+
+class ReedSolomon:
+    """``data_shards`` data shards and ``parity_shards`` parity shards; any
+    ``data_shards`` of them rebuild the data.
+
+    The code is systematic: the data shards are the data itself, split in
+    equal parts and zero-padded, so reading with all data shards present needs
+    no decoding. Parity rows form a Cauchy matrix, every square submatrix of
+    which is invertible, so any choice of surviving shards can be decoded.
+    Shards are NumPy arrays; multiplying a shard by a constant is a table
+    lookup for each 16-bit word of it.
+    """
+
+    def __init__(self, data_shards: int, parity_shards: int):
+        if data_shards < 1 or parity_shards < 0 or data_shards + parity_shards > 256:
+            raise ValueError("Need at least one data shard and at most 256 shards in total")
+        self.data_shards = data_shards
+        self.parity_shards = parity_shards
+        self.parity = [
+            [gf_inverse((data_shards + i) ^ j) for j in range(data_shards)] for i in range(parity_shards)
+        ]
+
+    @property
+    def total_shards(self) -> int:
+        return self.data_shards + self.parity_shards
+
+    def shard_size(self, size: int) -> int:
+        # Rounded up to whole 16-bit words.
+        return -(-size // (2 * self.data_shards)) * 2
+
+    def _row(self, index: int) -> list[int]:
+        if index < self.data_shards:
+            return [int(j == index) for j in range(self.data_shards)]
+        return self.parity[index - self.data_shards]
+
+    @staticmethod
+    def _combine(coefficients: list[int], shards: list[np.ndarray]) -> np.ndarray:
+        """The sum over GF(256) of ``coefficients[i] * shards[i]``."""
+        terms = [
+            (_pair_table(coefficient) if coefficient != 1 else None, shard.view(np.uint16))
+            for coefficient, shard in zip(coefficients, shards)
+            if coefficient
+        ]
+        length = len(shards[0]) // 2
+        result = np.zeros(length, dtype=np.uint16)
+        product = np.empty(min(length, _BLOCK), dtype=np.uint16)
+        for start in range(0, length, _BLOCK):
+            end = min(start + _BLOCK, length)
+            block = result[start:end]
+            for table, words in terms:
+                if table is None:
+                    block ^= words[start:end]
+                else:
+                    block ^= np.take(table, words[start:end], out=product[:end - start])
+        return result.view(np.uint8)
+
+    def encode(self, data: bytes) -> list[np.ndarray]:
+        """All shards of ``data``: the data shards, then the parity shards."""
+        size = self.shard_size(len(data))
+        padded = np.zeros(self.data_shards * size, dtype=np.uint8)
+        padded[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        shards = list(padded.reshape(self.data_shards, size))
+        return shards + [self._combine(row, shards) for row in self.parity]
+
+    def decode(self, shards: dict[int, np.ndarray], size: int) -> bytes:
+        """The ``size`` bytes of data, from at least ``data_shards`` shards keyed by index."""
+        k = self.data_shards
+        if len(shards) < k:
+            raise ValueError(f"Need {k} shards to decode, got {len(shards)}")
+        missing = [index for index in range(k) if index not in shards]
+        data = [shards.get(index) for index in range(k)]
+        if missing:
+            # Data shards first: rows of the identity keep the inversion cheap.
+            chosen = sorted(shards)[:k]
+            inverse = gf_invert_matrix([self._row(index) for index in chosen])
+            available = [shards[index] for index in chosen]
+            for index in missing:
+                data[index] = self._combine(inverse[index], available)
+        return np.concatenate(data)[:size].tobytes()
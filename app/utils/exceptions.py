@@ -25,8 +25,53 @@ class BlobAlreadyExistsError(SimpleDriveError):
     pass
 
 
+class InvalidBlobIdError(SimpleDriveError):
+    """Raised when a blob ID cannot be used in the caller's namespace."""
+
+    pass
+
+
+class UploadNotFoundError(SimpleDriveError):
+    """Raised when a resumable upload session does not exist or has expired."""
+
+    pass
+
+
+class InvalidUploadError(SimpleDriveError):
+    """Raised when a resumable upload request does not fit its session."""
+
+    pass
+
+
 class StorageBackendError(SimpleDriveError):
     """Raised when storage backend operation fails."""
 
     pass
 
+
+class ChecksumMismatchError(StorageBackendError):
+    """Raised when blob data read from a backend does not match its stored checksum."""
+
+    pass
+
+
+class QuotaExceededError(SimpleDriveError):
+    """Raised when a write would take a tenant over its storage quota."""
+
+    pass
+
+
+class AdmissionRejectedError(SimpleDriveError):
+    """Raised when a request is shed because a rate, byte or concurrency limit is reached."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BackendUnavailableError(StorageBackendError):
+    """Raised when a storage backend is failing fast behind an open circuit breaker."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
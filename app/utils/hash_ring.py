@@ -0,0 +1,47 @@
+"""Weighted consistent hashing."""
+
+import bisect
+import hashlib
+from collections.abc import Iterator
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Maps keys to nodes so that changing the node set moves few keys.
+
+    Each node is placed on the ring at ``replicas * weight`` points, and a key
+    belongs to the node of the first point at or after its own. Adding a node
+    only takes over keys from its neighbours, about ``weight / total weight``
+    of them; removing one hands its keys to the next nodes on the ring.
+    """
+
+    def __init__(self, weights: dict[str, float], replicas: int = 160):
+        if not weights or any(weight <= 0 for weight in weights.values()):
+            raise ValueError("A hash ring needs at least one node, and positive weights")
+        self.weights = dict(weights)
+        ring = sorted(
+            (_point(f"{node}#{i}"), node)
+            for node, weight in weights.items()
+            for i in range(max(1, round(replicas * weight)))
+        )
+        self._points = [point for point, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def node(self, key: str) -> str:
+        index = bisect.bisect_left(self._points, _point(key)) % len(self._points)
+        return self._nodes[index]
+
+    def nodes(self, key: str) -> Iterator[str]:
+        """All nodes in ring order from ``key``'s owner: where to look if it is not on its owner yet."""
+        start = bisect.bisect_left(self._points, _point(key))
+        seen = set()
+        for offset in range(len(self._nodes)):
+            node = self._nodes[(start + offset) % len(self._nodes)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self.weights):
+                    return
@@ -0,0 +1,113 @@
+"""Latency tracking and hedged request helpers."""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TypeVar
+
+from app.utils.exceptions import BlobNotFoundError
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies plus a consecutive-failure count."""
+
+    def __init__(self, window: int = 256, min_samples: int = 20, max_failures: int = 3):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.max_failures = max_failures
+        self.failures = 0
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    @property
+    def healthy(self) -> bool:
+        return self.failures < self.max_failures
+
+    def percentile(self, q: float, default: float) -> float:
+        if len(self._samples) < self.min_samples:
+            return default
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+_trackers: dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(key: str) -> LatencyTracker:
+    tracker = _trackers.get(key)
+    if tracker is None:
+        tracker = _trackers[key] = LatencyTracker()
+    return tracker
+
+
+class HedgeStats:
+    """Counts how often a hedge was sent and how often it beat the original request."""
+
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"requests": self.requests, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+
+async def hedged(
+    attempts: Sequence[Callable[[], Awaitable[T]]],
+    delay: float,
+    stats: HedgeStats | None = None,
+) -> T:
+    """Run ``attempts`` in order, starting the next one after ``delay`` seconds
+    without a result or as soon as a running attempt fails.
+
+    The first successful result wins and the remaining attempts are cancelled.
+    If every attempt fails, the first error other than ``BlobNotFoundError`` is
+    raised, so a "not found" is only reported when every attempt agreed on it.
+    """
+    if stats is not None:
+        stats.requests += 1
+    launched: dict[asyncio.Future, int] = {}
+    pending: set[asyncio.Future] = set()
+    errors: list[BaseException] = []
+
+    def launch() -> None:
+        index = len(launched)
+        task = asyncio.ensure_future(attempts[index]())
+        launched[task] = index
+        pending.add(task)
+        if index > 0 and stats is not None:
+            stats.hedged += 1
+
+    launch()
+    try:
+        while pending:
+            timeout = delay if len(launched) < len(attempts) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    if launched[task] > 0 and stats is not None:
+                        stats.hedge_wins += 1
+                    return task.result()
+                errors.append(task.exception())
+            if len(launched) < len(attempts):
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    for error in errors:
+        if not isinstance(error, BlobNotFoundError):
+            raise error
+    raise errors[0]
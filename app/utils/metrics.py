@@ -0,0 +1,217 @@
+"""Minimal Prometheus-compatible metrics registry and request middleware.
+
+Metrics are plain in-process counters updated from a single event loop, so
+recording a sample costs a dict lookup and a few additions.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Counter incremented directly or read at scrape time from ``callback``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        values = self.callback() if self.callback is not None else self.values
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge:
+    """Gauge set directly or computed at scrape time by ``callback``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def collect(self) -> Iterable[str]:
+        values = self.callback() if self.callback is not None else self.values
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            bucket_labels = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{series_labels} {series[-1]}"
+            yield f"{self.name}_count{series_labels} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list[Counter | Gauge | Histogram] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "simpledrive_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "simpledrive_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"),
+))
+stage_duration = registry.register(Histogram(
+    "simpledrive_stage_duration_seconds", "Time spent in request processing stages.", ("stage",),
+))
+backend_operation_duration = registry.register(Histogram(
+    "simpledrive_backend_operation_duration_seconds", "Storage backend operation latency.",
+    ("backend", "operation", "outcome"),
+))
+backend_bytes = registry.register(Counter(
+    "simpledrive_backend_bytes_total", "Bytes written to (in) and read from (out) storage backends.",
+    ("backend", "direction"),
+))
+cache_requests = registry.register(Counter(
+    "simpledrive_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"),
+))
+checksum_verifications = registry.register(Counter(
+    "simpledrive_checksum_verifications_total", "Blob reads verified against their stored checksum.", ("result",),
+))
+reconcile_findings = registry.register(Counter(
+    "simpledrive_reconcile_findings_total", "Orphaned objects and dangling metadata rows found by the reconciler.",
+    ("backend", "kind", "action"),
+))
+group_commit_batch_size = registry.register(Histogram(
+    "simpledrive_group_commit_batch_size", "Metadata rows inserted per group commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+))
+admission_rejections = registry.register(Counter(
+    "simpledrive_admission_rejections_total", "Requests and backend operations shed by admission control.",
+    ("reason",),
+))
+db_sessions_active = registry.register(Gauge(
+    "simpledrive_db_sessions_active", "Database sessions currently held by requests.",
+))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - start, method, path)
+            http_requests.inc(method, path, str(status_code))
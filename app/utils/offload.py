@@ -0,0 +1,89 @@
+"""Size-aware offloading of CPU-bound payload work from the event loop.
+
+Payloads below the threshold are processed inline: handing them to a thread
+costs more than the work. Larger ones run on dedicated threads, kept apart
+from the loop's default executor so file I/O is not queued behind them.
+
+hashlib releases the GIL while hashing, so large digests run on a pool in
+parallel with the loop. binascii holds it, so Base64 runs in slices of a few
+hundred kilobytes on a single thread: between slices the thread gives the GIL
+back, and with only one such thread the loop is not starved by several
+threads competing for it.
+"""
+
+import asyncio
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.utils.base64_validator import decode_base64
+from app.utils.exceptions import InvalidBase64Error
+
+# Multiples of 4 characters and 3 bytes, so slices decode and encode independently.
+_DECODE_SLICE = 512 * 1024
+_ENCODE_SLICE = 384 * 1024
+
+
+def _b64decode(data: str) -> bytes:
+    if len(data) <= _DECODE_SLICE:
+        return decode_base64(data)
+    # Padding is only valid at the very end; in an earlier slice it would still decode on its own.
+    if data.find("=", 0, len(data) - 2) != -1:
+        raise InvalidBase64Error("Invalid Base64 encoding: Excess data after padding")
+    return b"".join(decode_base64(data[i:i + _DECODE_SLICE]) for i in range(0, len(data), _DECODE_SLICE))
+
+
+def _b64encode(data: bytes) -> str:
+    if len(data) <= _ENCODE_SLICE:
+        return base64.b64encode(data).decode("ascii")
+    view = memoryview(data)
+    return "".join(
+        base64.b64encode(view[i:i + _ENCODE_SLICE]).decode("ascii") for i in range(0, len(data), _ENCODE_SLICE)
+    )
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class CPUOffloader:
+    def __init__(self, threshold: int = 1024 * 1024, max_workers: int = 4):
+        self.executors: dict[bool, ThreadPoolExecutor] = {}
+        self.configure(threshold, max_workers)
+
+    def configure(self, threshold: int, max_workers: int) -> None:
+        """``max_workers`` of 0 runs everything inline."""
+        self.shutdown()
+        self.threshold = threshold
+        self.max_workers = max_workers
+
+    async def run(self, size: int, func, *args, releases_gil: bool = False):
+        """Run ``func(*args)`` inline if ``size`` is below the threshold, else on a worker thread."""
+        if self.max_workers <= 0 or size < self.threshold:
+            return func(*args)
+        executor = self.executors.get(releases_gil)
+        if executor is None:
+            executor = self.executors[releases_gil] = ThreadPoolExecutor(
+                self.max_workers if releases_gil else 1,
+                thread_name_prefix="cpu-offload",
+            )
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+
+    def shutdown(self) -> None:
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+        self.executors = {}
+
+    async def b64decode(self, data: str) -> bytes:
+        """Strictly validated Base64 decode; raises ``InvalidBase64Error``."""
+        return await self.run(len(data), _b64decode, data)
+
+    async def b64encode(self, data: bytes) -> str:
+        return await self.run(len(data), _b64encode, data)
+
+    async def sha256_hex(self, data: bytes) -> str:
+        return await self.run(len(data), _sha256_hex, data, releases_gil=True)
+
+
+offloader = CPUOffloader()
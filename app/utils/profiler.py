@@ -0,0 +1,155 @@
+"""Opt-in sampling profiler for selected requests.
+
+A background thread samples the event loop thread's stack while at least one
+profiled request is in flight. A sample is attributed to a request when that
+request's task is the one running on the loop, so concurrent unprofiled
+requests do not pollute the profile. Samples are aggregated as collapsed
+stacks (``frame;frame;frame count``), the input format of flamegraph tools.
+"""
+
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class ProfiledRequest:
+    __slots__ = ("scope", "operation")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.operation: str | None = None
+
+    @property
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "path", None) or self.scope.get("path", "")
+
+
+def _format_frame(frame) -> str:
+    code = frame.f_code
+    filename = os.path.join(*code.co_filename.split(os.sep)[-2:])
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks: dict[tuple[str, str], Counter] = {}
+        self._active: dict[asyncio.Task, ProfiledRequest] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, scope: dict):
+        """Profile the current task for the duration of the block."""
+        task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._active[task] = ProfiledRequest(scope)
+        self._ensure_thread()
+        self._wakeup.set()
+        try:
+            yield
+        finally:
+            self._active.pop(task, None)
+
+    @contextmanager
+    def operation(self, name: str):
+        """Tag samples taken inside the block with a backend operation name."""
+        request = self._active.get(asyncio.current_task()) if self._active else None
+        if request is None:
+            yield
+            return
+        previous, request.operation = request.operation, name
+        try:
+            yield
+        finally:
+            request.operation = previous
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            if not self._active:
+                self._wakeup.clear()
+                self._wakeup.wait()
+            self.sample()
+            time.sleep(self.interval)
+
+    def sample(self) -> None:
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        request = self._active.get(task)
+        if request is None:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        frames = []
+        while frame is not None:
+            frames.append(_format_frame(frame))
+            frame = frame.f_back
+        key = (request.route, request.operation or "")
+        stack = ";".join(reversed(frames))
+        with self._lock:
+            counter = self.stacks.setdefault(key, Counter())
+            if stack in counter or sum(len(c) for c in self.stacks.values()) < self.max_stacks:
+                counter[stack] += 1
+
+    def collapsed(self, route: str | None = None, operation: str | None = None) -> str:
+        """Collapsed stacks, optionally filtered by route template and operation prefix."""
+        merged = Counter()
+        with self._lock:
+            for (sample_route, sample_operation), counter in self.stacks.items():
+                if route is not None and sample_route != route:
+                    continue
+                if operation is not None and not sample_operation.startswith(operation):
+                    continue
+                prefix = sample_route + (f";{sample_operation}" if sample_operation else "")
+                for stack, count in counter.items():
+                    merged[f"{prefix};{stack}"] += count
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilingMiddleware:
+    """Profiles a random ``sample_rate`` fraction of requests, plus requests
+    whose ``header`` carries the API token."""
+
+    def __init__(self, app, sample_rate: float, header: str, token: str):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode("latin-1")
+        self.token = token.encode("latin-1")
+
+    def _wanted(self, scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        for key, value in scope["headers"]:
+            if key == self.header:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        with profiler.profile(scope):
+            await self.app(scope, receive, send)
@@ -0,0 +1,82 @@
+"""Retry policy and circuit breaker for storage backends."""
+
+import random
+import time
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.05, max_delay: float = 1.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and rejects calls
+    until ``reset_timeout`` has elapsed; then a single probe call is let through
+    and its outcome closes or re-opens the circuit. A probe that ends without an
+    outcome (cancelled, or failing for an unrelated reason) is abandoned, and one
+    that has not reported back within ``reset_timeout`` is given up on, so the
+    next call probes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.state = self.CLOSED
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if (
+            self.state == self.OPEN and now - self.opened_at >= self.reset_timeout
+            or self.state == self.HALF_OPEN and now - self.probe_started >= self.reset_timeout
+        ):
+            self.state = self.HALF_OPEN
+            self.probe_started = now
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        since = self.probe_started if self.state == self.HALF_OPEN else self.opened_at
+        return max(0.0, self.reset_timeout - (time.monotonic() - since))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """The call ended without telling anything about the backend's health."""
+        if self.state == self.HALF_OPEN:
+            # Back to OPEN with the original opening time: the next call is the new probe.
+            self.state = self.OPEN
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(key: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = _breakers[key] = CircuitBreaker(failure_threshold, reset_timeout)
+    return breaker
@@ -0,0 +1,38 @@
+"""Coalescing of concurrent identical calls."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """At most one call per key in flight; concurrent callers share its outcome.
+
+    The call runs in its own task, so a caller that gives up (client
+    disconnect, timeout) does not cancel it for the others. Only in-flight
+    calls are shared: a caller arriving after a call finished starts a new one.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Result of ``call``, and whether it was shared with an earlier caller."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,143 @@
+"""Writing and reading tar archives as byte streams, one member at a time.
+
+``tarfile`` needs a seekable or blocking file object; here members are
+produced and consumed incrementally from async iterators, so an archive of any
+size passes through in chunks. Archives are POSIX pax: metadata that does not
+fit the ustar header travels in a pax extended header before each member.
+"""
+
+import tarfile
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from app.utils.exceptions import InvalidUploadError
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+# Two zero blocks end an archive.
+END_OF_ARCHIVE = bytes(2 * BLOCK_SIZE)
+
+
+def member_header(name: str, size: int, mtime: float, pax_headers: dict[str, str] | None = None) -> bytes:
+    """Header blocks of a regular file member, including its pax extended header if one is needed."""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    info.pax_headers = dict(pax_headers or {})
+    return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+
+def padding(size: int) -> bytes:
+    """Zeros that fill a member's data up to a whole block."""
+    return bytes(-size % BLOCK_SIZE)
+
+
+def _parse_pax(data: bytes) -> dict[str, str]:
+    """Records of a pax extended header: ``"<length> <key>=<value>\\n"``, the length counting the whole record."""
+    headers = {}
+    position = 0
+    while position < len(data) and data[position] != 0:
+        length_end = data.find(b" ", position)
+        try:
+            length = int(data[position:length_end])
+        except ValueError:
+            raise InvalidUploadError("Malformed pax header in archive") from None
+        record = data[length_end + 1:position + length - 1]
+        key, separator, value = record.partition(b"=")
+        if length <= 0 or not separator:
+            raise InvalidUploadError("Malformed pax header in archive")
+        headers[key.decode("utf-8", "surrogateescape")] = value.decode("utf-8", "surrogateescape")
+        position += length
+    return headers
+
+
+@dataclass
+class TarMember:
+    name: str
+    size: int
+    mtime: float
+    pax_headers: dict[str, str] = field(default_factory=dict)
+
+
+class TarReader:
+    """Regular file members of a tar archive read from ``chunks``.
+
+    ``members`` yields each member once its header is read; its data is then
+    read with ``read``, and whatever the caller leaves unread is skipped
+    before the next member. Directories, links and other special members are
+    skipped.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = aiter(chunks)
+        self._buffer = bytearray()
+        self._remaining = 0
+
+    async def _fill(self, size: int) -> bool:
+        while len(self._buffer) < size:
+            chunk = await anext(self._chunks, None)
+            if chunk is None:
+                return False
+            self._buffer += chunk
+        return True
+
+    async def _read_exactly(self, size: int) -> bytes:
+        if not await self._fill(size):
+            raise InvalidUploadError("Archive is truncated")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def read(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """The current member's data, in chunks of at most ``chunk_size`` bytes."""
+        while self._remaining:
+            if not self._buffer and not await self._fill(1):
+                raise InvalidUploadError("Archive is truncated")
+            size = min(chunk_size, self._remaining, len(self._buffer))
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._remaining -= size
+            yield data
+
+    async def _skip(self, size: int) -> None:
+        self._remaining = size
+        async for _ in self.read(1024 * 1024):
+            pass
+
+    async def members(self) -> AsyncIterator[TarMember]:
+        pax_headers: dict[str, str] = {}
+        long_name = None
+        while True:
+            if not await self._fill(BLOCK_SIZE):
+                # Some writers omit the end-of-archive blocks.
+                if self._buffer:
+                    raise InvalidUploadError("Archive is truncated")
+                return
+            block = await self._read_exactly(BLOCK_SIZE)
+            if not any(block):
+                return
+            try:
+                info = tarfile.TarInfo.frombuf(block, "utf-8", "surrogateescape")
+            except tarfile.HeaderError as e:
+                raise InvalidUploadError(f"Invalid tar header: {e}") from None
+
+            data_padding = -info.size % BLOCK_SIZE
+            if info.type == tarfile.XHDTYPE:
+                pax_headers = _parse_pax(await self._read_exactly(info.size))
+                await self._read_exactly(data_padding)
+                continue
+            if info.type == tarfile.GNUTYPE_LONGNAME:
+                long_name = (await self._read_exactly(info.size)).rstrip(b"\0").decode("utf-8", "surrogateescape")
+                await self._read_exactly(data_padding)
+                continue
+
+            size = int(pax_headers.get("size", info.size))
+            if info.type == tarfile.XGLTYPE or info.type not in tarfile.REGULAR_TYPES:
+                await self._skip(size)
+            else:
+                name = pax_headers.get("path", long_name or info.name)
+                self._remaining = size
+                yield TarMember(name, size, float(pax_headers.get("mtime", info.mtime)), pax_headers)
+                await self._skip(self._remaining)
+            await self._read_exactly(-size % BLOCK_SIZE)
+            pax_headers, long_name = {}, None
@@ -0,0 +1,181 @@
+"""Lightweight request tracing with W3C ``traceparent`` propagation.
+
+Finished spans are exported in the OTLP/JSON span layout, so traces written by
+``JsonLinesSpanExporter`` can be loaded by OpenTelemetry tooling. Spans are only
+recorded for sampled requests; everywhere else ``span()`` is a no-op.
+"""
+
+import atexit
+import json
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from app.utils.metrics import stage_duration
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None = None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, object] = {}
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value: object) -> None:
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}} for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+class InMemorySpanExporter:
+    def __init__(self, max_spans: int = 10000):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonLinesSpanExporter:
+    """Appends one OTLP/JSON span per line to ``path``."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "a", buffering=64 * 1024)
+        atexit.register(self.file.close)
+
+    def export(self, span: Span) -> None:
+        self.file.write(json.dumps(span.to_otlp()) + "\n")
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+    def configure(self, exporter, sample_rate: float) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def current_span(self) -> Span | None:
+        return self._current.get()
+
+    def start_trace(self, name: str, traceparent: str | None = None) -> Span | None:
+        """Start a root span honouring an incoming ``traceparent`` sampling decision."""
+        if self.exporter is None:
+            return None
+        match = _TRACEPARENT.match(traceparent or "")
+        if match:
+            if not int(match.group(3), 16) & 1:
+                return None
+            return Span(name, match.group(1), match.group(2))
+        if random.random() >= self.sample_rate:
+            return None
+        return Span(name, f"{random.getrandbits(128):032x}")
+
+    @contextmanager
+    def activate(self, span: Span):
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.export(span)
+
+    def span(self, name: str, **attributes):
+        parent = self._current.get()
+        if parent is None:
+            return nullcontext()
+        child = Span(name, parent.trace_id, parent.span_id)
+        child.attributes.update(attributes)
+        return self.activate(child)
+
+
+tracer = Tracer()
+
+
+def current_traceparent() -> str | None:
+    span = tracer.current_span
+    return span.traceparent if span is not None else None
+
+
+@contextmanager
+def stage(name: str):
+    """Time a request processing stage in the stage histogram and the current trace."""
+    start = time.perf_counter()
+    try:
+        with tracer.span(name):
+            yield
+    finally:
+        stage_duration.observe(time.perf_counter() - start, name)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of each sampled HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        span.set_attribute("http.method", scope["method"])
+        with tracer.activate(span):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,81 @@
+"""Per-request cost of token authentication.
+
+Times ``Authenticator.authenticate`` for static tokens, cached and uncached
+JWTs and rejected tokens, with a realistic number of configured tenants::
+
+    python -m benchmarks.auth_overhead --tenants 1000 --iterations 20000 --output auth.json
+"""
+
+import argparse
+import asyncio
+import time
+
+from jose import jwt
+
+from app.utils.auth import Authenticator, Principal, VerifiedTokenCache, token_digest
+from benchmarks.harness import summarize, write_results
+
+SECRET = "bench-secret"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=1000, help="configured static tokens")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", default="auth-overhead.json")
+    return parser.parse_args(argv)
+
+
+async def measure(authenticate, tokens: list[str], iterations: int) -> list[float]:
+    samples = []
+    for i in range(iterations):
+        token = tokens[i % len(tokens)]
+        start = time.perf_counter()
+        await authenticate(token)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run_benchmark(args) -> dict:
+    static_tokens = {
+        token_digest(f"tenant-{i}-token"): Principal(f"tenant-{i}", frozenset({"blobs:read"}))
+        for i in range(args.tenants)
+    }
+    authenticator = Authenticator(static_tokens, jwt_secret=SECRET)
+    uncached = Authenticator(static_tokens, jwt_secret=SECRET, cache=VerifiedTokenCache(max_size=0))
+
+    expiry = int(time.time()) + 3600
+    jwts = [
+        jwt.encode({"tenant": f"tenant-{i}", "scope": "blobs:read", "exp": expiry}, SECRET, algorithm="HS256")
+        for i in range(min(args.tenants, 100))
+    ]
+    cases = {
+        "static_token": (authenticator, [f"tenant-{i}-token" for i in range(args.tenants)]),
+        "jwt_cached": (authenticator, jwts),
+        "jwt_uncached": (uncached, jwts),
+        "rejected_token": (authenticator, ["not-a-valid-token"]),
+    }
+
+    results = {}
+    for name, (auth, tokens) in cases.items():
+        await measure(auth.authenticate, tokens, min(1000, args.iterations))
+        elapsed = time.perf_counter()
+        samples = await measure(auth.authenticate, tokens, args.iterations)
+        summary = summarize(samples, time.perf_counter() - elapsed)
+        summary["mean_us"] = summary["mean_ms"] * 1000
+        summary["p99_us"] = summary["p99_ms"] * 1000
+        results[name] = summary
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "auth-overhead", config, results)
+    for name, summary in results.items():
+        print(f"{name}: mean {summary['mean_us']:.1f} us, p99 {summary['p99_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
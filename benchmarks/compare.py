@@ -0,0 +1,64 @@
+"""Compare two benchmark result files.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits with status 1 when throughput drops or a latency percentile grows by
+more than ``--threshold`` percent for any operation.
+"""
+
+import argparse
+import json
+import sys
+
+# metric name -> True when a higher value is better
+METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "p999_ms": False,
+}
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple[list[str], list[str]]:
+    lines, regressions = [], []
+    for operation, base_stats in baseline["results"].items():
+        cand_stats = candidate["results"].get(operation)
+        if not isinstance(base_stats, dict) or not isinstance(cand_stats, dict):
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in base_stats or metric not in cand_stats:
+                continue
+            before, after = base_stats[metric], cand_stats[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            line = f"{operation:>12} {metric:>15} {before:12.2f} {after:12.2f} {change:+8.1f}%"
+            lines.append(line)
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(line)
+    return lines, regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline.get('revision')}  candidate {candidate.get('revision')}")
+    print(f"{'operation':>12} {'metric':>15} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold}%:")
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
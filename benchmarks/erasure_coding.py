@@ -0,0 +1,75 @@
+"""Reed–Solomon encode and decode throughput at several blob sizes.
+
+For each size, times over ``--repeat`` runs:
+
+- ``encode``: splitting the blob and computing the parity shards
+- ``decode_intact``: reassembling it from its data shards (no parity math)
+- ``decode_degraded``: rebuilding it with ``--lost`` data shards missing,
+  from the remaining data shards and parity shards
+
+::
+
+    python -m benchmarks.erasure_coding --data-shards 4 --parity-shards 2 --sizes 64k,1m,16m,64m --output ec.json
+"""
+
+import argparse
+import os
+import time
+
+from app.utils.erasure import ReedSolomon
+from benchmarks.harness import parse_size, summarize, write_results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-shards", type=int, default=4)
+    parser.add_argument("--parity-shards", type=int, default=2)
+    parser.add_argument("--sizes", default="64k,1m,16m,64m")
+    parser.add_argument("--lost", type=int, default=None, help="data shards lost in degraded reads (default: all parity)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="erasure-coding.json")
+    return parser.parse_args(argv)
+
+
+def timed(func, repeat: int, size: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, sum(samples), total_bytes=size * repeat)
+
+
+def run_benchmark(args) -> dict:
+    codec = ReedSolomon(args.data_shards, args.parity_shards)
+    lost = min(args.parity_shards if args.lost is None else args.lost, args.parity_shards, args.data_shards)
+    results = {}
+    for text in args.sizes.split(","):
+        size = parse_size(text)
+        data = os.urandom(size)
+        shards = codec.encode(data)
+        intact = dict(enumerate(shards[:args.data_shards]))
+        degraded = {i: shard for i, shard in enumerate(shards) if i >= lost}
+        # Untimed warm-up: builds the lookup tables of the coefficients used.
+        codec.decode(degraded, size)
+        results[text] = {
+            "encode": timed(lambda: codec.encode(data), args.repeat, size),
+            "decode_intact": timed(lambda: codec.decode(intact, size), args.repeat, size),
+            "decode_degraded": timed(lambda: codec.decode(degraded, size), args.repeat, size),
+        }
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = run_benchmark(args)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "erasure-coding", config, results)
+    for size, operations in results.items():
+        print(size + ": " + ", ".join(
+            f"{operation} {summary['throughput_mib_s']:.0f} MiB/s" for operation, summary in operations.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Small-request latency while large uploads are processed on the same event loop.
+
+Small requests arrive on a fixed schedule and do the Base64 and SHA-256 work
+of a small upload; their latency is measured from the scheduled arrival, so
+time spent waiting for a blocked loop counts. Meanwhile large uploads are
+decoded, hashed and re-encoded back to back. Each mode runs the same load:
+
+- ``idle``: no large uploads, the baseline
+- ``inline``: large payloads processed on the loop (offloading disabled)
+- ``offload``: large payloads processed by ``CPUOffloader``
+
+::
+
+    python -m benchmarks.event_loop_latency --large-size 64m --duration 5 --output loop.json
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import time
+
+from app.utils.offload import CPUOffloader
+from benchmarks.harness import parse_size, summarize, write_results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small-size", default="4k")
+    parser.add_argument("--large-size", default="64m")
+    parser.add_argument("--large-concurrency", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=0.002, help="seconds between small requests")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--threshold", default="1m", help="offload threshold")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", default="event-loop-latency.json")
+    return parser.parse_args(argv)
+
+
+async def process(offloader: CPUOffloader, encoded: str) -> None:
+    data = await offloader.b64decode(encoded)
+    await offloader.sha256_hex(data)
+    await offloader.b64encode(data)
+
+
+async def small_requests(offloader: CPUOffloader, encoded: str, interval: float, deadline: float) -> list[float]:
+    samples = []
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await process(offloader, encoded)
+        samples.append(time.perf_counter() - scheduled)
+        scheduled += interval
+    return samples
+
+
+async def large_uploads(offloader: CPUOffloader, encoded: str, deadline: float) -> int:
+    completed = 0
+    while time.perf_counter() < deadline:
+        await process(offloader, encoded)
+        completed += 1
+        await asyncio.sleep(0)
+    return completed
+
+
+async def run_mode(mode: str, args, small: str, large: str) -> dict:
+    threshold = parse_size(args.threshold)
+    offloader = CPUOffloader(threshold, args.workers if mode == "offload" else 0)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    large_tasks = [] if mode == "idle" else [
+        asyncio.create_task(large_uploads(offloader, large, deadline)) for _ in range(args.large_concurrency)
+    ]
+    samples = await small_requests(offloader, small, args.interval, deadline)
+    uploads = sum(await asyncio.gather(*large_tasks))
+    elapsed = time.perf_counter() - start
+    offloader.shutdown()
+
+    summary = summarize(samples, elapsed)
+    summary["large_uploads"] = uploads
+    summary["large_mib_s"] = uploads * parse_size(args.large_size) / elapsed / 1024 ** 2
+    return summary
+
+
+async def run_benchmark(args) -> dict:
+    small = base64.b64encode(os.urandom(parse_size(args.small_size))).decode()
+    large = base64.b64encode(os.urandom(parse_size(args.large_size))).decode()
+    return {mode: await run_mode(mode, args, small, large) for mode in ("idle", "inline", "offload")}
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "event-loop-latency", config, results)
+    for mode, summary in results.items():
+        print(
+            f"{mode}: small p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, "
+            f"max {summary['max_ms']:.2f} ms; large {summary['large_mib_s']:.0f} MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
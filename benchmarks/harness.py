@@ -0,0 +1,156 @@
+"""Shared helpers for the benchmark scripts: workloads, latency summaries,
+resource usage and result files."""
+
+import json
+import math
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+_SIZE = re.compile(r"^(\d+(?:\.\d+)?)([kmg]?)b?$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    match = _SIZE.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).lower()])
+
+
+class SizeDistribution:
+    """Blob size distribution parsed from a spec string.
+
+    - ``fixed:4k``
+    - ``uniform:1k-64k``
+    - ``lognormal:16k`` (median 16k, sigma 1.0) or ``lognormal:16k:0.5``
+    - ``mix:1k=0.8,1m=0.2`` (weighted choice)
+    """
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        kind, _, args = spec.partition(":")
+        if kind == "fixed":
+            size = parse_size(args)
+            self._sample = lambda: size
+        elif kind == "uniform":
+            low, high = (parse_size(part) for part in args.split("-"))
+            self._sample = lambda: rng.randint(low, high)
+        elif kind == "lognormal":
+            median, _, sigma = args.partition(":")
+            mu, sigma_value = math.log(parse_size(median)), float(sigma or 1.0)
+            self._sample = lambda: max(1, int(rng.lognormvariate(mu, sigma_value)))
+        elif kind == "mix":
+            sizes, weights = [], []
+            for part in args.split(","):
+                size, _, weight = part.partition("=")
+                sizes.append(parse_size(size))
+                weights.append(float(weight))
+            self._sample = lambda: rng.choices(sizes, weights)[0]
+        else:
+            raise ValueError(f"Unknown size distribution: {spec}")
+
+    def sample(self) -> int:
+        return self._sample()
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.bytes: dict[str, int] = {}
+
+    def record(self, operation: str, seconds: float, size: int = 0) -> None:
+        self.samples.setdefault(operation, []).append(seconds)
+        self.bytes[operation] = self.bytes.get(operation, 0) + size
+
+    def error(self, operation: str) -> None:
+        self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self, elapsed: float) -> dict[str, dict]:
+        result = {}
+        everything = []
+        for operation, values in self.samples.items():
+            result[operation] = summarize(values, elapsed, self.errors.get(operation, 0), self.bytes.get(operation, 0))
+            everything.extend(values)
+        result["overall"] = summarize(
+            everything, elapsed, sum(self.errors.values()), sum(self.bytes.values())
+        )
+        return result
+
+
+def summarize(values: list[float], elapsed: float, errors: int = 0, total_bytes: int = 0) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+        "throughput_mib_s": total_bytes / elapsed / 1024 ** 2 if elapsed else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "p999_ms": percentile(ordered, 0.999) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def peak_rss_bytes(pid: int | None = None) -> int:
+    """Peak resident set size of this process, or of ``pid`` on Linux."""
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return 0
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, benchmark: str, config: dict, results: dict) -> dict:
+    document = {
+        "benchmark": benchmark,
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+class Stopwatch:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
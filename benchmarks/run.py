@@ -0,0 +1,222 @@
+"""Load test for the blob API.
+
+Drives ``POST /v1/blobs`` and ``GET /v1/blobs/{id}`` either in-process through
+``httpx.ASGITransport`` or over HTTP against a uvicorn subprocess, and writes
+throughput, latency percentiles and peak RSS to a JSON file::
+
+    python -m benchmarks.run --backend local --sizes lognormal:16k \\
+        --concurrency 32 --read-ratio 0.8 --duration 10 --output local.json
+
+Remote backends are replaced by local stubs (an in-memory S3 endpoint and an
+aioftp server) that run inside the benchmark process.
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+
+from benchmarks.harness import LatencyRecorder, SizeDistribution, Stopwatch, peak_rss_bytes, write_results
+from benchmarks.stubs import FTPStubServer, S3StubServer, free_port
+
+BACKENDS = ("local", "sqlite", "postgres", "s3", "ftp")
+API_TOKEN = "bench-token"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default="local")
+    parser.add_argument("--mode", choices=("inproc", "uvicorn"), default="inproc")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="metadata database URL (required for --backend postgres)")
+    parser.add_argument("--sizes", default="fixed:4k", help="blob size distribution, see harness.SizeDistribution")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="fraction of requests that are reads")
+    parser.add_argument("--preload", type=int, default=100, help="blobs written before measuring")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before the run")
+    parser.add_argument("--s3-latency", type=float, default=0.0, help="milliseconds added to each S3 stub request")
+    parser.add_argument("--inline-threshold", type=int, default=0, help="INLINE_BLOB_THRESHOLD, in bytes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args(argv)
+    if args.backend == "postgres" and not args.database_url:
+        parser.error("--backend postgres requires --database-url")
+    return args
+
+
+def backend_environment(args, workdir: Path, s3: S3StubServer | None, ftp: FTPStubServer | None) -> dict[str, str]:
+    env = {
+        "API_TOKEN": API_TOKEN,
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'metadata.db'}",
+        "LOCAL_STORAGE_PATH": str(workdir / "blobs"),
+        "STORAGE_BACKEND": {"sqlite": "database", "postgres": "database"}.get(args.backend, args.backend),
+        "INLINE_BLOB_THRESHOLD": str(args.inline_threshold),
+    }
+    if s3 is not None:
+        env.update({
+            "S3_ENDPOINT_URL": s3.url,
+            "S3_ACCESS_KEY_ID": "bench",
+            "S3_SECRET_ACCESS_KEY": "bench",
+            "S3_BUCKET_NAME": "bench",
+        })
+    if ftp is not None:
+        env.update({
+            "FTP_HOST": "127.0.0.1",
+            "FTP_PORT": str(ftp.port),
+            "FTP_USERNAME": ftp.username,
+            "FTP_PASSWORD": ftp.password,
+        })
+    return env
+
+
+async def create_schema() -> None:
+    # Imported late: settings are read from the environment at import time.
+    from app.database import engine
+    from app.models.blob_metadata import Base
+    import app.models.blob_data  # noqa: F401  registers the blob_data table
+    import app.models.tenant_usage  # noqa: F401  registers the tenant_usage table
+    import app.models.upload_session  # noqa: F401  registers the upload tables
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+class Workload:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.sizes = SizeDistribution(args.sizes, rng)
+        self.ids: list[str] = []
+        self.counter = itertools.count()
+        self._payload = ""
+
+    def payload(self, size: int) -> str:
+        # Slice one pre-encoded random buffer instead of encoding per request.
+        size = max(3, size - size % 3)
+        if len(self._payload) < size // 3 * 4:
+            self._payload = base64.b64encode(os.urandom(max(size, 1024 * 1024))).decode()
+        return self._payload[: size // 3 * 4]
+
+    async def write(self, client: httpx.AsyncClient, recorder: LatencyRecorder | None) -> None:
+        blob_id = f"bench-{next(self.counter)}"
+        size = self.sizes.sample()
+        body = {"id": blob_id, "data": self.payload(size)}
+        start = time.perf_counter()
+        response = await client.post("/v1/blobs", json=body)
+        elapsed = time.perf_counter() - start
+        if response.status_code == 201:
+            self.ids.append(blob_id)
+            if recorder is not None:
+                recorder.record("write", elapsed, size)
+        elif recorder is not None:
+            recorder.error("write")
+
+    async def read(self, client: httpx.AsyncClient, recorder: LatencyRecorder | None) -> None:
+        blob_id = self.rng.choice(self.ids)
+        start = time.perf_counter()
+        response = await client.get(f"/v1/blobs/{blob_id}")
+        elapsed = time.perf_counter() - start
+        if recorder is None:
+            return
+        if response.status_code == 200:
+            recorder.record("read", elapsed, len(response.content))
+        else:
+            recorder.error("read")
+
+    async def run(self, client: httpx.AsyncClient, seconds: float, recorder: LatencyRecorder | None) -> None:
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                if self.ids and self.rng.random() < self.args.read_ratio:
+                    await self.read(client, recorder)
+                else:
+                    await self.write(client, recorder)
+
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+
+
+async def run_benchmark(args) -> dict:
+    rng = random.Random(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="simpledrive-bench-"))
+    server: subprocess.Popen | None = None
+
+    async with AsyncExitStack() as stack:
+        s3 = await stack.enter_async_context(S3StubServer(args.s3_latency / 1000)) if args.backend == "s3" else None
+        ftp = await stack.enter_async_context(FTPStubServer(workdir / "ftp")) if args.backend == "ftp" else None
+        env = backend_environment(args, workdir, s3, ftp)
+        os.environ.update(env)
+        await create_schema()
+
+        if args.mode == "inproc":
+            from app.main import app
+
+            client_kwargs = {"transport": httpx.ASGITransport(app=app), "base_url": "http://bench"}
+        else:
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+                env={**os.environ, **env},
+            )
+            stack.callback(server.terminate)
+            await wait_until_ready(f"http://127.0.0.1:{port}/")
+            client_kwargs = {"base_url": f"http://127.0.0.1:{port}"}
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        headers = {"Authorization": f"Bearer {API_TOKEN}"}
+        async with httpx.AsyncClient(headers=headers, limits=limits, timeout=60.0, **client_kwargs) as client:
+            workload = Workload(args, rng)
+            for _ in range(args.preload):
+                await workload.write(client, None)
+            await workload.run(client, args.warmup, None)
+
+            recorder = LatencyRecorder()
+            with Stopwatch() as stopwatch:
+                await workload.run(client, args.duration, recorder)
+
+        results = recorder.summary(stopwatch.elapsed)
+        results["elapsed_s"] = stopwatch.elapsed
+        results["peak_rss_bytes"] = peak_rss_bytes(server.pid if server is not None else None)
+        return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "blob-api", config, results)
+    overall = results["overall"]
+    print(
+        f"{args.backend}/{args.mode}: {overall['throughput_rps']:.0f} req/s, "
+        f"p50 {overall['p50_ms']:.2f} ms, p99 {overall['p99_ms']:.2f} ms, p999 {overall['p999_ms']:.2f} ms, "
+        f"peak RSS {results['peak_rss_bytes'] / 1024 ** 2:.0f} MiB -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
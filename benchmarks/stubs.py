@@ -0,0 +1,108 @@
+"""Local stand-ins for remote backends: an in-memory S3 endpoint and an FTP server."""
+
+import asyncio
+import logging
+import socket
+from pathlib import Path
+
+import aioftp
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class S3Stub:
+    """Minimal S3 object API (PUT/GET/HEAD/DELETE). Signatures are not checked.
+
+    ``latency`` seconds are added to every request, to stand in for the round
+    trip to a remote endpoint.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.objects: dict[str, bytes] = {}
+        self.latency = latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        key = scope["path"]
+        method = scope["method"]
+        status, payload = 200, b""
+        if method == "PUT":
+            self.objects[key] = bytes(body)
+        elif method in ("GET", "HEAD"):
+            if key in self.objects:
+                payload = self.objects[key]
+            else:
+                status = 404
+        elif method == "DELETE":
+            self.objects.pop(key, None)
+            status = 204
+
+        headers = [(b"content-length", str(len(payload)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload if method != "HEAD" else b""})
+
+
+class S3StubServer:
+    def __init__(self, latency: float = 0.0):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(
+            uvicorn.Config(S3Stub(latency), host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        )
+        self.task: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.should_exit = True
+        await self.task
+
+
+class FTPStubServer:
+    def __init__(self, root: Path, username: str = "bench", password: str = "bench"):
+        root.mkdir(parents=True, exist_ok=True)
+        self.port = free_port()
+        self.username = username
+        self.password = password
+        user = aioftp.User(
+            username,
+            password,
+            base_path=root,
+            permissions=[aioftp.Permission("/", readable=True, writable=True)],
+        )
+        self.server = aioftp.Server([user])
+        # The backend drops idle control connections without QUIT; keep the log readable.
+        logging.getLogger("aioftp").setLevel(logging.CRITICAL)
+
+    async def __aenter__(self):
+        await self.server.start("127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.server.close()
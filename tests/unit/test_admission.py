@@ -0,0 +1,89 @@
+import asyncio
+import base64
+
+import pytest
+
+from app.config import settings
+from app.storage.limited import ConcurrencyLimitedStorageBackend
+from app.utils.admission import ByteBudget, ConcurrencyLimit, admission
+from app.utils.auth import DEFAULT_TENANT
+from app.utils.exceptions import AdmissionRejectedError
+
+
+@pytest.fixture
+def limits():
+    yield admission
+    admission.configure(0.0, 0.0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_token_gets_429(client, limits):
+    limits.configure(rate=0.5, burst=1, inflight_bytes=0)
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    
+    first = await client.get("/v1/blobs/missing", headers=headers)
+    second = await client.get("/v1/blobs/missing", headers=headers)
+    
+    assert first.status_code == 404
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_upload_over_byte_budget_is_rejected(client, limits, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    limits.configure(rate=0.0, burst=0.0, inflight_bytes=10)
+    limits.admit(DEFAULT_TENANT).reserve(8)
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    payload = {"id": "big", "data": base64.b64encode(b"x" * 64).decode()}
+    
+    response = await client.post("/v1/blobs", json=payload, headers=headers)
+    
+    assert response.status_code == 429
+
+
+
+@pytest.mark.asyncio
+async def test_upload_part_is_charged_to_byte_budget_once(client, limits, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "upload_min_chunk_size", 1)
+    limits.configure(rate=0.0, burst=0.0, inflight_bytes=100)
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    created = await client.post("/v1/uploads", json={"id": "big", "size": 60, "chunk_size": 60}, headers=headers)
+    upload_id = created.json()["upload_id"]
+    
+    response = await client.put(f"/v1/uploads/{upload_id}/parts/0", content=b"x" * 60, headers=headers)
+    
+    assert response.status_code == 204
+
+
+def test_byte_budget_admits_one_oversized_request():
+    budget = ByteBudget(limit=10)
+    
+    assert budget.try_reserve(100)
+    assert not budget.try_reserve(1)
+    budget.release(100)
+    assert budget.try_reserve(4)
+    assert budget.try_reserve(6)
+    assert not budget.try_reserve(1)
+
+
+class SlowBackend:
+    name = "slow"
+
+    async def retrieve(self, blob_id):
+        await asyncio.sleep(0.05)
+        return b"data"
+
+
+@pytest.mark.asyncio
+async def test_backend_concurrency_cap_fails_fast():
+    backend = ConcurrencyLimitedStorageBackend(SlowBackend(), ConcurrencyLimit(1))
+    
+    results = await asyncio.gather(
+        backend.retrieve("a"), backend.retrieve("b"), return_exceptions=True
+    )
+    
+    assert results[0] == b"data"
+    assert isinstance(results[1], AdmissionRejectedError)
+    assert await backend.retrieve("c") == b"data"
@@ -0,0 +1,109 @@
+import base64
+import io
+import os
+import tarfile
+
+import pytest
+
+from app.config import settings
+from app.services.archive import CHECKSUM_HEADER
+from app.utils.tar_stream import TarReader
+
+HEADERS = {"Authorization": f"Bearer {settings.api_token}"}
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.fixture
+def small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "archive_chunk_size", 100)
+    monkeypatch.setattr(settings, "archive_concurrency", 2)
+
+
+async def create(client, blob_id, data):
+    response = await client.post(
+        "/v1/blobs", json={"id": blob_id, "data": base64.b64encode(data).decode()}, headers=HEADERS
+    )
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_export_and_import_round_trip(client, small_chunks):
+    blobs = {f"docs-{i}": os.urandom(i * 70) for i in range(1, 7)}
+    for blob_id, data in blobs.items():
+        await create(client, blob_id, data)
+    await create(client, "other", b"not exported")
+    
+    exported = await client.get("/v1/export", params={"prefix": "docs-"}, headers=HEADERS)
+    
+    assert exported.status_code == 200
+    with tarfile.open(fileobj=io.BytesIO(exported.content)) as archive:
+        assert archive.getnames() == sorted(blobs)
+        assert archive.extractfile("docs-3").read() == blobs["docs-3"]
+    
+    created_at = (await client.get("/v1/blobs/docs-6", headers=HEADERS)).json()["created_at"]
+    for blob_id in blobs:
+        await client.delete(f"/v1/blobs/{blob_id}", headers=HEADERS)
+    imported = await client.post("/v1/import", content=exported.content, headers=HEADERS)
+    
+    assert imported.json() == {"imported": 6, "skipped": 0, "bytes": sum(map(len, blobs.values()))}
+    restored = await client.get("/v1/blobs/docs-6", headers=HEADERS)
+    assert base64.b64decode(restored.json()["data"]) == blobs["docs-6"]
+    assert restored.json()["created_at"] == created_at
+    
+    again = await client.post("/v1/import", content=exported.content, headers=HEADERS)
+    
+    assert again.json()["skipped"] == 6
+
+
+@pytest.mark.asyncio
+async def test_default_tenant_can_export_by_prefix_with_slash(client, small_chunks):
+    await create(client, "reports", b"not under the prefix")
+    
+    exported = await client.get("/v1/export", params={"prefix": "reports/"}, headers=HEADERS)
+    
+    assert exported.status_code == 200
+    with tarfile.open(fileobj=io.BytesIO(exported.content)) as archive:
+        assert archive.getnames() == []
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_corrupt_member(client, small_chunks):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as archive:
+        info = tarfile.TarInfo("corrupt")
+        info.size = 4
+        info.pax_headers = {CHECKSUM_HEADER: "0" * 64}
+        archive.addfile(info, io.BytesIO(b"data"))
+    
+    response = await client.post("/v1/import", content=buffer.getvalue(), headers=HEADERS)
+    
+    assert response.status_code == 400
+    assert (await client.get("/v1/blobs/corrupt", headers=HEADERS)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reader_handles_tarfile_archives():
+    buffer = io.BytesIO()
+    long_name = "nested/" * 30 + "blob"
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.GNU_FORMAT) as archive:
+        archive.addfile(_directory("directory"))
+        for name, data in ((long_name, b"x" * 1000), ("empty", b"")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    reader = TarReader(chunked(buffer.getvalue(), 333))
+    
+    members = [(member.name, b"".join([chunk async for chunk in reader.read(64)])) async for member in reader.members()]
+    
+    assert members == [(long_name, b"x" * 1000), ("empty", b"")]
+
+
+def _directory(name: str) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.type = tarfile.DIRTYPE
+    return info
@@ -0,0 +1,116 @@
+import base64
+import time
+from unittest.mock import patch
+
+import pytest
+from jose import jwt
+
+from app.config import settings
+from app.dependencies import reset_authenticator
+from app.storage.local import LocalStorageBackend
+from app.utils.auth import DEFAULT_TENANT, Authenticator, Principal, VerifiedTokenCache, token_digest
+
+
+@pytest.fixture
+def tenants(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "api_tokens", [
+        {"tenant": "acme", "token": "acme-token"},
+        {"tenant": "reader", "token_sha256": token_digest("reader-token").hex(), "scopes": ["blobs:read"]},
+    ])
+    reset_authenticator()
+    yield
+    reset_authenticator()
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_tenants_have_separate_namespaces(client, tenants):
+    payload = {"id": "doc", "data": base64.b64encode(b"acme data").decode()}
+    
+    response = await client.post("/v1/blobs", json=payload, headers=auth("acme-token"))
+    assert response.status_code == 201
+    assert response.json()["id"] == "doc"
+    
+    assert (await client.get("/v1/blobs/doc", headers=auth("acme-token"))).status_code == 200
+    assert (await client.get("/v1/blobs/doc", headers=auth(settings.api_token))).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_default_tenant_cannot_reach_tenant_blobs(client, tenants):
+    payload = {"id": "doc", "data": base64.b64encode(b"acme data").decode()}
+    assert (await client.post("/v1/blobs", json=payload, headers=auth("acme-token"))).status_code == 201
+    
+    payload = {"id": "acme_doc", "data": base64.b64encode(b"overwritten").decode()}
+    assert (await client.post("/v1/blobs", json=payload, headers=auth(settings.api_token))).status_code == 201
+    for blob_id in ("acme/doc", "acme~doc"):
+        payload = {"id": blob_id, "data": base64.b64encode(b"squatted").decode()}
+        squatted = await client.post("/v1/blobs", json=payload, headers=auth(settings.api_token))
+        assert squatted.status_code == 400
+    
+    response = await client.get("/v1/blobs/doc", headers=auth("acme-token"))
+    assert base64.b64decode(response.json()["data"]) == b"acme data"
+
+
+@pytest.mark.asyncio
+async def test_scopes_are_enforced(client, tenants):
+    payload = {"id": "doc", "data": base64.b64encode(b"data").decode()}
+    
+    response = await client.post("/v1/blobs", json=payload, headers=auth("reader-token"))
+    
+    assert response.status_code == 403
+    assert (await client.get("/v1/blobs/doc", headers=auth("unknown-token"))).status_code == 401
+
+
+def make_jwt(claims, secret="secret"):
+    return jwt.encode({"exp": int(time.time()) + 60, **claims}, secret, algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_verified_jwts_are_cached():
+    authenticator = Authenticator(jwt_secret="secret")
+    token = make_jwt({"tenant": "acme", "scope": "blobs:read other"})
+    
+    with patch("app.utils.auth.jwt.decode", wraps=jwt.decode) as decode:
+        first = await authenticator.authenticate(token)
+        second = await authenticator.authenticate(token)
+    
+    assert first == second == Principal("acme", frozenset({"blobs:read"}))
+    assert decode.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_jwts_are_rejected():
+    authenticator = Authenticator(jwt_secret="secret")
+    
+    assert await authenticator.authenticate(make_jwt({"tenant": "acme"}, secret="wrong")) is None
+    assert await authenticator.authenticate(make_jwt({"tenant": "acme", "exp": int(time.time()) - 10})) is None
+    assert await authenticator.authenticate(make_jwt({"tenant": DEFAULT_TENANT})) is None
+    assert await authenticator.authenticate(make_jwt({"sub": "no-tenant"})) is None
+
+
+def test_token_cache_evicts_least_recently_used_and_expired():
+    cache = VerifiedTokenCache(max_size=2)
+    principal = Principal("acme", frozenset())
+    cache.put(b"a", principal, time.time() + 60)
+    cache.put(b"b", principal, time.time() + 60)
+    cache.get(b"a")
+    cache.put(b"c", principal, time.time() + 60)
+    cache.put(b"expired", principal, time.time() - 1)
+    
+    assert cache.get(b"a") is None
+    assert cache.get(b"b") is None
+    assert cache.get(b"expired") is None
+    assert cache.get(b"c") is principal
+
+
+def test_local_keys_of_tenant_blobs_are_stable(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    
+    for blob_id in ("acme/doc", "acme/a/b_c", "acme/..", "doc", "a b"):
+        key = backend.storage_key(blob_id)
+        assert backend.storage_key(key) == key
+    assert len({backend.storage_key(blob_id) for blob_id in ("acme/a/b", "acme/a_b", "acme_a/b")}) == 3
@@ -0,0 +1,60 @@
+import base64
+import hashlib
+
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    return tmp_path
+
+
+async def create(client, blob_id, data):
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    payload = {"id": blob_id, "data": base64.b64encode(data).decode()}
+    return await client.post("/v1/blobs", json=payload, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_etag_is_sha256_and_supports_conditional_get(client, local_storage):
+    response = await create(client, "etag-blob", b"hello")
+    etag = f'"{hashlib.sha256(b"hello").hexdigest()}"'
+    assert response.headers["etag"] == etag
+    
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    response = await client.get("/v1/blobs/etag-blob", headers=headers)
+    assert response.headers["etag"] == etag
+    
+    response = await client.get("/v1/blobs/etag-blob", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    response = await client.get("/v1/blobs/etag-blob", headers={**headers, "If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_corruption_detected_on_verified_read(client, local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_verification", "always")
+    await create(client, "corrupt-blob", b"hello")
+    (local_storage / "corrupt-blob").write_bytes(b"jello")
+    
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    response = await client.get("/v1/blobs/corrupt-blob", headers=headers)
+    
+    assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_corruption_not_checked_when_verification_off(client, local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "checksum_verification", "off")
+    await create(client, "unchecked-blob", b"hello")
+    (local_storage / "unchecked-blob").write_bytes(b"jello")
+    
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    response = await client.get("/v1/blobs/unchecked-blob", headers=headers)
+    
+    assert response.status_code == 200
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.blob_service import BlobService
+from app.services.existence import ExistenceIndex
+from app.storage.local import LocalStorageBackend
+from app.utils.bloom import BloomFilter
+from app.utils.exceptions import BlobNotFoundError
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter.for_capacity(10000, 0.01)
+    bloom.update(f"blob-{i}" for i in range(10000))
+    
+    assert all(f"blob-{i}" in bloom for i in range(10000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 200
+    assert BloomFilter.from_bytes(bloom.to_bytes()).data == bloom.data
+
+
+async def add_row(db_session, blob_id: str) -> None:
+    db_session.add(BlobMetadata(
+        id=blob_id, size=1, storage_backend="local", created_at=datetime.now(timezone.utc)
+    ))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_unknown_ids_are_answered_without_a_query(db_session, tmp_path, monkeypatch):
+    index = ExistenceIndex()
+    await add_row(db_session, "old")
+    await index.refresh(db_session)
+    service = BlobService(LocalStorageBackend(str(tmp_path)), db_session, existence=index)
+    await service.create_blob("new", b"data")
+    
+    async def no_query(*args):
+        raise AssertionError("queried the database")
+    
+    monkeypatch.setattr(db_session, "get", no_query)
+    with pytest.raises(BlobNotFoundError):
+        await service.get_metadata("missing")
+    assert not await service.blob_exists("missing")
+    assert index.might_contain("old") and index.might_contain("new")
+
+
+@pytest.mark.asyncio
+async def test_saved_index_resumes_with_an_incremental_refresh(db_session, tmp_path):
+    path = str(tmp_path / "index.bin")
+    await add_row(db_session, "before")
+    first = ExistenceIndex(path)
+    assert (await first.refresh(db_session))["mode"] == "rebuild"
+    
+    await add_row(db_session, "while-down")
+    restarted = ExistenceIndex(path)
+    result = await restarted.refresh(db_session)
+    
+    assert result["mode"] == "refresh"
+    assert restarted.might_contain("before") and restarted.might_contain("while-down")
+
+
+def test_index_is_claimed_by_one_process(tmp_path):
+    path = str(tmp_path / "index.bin")
+    first = ExistenceIndex(path)
+    first.claim()
+    
+    with pytest.raises(RuntimeError):
+        ExistenceIndex(path).claim()
+    first.release()
+    ExistenceIndex(path).claim()
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.models.tenant_usage import TenantUsage
+from app.services.blob_service import BlobService
+from app.services.group_commit import GroupCommitWriter
+from app.storage.local import LocalStorageBackend
+from app.utils.exceptions import BlobAlreadyExistsError, QuotaExceededError
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture
+def sessions():
+    return []
+
+
+@pytest.fixture
+def writer(sessions):
+    def session_factory():
+        session = TestSessionLocal()
+        sessions.append(session)
+        return session
+    
+    return GroupCommitWriter(True, max_delay=0.05, max_batch=64, session_factory=session_factory)
+
+
+def row(blob_id, size=10, tenant_id="default"):
+    return BlobMetadata(
+        id=blob_id,
+        size=size,
+        created_at=datetime.now(timezone.utc),
+        storage_backend="local",
+        storage_path=blob_id,
+        tenant_id=tenant_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_share_one_transaction(db_session, writer, sessions):
+    db_session.add(row("taken"))
+    await db_session.commit()
+    rows = [row(f"blob-{i}") for i in range(5)] + [row("taken"), row("too-big", size=100, tenant_id="small")]
+    quotas = [0] * 6 + [50]
+    
+    results = await asyncio.gather(
+        *(writer.insert(metadata, quota) for metadata, quota in zip(rows, quotas)), return_exceptions=True
+    )
+    
+    assert results[:5] == [None] * 5
+    assert isinstance(results[5], BlobAlreadyExistsError)
+    assert isinstance(results[6], QuotaExceededError)
+    assert len(sessions) == 1
+    db_session.expunge_all()
+    assert await db_session.get(BlobMetadata, "blob-4") is not None
+    assert await db_session.get(BlobMetadata, "too-big") is None
+    assert (await db_session.get(TenantUsage, "default")).blob_count == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_committed_without_waiting(db_session):
+    writer = GroupCommitWriter(True, max_delay=10, max_batch=3, session_factory=TestSessionLocal)
+    
+    await asyncio.wait_for(asyncio.gather(*(writer.insert(row(f"blob-{i}"), 0) for i in range(3))), timeout=1)
+    
+    db_session.expunge_all()
+    assert await db_session.get(BlobMetadata, "blob-2") is not None
+
+
+@pytest.mark.asyncio
+async def test_create_blob_through_writer(db_session, writer, tmp_path):
+    service = BlobService(LocalStorageBackend(str(tmp_path)), db_session, writer=writer)
+    
+    await service.create_blob("grouped", b"data")
+    
+    with pytest.raises(BlobAlreadyExistsError):
+        await service.create_blob("grouped", b"data")
+    data, _ = await service.get_blob("grouped")
+    assert data == b"data"
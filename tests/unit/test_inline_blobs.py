@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.blob_service import INLINE_BACKEND, BlobService
+from app.storage.local import LocalStorageBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalStorageBackend(str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_small_blob_is_served_from_metadata_row(db_session, backend, tmp_path):
+    service = BlobService(backend, db_session, inline_threshold=16)
+    await service.create_blob("tiny", b"fits in the row")
+    backend.retrieve = AsyncMock(side_effect=AssertionError("backend read"))
+    db_session.expunge_all()
+    
+    data, metadata = await service.get_blob("tiny")
+    
+    assert data == b"fits in the row"
+    assert metadata.storage_backend == INLINE_BACKEND
+    assert not (tmp_path / "tiny").exists()
+    assert b"".join([chunk async for chunk in service.stream_blob("tiny", metadata, 4)]) == b"fits in the row"
+
+
+@pytest.mark.asyncio
+async def test_blob_at_threshold_goes_to_backend(db_session, backend, tmp_path):
+    service = BlobService(backend, db_session, inline_threshold=16)
+    
+    await service.create_blob("exact", b"sixteen bytes!!!")
+    
+    metadata = await db_session.get(BlobMetadata, "exact")
+    assert metadata.storage_backend == "local"
+    assert metadata.inline_data is None
+    assert (tmp_path / "exact").exists()
+
+
+@pytest.mark.asyncio
+async def test_delete_inline_blob(db_session, backend):
+    service = BlobService(backend, db_session, inline_threshold=16)
+    await service.create_blob("tiny", b"data")
+    backend.delete = AsyncMock()
+    
+    await service.delete_blob("tiny")
+    
+    assert not await service.blob_exists("tiny")
+    backend.delete.assert_not_called()
@@ -0,0 +1,48 @@
+import base64
+
+import pytest
+
+from app.config import settings
+from app.utils.metrics import Counter, Histogram
+
+
+def test_counter_render():
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc("/a")
+    counter.inc("/a", amount=2)
+    
+    lines = list(counter.collect())
+    
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3.0' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "get")
+    histogram.observe(0.5, "get")
+    histogram.observe(5.0, "get")
+    
+    lines = list(histogram.collect())
+    
+    assert 'latency_seconds_bucket{op="get",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{op="get",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{op="get",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{op="get"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    payload = {"id": "metrics-blob", "data": base64.b64encode(b"hello").decode()}
+    
+    response = await client.post("/v1/blobs", json=payload, headers=headers)
+    assert response.status_code == 201
+    
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'simpledrive_http_requests_total{method="POST",route="/v1/blobs",status="201"}' in body
+    assert 'simpledrive_backend_bytes_total{backend="local",direction="in"}' in body
+    assert 'simpledrive_stage_duration_seconds_count{stage="metadata_lookup"}' in body
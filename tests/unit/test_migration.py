@@ -0,0 +1,167 @@
+import hashlib
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.models.migration_checkpoint import MigrationCheckpoint
+from app.services import blob_service as blob_service_module
+from app.services import migration as migration_module
+from app.services.blob_service import BlobService
+from app.services.migration import BlobMigrator
+from app.storage.local import LocalStorageBackend
+from tests.conftest import TestSessionLocal
+
+
+class ColdBackend(LocalStorageBackend):
+    @property
+    def name(self) -> str:
+        return "cold"
+
+
+@pytest.fixture
+def backends(tmp_path, monkeypatch):
+    backends = {"local": LocalStorageBackend(str(tmp_path / "local")), "cold": ColdBackend(str(tmp_path / "cold"))}
+    monkeypatch.setattr(migration_module, "create_recorded_backend", lambda name, session: backends[name])
+    monkeypatch.setattr(blob_service_module, "create_recorded_backend", lambda name, session: backends[name])
+    return backends
+
+
+async def add_blob(db_session, backend, blob_id, data, checksum=None):
+    await backend.store(blob_id, data)
+    db_session.add(BlobMetadata(
+        id=blob_id,
+        size=len(data),
+        created_at=datetime.now(timezone.utc),
+        storage_backend=backend.name,
+        storage_path=backend.storage_key(blob_id),
+        checksum=checksum or hashlib.sha256(data).hexdigest(),
+    ))
+    await db_session.commit()
+
+
+def migrator(**kwargs):
+    return BlobMigrator("local", "cold", concurrency=1, session_factory=TestSessionLocal, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_migrates_blobs_and_records_new_backend(db_session, backends):
+    await add_blob(db_session, backends["local"], "small", b"small blob")
+    await add_blob(db_session, backends["local"], "large", bytes(range(256)) * 40)
+    
+    result = await migrator(chunk_size=1000, delete_source=True).run()
+    
+    assert result == {"migrated": 2, "failed": 0, "bytes": 10 + 10240}
+    db_session.expunge_all()
+    for blob_id in ("small", "large"):
+        metadata = await db_session.get(BlobMetadata, blob_id)
+        assert metadata.storage_backend == "cold"
+        assert not await backends["local"].exists(blob_id)
+    assert await backends["cold"].retrieve("large") == bytes(range(256)) * 40
+    checkpoint = await db_session.get(MigrationCheckpoint, "local->cold")
+    assert checkpoint.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_checksum_mismatch_leaves_blob_on_source(db_session, backends):
+    await add_blob(db_session, backends["local"], "corrupt", b"data", checksum="0" * 64)
+    
+    result = await migrator().run()
+    
+    assert result["failed"] == 1
+    db_session.expunge_all()
+    assert (await db_session.get(BlobMetadata, "corrupt")).storage_backend == "local"
+    assert not await backends["cold"].exists("corrupt")
+
+
+@pytest.mark.asyncio
+async def test_resumes_after_checkpoint(db_session, backends):
+    for blob_id in ("a", "b", "c"):
+        await add_blob(db_session, backends["local"], blob_id, blob_id.encode())
+    db_session.add(MigrationCheckpoint(id="local->cold", cursor="b", migrated=2, failed=0, bytes_migrated=2))
+    await db_session.commit()
+    
+    result = await migrator().run()
+    
+    assert result == {"migrated": 3, "failed": 0, "bytes": 3}
+    assert not await backends["cold"].exists("a")
+    assert await backends["cold"].exists("c")
+
+
+@pytest.mark.asyncio
+async def test_reads_follow_recorded_backend(db_session, backends):
+    await add_blob(db_session, backends["local"], "old", b"written before the switch")
+    service = BlobService(backends["cold"], db_session)
+    
+    data, _ = await service.get_blob("old")
+    
+    assert data == b"written before the switch"
+
+
+async def recreate_on_cold(db_session, backends, blob_id, data):
+    """What a client deleting the blob and uploading it again under the same ID does meanwhile."""
+    db_session.expunge_all()
+    await db_session.delete(await db_session.get(BlobMetadata, blob_id))
+    await db_session.commit()
+    await add_blob(db_session, backends["cold"], blob_id, data)
+
+
+@pytest.mark.asyncio
+async def test_blob_recreated_on_target_during_copy_is_not_overwritten(db_session, backends, monkeypatch):
+    await add_blob(db_session, backends["local"], "doc", b"old data")
+    read = backends["local"].retrieve_stream
+    
+    async def retrieve_stream(blob_id, chunk_size=256 * 1024):
+        async for chunk in read(blob_id, chunk_size):
+            yield chunk
+        await recreate_on_cold(db_session, backends, blob_id, b"new data")
+    
+    monkeypatch.setattr(backends["local"], "retrieve_stream", retrieve_stream)
+    
+    result = await migrator().run()
+    
+    assert result["migrated"] == 0
+    assert await backends["cold"].retrieve("doc") == b"new data"
+
+
+@pytest.mark.asyncio
+async def test_copy_of_blob_recreated_before_switch_is_kept(db_session, backends, monkeypatch):
+    await add_blob(db_session, backends["local"], "doc", b"same data")
+    read = backends["cold"].retrieve_stream
+    
+    async def retrieve_stream(blob_id, chunk_size=256 * 1024):
+        await recreate_on_cold(db_session, backends, blob_id, b"same data")
+        async for chunk in read(blob_id, chunk_size):
+            yield chunk
+    
+    monkeypatch.setattr(backends["cold"], "retrieve_stream", retrieve_stream)
+    
+    result = await migrator().run()
+    
+    assert result == {"migrated": 0, "failed": 0, "bytes": 0}
+    assert await backends["cold"].retrieve("doc") == b"same data"
+
+
+@pytest.mark.asyncio
+async def test_copy_left_by_interrupted_run_is_adopted(db_session, backends):
+    await add_blob(db_session, backends["local"], "doc", b"data")
+    await backends["cold"].store("doc", b"data")
+    
+    result = await migrator().run()
+    
+    assert result == {"migrated": 1, "failed": 0, "bytes": 4}
+    db_session.expunge_all()
+    assert (await db_session.get(BlobMetadata, "doc")).storage_backend == "cold"
+
+
+@pytest.mark.asyncio
+async def test_foreign_object_under_target_key_is_not_overwritten(db_session, backends):
+    await add_blob(db_session, backends["local"], "doc", b"data")
+    await backends["cold"].store("doc", b"something else")
+    
+    result = await migrator().run()
+    
+    assert result["failed"] == 1
+    assert await backends["cold"].retrieve("doc") == b"something else"
+    db_session.expunge_all()
+    assert (await db_session.get(BlobMetadata, "doc")).storage_backend == "local"
@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import os
+import threading
+
+import pytest
+
+from app.utils import offload
+from app.utils.exceptions import InvalidBase64Error
+from app.utils.offload import CPUOffloader
+
+
+@pytest.fixture
+def small_slices(monkeypatch):
+    monkeypatch.setattr(offload, "_DECODE_SLICE", 8)
+    monkeypatch.setattr(offload, "_ENCODE_SLICE", 6)
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_run_inline_and_large_ones_on_workers():
+    offloader = CPUOffloader(threshold=100, max_workers=2)
+    threads = []
+    
+    def record(data):
+        threads.append(threading.current_thread().name)
+        return len(data)
+    
+    assert await offloader.run(10, record, b"x" * 10) == 10
+    assert await offloader.run(1000, record, b"x" * 1000) == 1000
+    offloader.shutdown()
+    
+    assert threads[0] == threading.current_thread().name
+    assert threads[1].startswith("cpu-offload")
+
+
+@pytest.mark.asyncio
+async def test_sliced_transforms_match_whole_payload(small_slices):
+    offloader = CPUOffloader(threshold=1, max_workers=2)
+    data = os.urandom(100)
+    encoded = base64.b64encode(data).decode()
+    
+    assert await offloader.b64encode(data) == encoded
+    assert await offloader.b64decode(encoded) == data
+    assert await offloader.sha256_hex(data) == hashlib.sha256(data).hexdigest()
+    with pytest.raises(InvalidBase64Error):
+        await offloader.b64decode(encoded[:40] + "!" + encoded[41:])
+    offloader.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_padding_at_slice_boundary_is_rejected(small_slices):
+    offloader = CPUOffloader(threshold=0, max_workers=0)
+    
+    with pytest.raises(InvalidBase64Error):
+        await offloader.b64decode("AAAAQQ==QQ==")
+    assert await offloader.b64decode("AAAAAAAAQQ==") == base64.b64decode("AAAAAAAAQQ==")
+    offloader.shutdown()
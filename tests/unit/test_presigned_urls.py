@@ -0,0 +1,86 @@
+import base64
+import hashlib
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import settings
+from app.models.blob_metadata import BlobMetadata
+from app.models.tenant_usage import TenantUsage
+from app.services.blob_service import BlobService
+from app.storage.s3_compatible import S3CompatibleStorageBackend
+from app.utils.exceptions import QuotaExceededError
+
+HEADERS = {"Authorization": f"Bearer {settings.api_token}"}
+
+
+def make_backend():
+    return S3CompatibleStorageBackend(
+        "http://minio:9000",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+        presign_endpoint_url="https://files.example.com",
+    )
+
+
+def head_response(data: bytes, with_checksum: bool = True):
+    headers = {"content-length": str(len(data)), "last-modified": "Wed, 21 Oct 2026 07:28:00 GMT"}
+    if with_checksum:
+        headers["x-amz-checksum-sha256"] = base64.b64encode(hashlib.sha256(data).digest()).decode()
+    return MagicMock(status_code=200, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_upload_url_pins_size_checksum_and_no_overwrite(db_session):
+    checksum = hashlib.sha256(b"payload").hexdigest()
+    
+    url, headers = await BlobService(make_backend(), db_session).create_upload_url("acme/a", 7, checksum, "acme")
+    
+    assert url.startswith("https://files.example.com/test-bucket/acme/a?")
+    assert "X-Amz-SignedHeaders=content-length%3Bhost%3Bif-none-match%3Bx-amz-checksum-sha256" in url
+    assert headers == {
+        "content-length": "7",
+        "if-none-match": "*",
+        "x-amz-checksum-sha256": base64.b64encode(bytes.fromhex(checksum)).decode(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_complete_upload_records_metadata_from_head(db_session):
+    backend = make_backend()
+    
+    with patch.object(backend.client, "head", new_callable=AsyncMock) as mock_head:
+        mock_head.return_value = head_response(b"payload")
+        metadata = await BlobService(backend, db_session).complete_upload("acme/a", "acme")
+    
+    assert mock_head.call_args[1]["headers"]["x-amz-checksum-mode"] == "ENABLED"
+    assert (metadata.size, metadata.checksum) == (7, hashlib.sha256(b"payload").hexdigest())
+    assert metadata.storage_backend == "s3compatible"
+    usage = await db_session.get(TenantUsage, "acme")
+    assert (usage.bytes_used, usage.blob_count) == (7, 1)
+
+
+@pytest.mark.asyncio
+async def test_complete_upload_over_quota_discards_object(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "tenant_quotas", {"acme": 5})
+    backend = make_backend()
+    
+    with patch.object(backend.client, "head", new_callable=AsyncMock) as mock_head, \
+            patch.object(backend.client, "delete", new_callable=AsyncMock) as mock_delete:
+        mock_head.return_value = head_response(b"payload", with_checksum=False)
+        mock_delete.return_value = MagicMock(status_code=204)
+        with pytest.raises(QuotaExceededError):
+            await BlobService(backend, db_session).complete_upload("acme/a", "acme")
+    
+    mock_delete.assert_called_once()
+    assert await db_session.get(BlobMetadata, "acme/a") is None
+
+
+@pytest.mark.asyncio
+async def test_presigned_urls_require_direct_transfer_backend(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    
+    response = await client.post("/v1/blobs/a/upload-url", json={"size": 3}, headers=HEADERS)
+    
+    assert response.status_code == 501
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from app.utils.profiler import ProfilingMiddleware, SamplingProfiler
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_samples_are_tagged_with_route_and_operation():
+    profiler = SamplingProfiler(interval=0.001)
+    
+    with profiler.profile({"path": "/v1/blobs/abc"}):
+        with profiler.operation("storage.local.retrieve"):
+            busy_wait(0.2)
+    
+    lines = profiler.collapsed(route="/v1/blobs/abc", operation="storage.local").splitlines()
+    assert lines
+    assert all(line.startswith("/v1/blobs/abc;storage.local.retrieve;") for line in lines)
+    assert any("busy_wait" in line for line in lines)
+    assert profiler.collapsed(operation="storage.s3") == ""
+    
+    profiler.reset()
+    assert profiler.collapsed() == ""
+
+
+@pytest.mark.asyncio
+async def test_unprofiled_tasks_are_not_sampled():
+    profiler = SamplingProfiler(interval=0.001)
+    
+    with profiler.operation("storage.local.retrieve"):
+        busy_wait(0.05)
+    
+    assert profiler.collapsed() == ""
+
+
+def test_middleware_selects_requests_by_header_token():
+    middleware = ProfilingMiddleware(None, sample_rate=0.0, header="X-Debug-Profile", token="secret")
+    
+    assert middleware._wanted({"headers": [(b"x-debug-profile", b"secret")]})
+    assert not middleware._wanted({"headers": [(b"x-debug-profile", b"wrong")]})
+    assert not middleware._wanted({"headers": []})
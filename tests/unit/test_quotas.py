@@ -0,0 +1,84 @@
+import base64
+
+import pytest
+
+from app.config import settings
+from app.models.blob_metadata import BlobMetadata
+from app.models.tenant_usage import TenantUsage
+from app.services.usage import UsageReconciler, charge_usage
+from app.utils.exceptions import QuotaExceededError
+
+HEADERS = {"Authorization": f"Bearer {settings.api_token}"}
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    return tmp_path
+
+
+async def create(client, blob_id, data):
+    payload = {"id": blob_id, "data": base64.b64encode(data).decode()}
+    return await client.post("/v1/blobs", json=payload, headers=HEADERS)
+
+
+@pytest.mark.asyncio
+async def test_usage_follows_creates_and_deletes(client, local_storage):
+    await create(client, "a", b"12345")
+    await create(client, "b", b"123")
+    
+    usage = (await client.get("/v1/usage", headers=HEADERS)).json()
+    assert (usage["bytes_used"], usage["blob_count"]) == (8, 2)
+    
+    response = await client.delete("/v1/blobs/a", headers=HEADERS)
+    assert response.status_code == 204
+    assert not (local_storage / "a").exists()
+    assert (await client.get("/v1/blobs/a", headers=HEADERS)).status_code == 404
+    
+    usage = (await client.get("/v1/usage", headers=HEADERS)).json()
+    assert (usage["bytes_used"], usage["blob_count"]) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_write_over_quota_is_rejected(client, local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "tenant_quotas", {"default": 10})
+    
+    assert (await create(client, "fits", b"12345678")).status_code == 201
+    response = await create(client, "too-big", b"1234")
+    
+    assert response.status_code == 403
+    assert not (local_storage / "too-big").exists()
+    usage = (await client.get("/v1/usage", headers=HEADERS)).json()
+    assert usage == {"tenant": "default", "bytes_used": 8, "blob_count": 1, "quota_bytes": 10}
+
+
+@pytest.mark.asyncio
+async def test_conditional_update_enforces_quota(db_session):
+    await charge_usage(db_session, "acme", 8, 1, quota=10)
+    await db_session.commit()
+    
+    with pytest.raises(QuotaExceededError):
+        await charge_usage(db_session, "acme", 4, 1, quota=10)
+    await charge_usage(db_session, "acme", 2, 1, quota=10)
+    await db_session.commit()
+    
+    usage = await db_session.get(TenantUsage, "acme")
+    await db_session.refresh(usage)
+    assert (usage.bytes_used, usage.blob_count) == (10, 2)
+
+
+@pytest.mark.asyncio
+async def test_reconciler_corrects_drift(db_session):
+    db_session.add(BlobMetadata(id="x", size=7, storage_backend="local", tenant_id="acme"))
+    db_session.add(TenantUsage(tenant_id="acme", bytes_used=100, blob_count=5))
+    db_session.add(TenantUsage(tenant_id="gone", bytes_used=3, blob_count=1))
+    await db_session.commit()
+    
+    result = await UsageReconciler(db_session).run_once()
+    
+    assert result == {"tenants": 2, "corrected": 2}
+    db_session.expire_all()
+    acme = await db_session.get(TenantUsage, "acme")
+    gone = await db_session.get(TenantUsage, "gone")
+    assert (acme.bytes_used, acme.blob_count) == (7, 1)
+    assert (gone.bytes_used, gone.blob_count) == (0, 0)
@@ -0,0 +1,128 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.blob_service import BlobService
+from app.services.reconciler import Reconciler
+from app.storage.local import LocalStorageBackend
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+from app.utils.rate_limit import TokenBucket
+
+
+def add_metadata(db_session, blob_id, age=timedelta(hours=2)):
+    db_session.add(BlobMetadata(
+        id=blob_id,
+        size=4,
+        created_at=datetime.now(timezone.utc) - age,
+        storage_backend="local",
+        storage_path=blob_id,
+    ))
+
+
+@pytest.fixture
+async def inconsistent_store(db_session, tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    await backend.store("kept", b"data")
+    await backend.store("old-orphan", b"data")
+    await backend.store("new-orphan", b"data")
+    two_hours_ago = time.time() - 7200
+    os.utime(tmp_path / "old-orphan", (two_hours_ago, two_hours_ago))
+    add_metadata(db_session, "kept")
+    add_metadata(db_session, "dangling")
+    await db_session.commit()
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_report_only_changes_nothing(db_session, inconsistent_store, tmp_path):
+    reconciler = Reconciler(inconsistent_store, db_session, TokenBucket(0), page_size=2)
+    
+    report = await reconciler.run_once()
+    
+    assert report["objects"] == 3
+    assert report["rows"] == 2
+    assert sorted(report["examples"]["orphans"]) == ["new-orphan", "old-orphan"]
+    assert report["examples"]["dangling"] == ["dangling"]
+    assert report["repaired"] == 0
+    assert (tmp_path / "old-orphan").exists()
+    assert await db_session.get(BlobMetadata, "dangling") is not None
+
+
+@pytest.mark.asyncio
+async def test_repair_respects_grace_period(db_session, inconsistent_store, tmp_path):
+    reconciler = Reconciler(inconsistent_store, db_session, TokenBucket(0), repair=True, grace_period=3600)
+    
+    report = await reconciler.run_once()
+    
+    assert report["repaired"] == 2
+    assert not (tmp_path / "old-orphan").exists()
+    assert (tmp_path / "new-orphan").exists()
+    assert (tmp_path / "kept").exists()
+    db_session.expunge_all()
+    assert await db_session.get(BlobMetadata, "dangling") is None
+    assert await db_session.get(BlobMetadata, "kept") is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_removes_stored_data(db_session, tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    service = BlobService(backend, db_session)
+    db_session.commit = AsyncMock(side_effect=RuntimeError("database gone"))
+    
+    with pytest.raises(RuntimeError):
+        await service.create_blob("lost", b"data")
+    
+    assert not (tmp_path / "lost").exists()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    
+    assert time.monotonic() - start >= 0.025
+
+
+@pytest.mark.asyncio
+async def test_repair_keeps_blobs_stored_under_a_sanitized_key(db_session, tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    await backend.store("my file.txt", b"data")
+    os.utime(tmp_path / "my_file.txt", (time.time() - 7200, time.time() - 7200))
+    add_metadata(db_session, "my file.txt")
+    # As backfilled by migration 010 for rows that recorded the blob ID.
+    (await db_session.get(BlobMetadata, "my file.txt")).storage_path = "my_file.txt"
+    await db_session.commit()
+    
+    report = await Reconciler(backend, db_session, TokenBucket(0), repair=True, grace_period=60).run_once()
+    
+    assert (report["orphans"], report["dangling"]) == (0, 0)
+    assert (tmp_path / "my_file.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_objects_are_not_reported_missing(db_session):
+    backend = AsyncMock()
+    backend.name = "local"
+    backend.list_blobs = MagicMock(return_value=_no_pages())
+    backend.exists = AsyncMock(return_value=False)
+    backend.stat = AsyncMock(side_effect=[StorageBackendError("timeout"), BlobNotFoundError("gone")])
+    add_metadata(db_session, "first")
+    add_metadata(db_session, "second")
+    await db_session.commit()
+    
+    report = await Reconciler(backend, db_session, TokenBucket(0), repair=True, grace_period=60).run_once()
+    
+    assert report["examples"]["dangling"] == ["second"]
+    backend.retrieve.assert_not_called()
+
+
+async def _no_pages():
+    return
+    yield
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.storage.resilient import ResilientStorageBackend
+from app.utils.exceptions import BackendUnavailableError, BlobNotFoundError, StorageBackendError
+from app.utils.resilience import CircuitBreaker, RetryPolicy
+
+
+def make_backend(inner, failure_threshold=5, reset_timeout=30.0):
+    return ResilientStorageBackend(
+        inner,
+        RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0),
+        CircuitBreaker(failure_threshold, reset_timeout),
+    )
+
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.1, max_delay=0.3)
+    for attempt in range(1, 6):
+        assert 0 <= policy.backoff(attempt) <= 0.3
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_failure():
+    inner = AsyncMock()
+    inner.retrieve = AsyncMock(side_effect=[StorageBackendError("timeout"), b"data"])
+    backend = make_backend(inner)
+    
+    assert await backend.retrieve("blob") == b"data"
+    assert inner.retrieve.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_store_retried_with_same_content():
+    inner = AsyncMock()
+    inner.store = AsyncMock(side_effect=[StorageBackendError("reset"), None])
+    backend = make_backend(inner)
+    
+    await backend.store("blob", b"data", "checksum")
+    
+    assert [call.args for call in inner.store.call_args_list] == [("blob", b"data", "checksum")] * 2
+
+
+@pytest.mark.asyncio
+async def test_starting_and_committing_staged_uploads_is_not_retried():
+    inner = AsyncMock()
+    inner.begin_staged = AsyncMock(side_effect=StorageBackendError("reset"))
+    inner.commit_staged = AsyncMock(side_effect=StorageBackendError("reset"))
+    backend = make_backend(inner)
+    
+    with pytest.raises(StorageBackendError):
+        await backend.begin_staged("blob")
+    with pytest.raises(StorageBackendError):
+        await backend.commit_staged("blob", "upload", [(0, "etag")])
+    
+    assert inner.begin_staged.call_count == 1
+    assert inner.commit_staged.call_count == 1
+    assert backend.breaker.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_not_retried():
+    inner = AsyncMock()
+    inner.retrieve = AsyncMock(side_effect=BlobNotFoundError("missing"))
+    backend = make_backend(inner)
+    
+    with pytest.raises(BlobNotFoundError):
+        await backend.retrieve("blob")
+    assert inner.retrieve.call_count == 1
+    assert backend.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    inner = AsyncMock()
+    inner.retrieve = AsyncMock(side_effect=StorageBackendError("down"))
+    backend = make_backend(inner)
+    
+    with pytest.raises(StorageBackendError):
+        await backend.retrieve("blob")
+    assert inner.retrieve.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    inner = AsyncMock()
+    inner.retrieve = AsyncMock(side_effect=StorageBackendError("down"))
+    backend = make_backend(inner, failure_threshold=2)
+    
+    with pytest.raises(StorageBackendError):
+        await backend.retrieve("blob")
+    calls = inner.retrieve.call_count
+    
+    with pytest.raises(BackendUnavailableError) as exc_info:
+        await backend.retrieve("blob")
+    assert inner.retrieve.call_count == calls
+    assert exc_info.value.retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_circuit():
+    inner = AsyncMock()
+    inner.exists = AsyncMock(side_effect=[StorageBackendError("down"), True])
+    backend = make_backend(inner, failure_threshold=1, reset_timeout=0.0)
+    
+    assert await backend.exists("blob") is True
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_wedge_circuit():
+    inner = AsyncMock()
+    inner.exists = AsyncMock(side_effect=[StorageBackendError("down"), asyncio.CancelledError(), True])
+    backend = make_backend(inner, failure_threshold=1, reset_timeout=0.0)
+    backend.policy.max_attempts = 1
+    with pytest.raises(StorageBackendError):
+        await backend.exists("blob")
+    
+    with pytest.raises(asyncio.CancelledError):
+        await backend.exists("blob")
+    
+    assert backend.breaker.state == CircuitBreaker.OPEN
+    assert await backend.exists("blob") is True
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unanswered_probe_times_out(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow()
+    
+    now[0] += 10
+    
+    assert not breaker.allow()
+    assert breaker.retry_after() == 20
+    now[0] += 20
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_releases_probe():
+    async def stream(blob_id, chunk_size):
+        yield b"first"
+        yield b"second"
+    
+    inner = AsyncMock()
+    inner.retrieve_stream = stream
+    backend = make_backend(inner, failure_threshold=1, reset_timeout=0.0)
+    backend.breaker.record_failure()
+    chunks = backend.retrieve_stream("blob")
+    
+    assert await chunks.__anext__() == b"first"
+    await chunks.aclose()
+    
+    assert backend.breaker.state == CircuitBreaker.OPEN
+    assert [chunk async for chunk in backend.retrieve_stream("blob")] == [b"first", b"second"]
+    assert backend.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,99 @@
+import asyncio
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.blob_service import BlobService
+from app.storage.base import StorageBackend
+from app.utils.single_flight import SingleFlight
+from tests.conftest import TestSessionLocal
+
+
+class SlowBackend(StorageBackend):
+    def __init__(self):
+        self.retrieves = 0
+        self.release = asyncio.Event()
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        pass
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        self.retrieves += 1
+        await self.release.wait()
+        return b"popular"
+
+    async def exists(self, blob_id: str) -> bool:
+        return True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+    
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return object()
+    
+    tasks = [asyncio.create_task(flight.do("key", call)) for _ in range(10)]
+    await asyncio.sleep(0)
+    tasks[0].cancel()
+    release.set()
+    results = await asyncio.gather(*tasks[1:])
+    
+    assert calls == 1
+    assert len({id(result) for result, _ in results}) == 1
+    assert [shared for _, shared in results] == [True] * 9
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+    
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await flight.do("key", lambda: asyncio.sleep(0, "ok")) == ("ok", False)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_of_a_blob_hit_the_backend_once(db_session):
+    backend = SlowBackend()
+    metadata = BlobMetadata(id="popular", size=7, storage_backend=backend.name)
+    service = BlobService(backend, db_session, checksum_verification="off")
+    
+    readers = [asyncio.create_task(service.get_blob("popular", metadata)) for _ in range(50)]
+    await asyncio.sleep(0)
+    backend.release.set()
+    results = await asyncio.gather(*readers)
+    
+    assert backend.retrieves == 1
+    assert all(data is results[0][0] for data, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_shared_metadata_lookup_survives_its_leader(db_session):
+    db_session.add(BlobMetadata(id="doc", size=1, storage_backend="local"))
+    await db_session.commit()
+    leader_session = TestSessionLocal()
+    leader_session.get = AsyncMock(side_effect=AssertionError("looked up in the leader's session"))
+    leader = asyncio.create_task(BlobService(SlowBackend(), leader_session).get_metadata("doc"))
+    follower = asyncio.create_task(BlobService(SlowBackend(), db_session).get_metadata("doc"))
+    await asyncio.sleep(0)
+    
+    leader.cancel()
+    await leader_session.close()
+    
+    metadata = await follower
+    assert metadata.id == "doc"
+    assert metadata in db_session
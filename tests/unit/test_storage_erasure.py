@@ -0,0 +1,73 @@
+import itertools
+import os
+
+import pytest
+
+from app.storage.erasure import ErasureCodedStorageBackend
+from app.storage.local import LocalStorageBackend
+from app.utils.erasure import ReedSolomon
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+
+
+@pytest.mark.parametrize("size", [0, 1, 7, 4096, 100001])
+def test_any_data_shards_rebuild_the_data(size):
+    codec = ReedSolomon(4, 2)
+    data = os.urandom(size)
+    shards = codec.encode(data)
+    
+    for kept in itertools.combinations(range(6), 4):
+        assert codec.decode({index: shards[index] for index in kept}, size) == data
+
+
+@pytest.fixture
+def erasure(tmp_path):
+    backends = {name: LocalStorageBackend(str(tmp_path / name)) for name in ("a", "b", "c")}
+    return ErasureCodedStorageBackend(backends, 4, 2)
+
+
+@pytest.mark.asyncio
+async def test_blob_survives_the_loss_of_a_backend(erasure, tmp_path):
+    data = os.urandom(10000)
+    await erasure.store("blob", data)
+    
+    for path in (tmp_path / "b").iterdir():
+        path.unlink()
+    
+    assert await erasure.retrieve("blob") == data
+    assert await erasure.exists("blob") is True
+
+
+@pytest.mark.asyncio
+async def test_corrupt_shards_are_not_used(erasure, tmp_path):
+    data = os.urandom(10000)
+    await erasure.store("blob", data)
+    shard = next((tmp_path / "a").iterdir())
+    frame = shard.read_bytes()
+    shard.write_bytes(frame[:-1] + bytes([frame[-1] ^ 1]))
+    
+    assert await erasure.retrieve("blob") == data
+    
+    for path in (tmp_path / "c").iterdir():
+        path.unlink()
+    with pytest.raises(StorageBackendError):
+        await erasure.retrieve("blob")
+
+
+@pytest.mark.asyncio
+async def test_missing_and_deleted_blobs_are_not_found(erasure, tmp_path):
+    with pytest.raises(BlobNotFoundError):
+        await erasure.retrieve("missing")
+    
+    await erasure.store("blob", b"data")
+    await erasure.delete("blob")
+    
+    assert await erasure.exists("blob") is False
+    assert not any(path.is_file() for path in tmp_path.rglob("*"))
+
+
+def test_layout_must_survive_the_loss_of_a_backend(tmp_path):
+    backends = {name: LocalStorageBackend(str(tmp_path / name)) for name in ("a", "b")}
+    
+    with pytest.raises(StorageBackendError):
+        ErasureCodedStorageBackend(backends, 4, 2)
+    ErasureCodedStorageBackend(backends, 2, 2)
@@ -1,3 +1,4 @@
+import aioftp
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -15,6 +16,7 @@ def mock_ftp_client():
     client.remove_file = AsyncMock()
     client.change_directory = AsyncMock()
     client.make_directory = AsyncMock()
+    client.close = MagicMock()
     return client
 
 
@@ -68,18 +70,38 @@ async def test_ftp_retrieve_not_found(mock_ftp_client):
     with patch("aioftp.Client", return_value=mock_ftp_client):
         backend.client = mock_ftp_client
         
-        # Mock download_stream to raise exception (file doesn't exist)
+        # Server answers RETR with 550 (file unavailable)
         mock_context = MagicMock()
-        mock_context.__aenter__ = AsyncMock(side_effect=Exception("File not found"))
+        mock_context.__aenter__ = AsyncMock(
+            side_effect=aioftp.StatusCodeError(aioftp.Code("1xx"), aioftp.Code("550"), "No such file")
+        )
         mock_context.__aexit__ = AsyncMock(return_value=None)
         mock_ftp_client.download_stream = MagicMock(return_value=mock_context)
         
-        # Mock exists to return False
-        mock_ftp_client.stat = AsyncMock(side_effect=Exception("Not found"))
-        mock_ftp_client.list.return_value = []
-        
         with pytest.raises(BlobNotFoundError):
             await backend.retrieve("non-existent")
+        
+        # No extra existence round trip
+        mock_ftp_client.stat.assert_not_called()
+        mock_ftp_client.list.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ftp_retrieve_failure_drops_connection(mock_ftp_client):
+    backend = FTPStorageBackend("localhost", 21, "user", "pass", "/base")
+    
+    with patch("aioftp.Client", return_value=mock_ftp_client):
+        backend.client = mock_ftp_client
+        
+        mock_context = MagicMock()
+        mock_context.__aenter__ = AsyncMock(side_effect=ConnectionResetError("reset"))
+        mock_context.__aexit__ = AsyncMock(return_value=None)
+        mock_ftp_client.download_stream = MagicMock(return_value=mock_context)
+        
+        with pytest.raises(StorageBackendError):
+            await backend.retrieve("test-blob")
+        
+        assert backend.client is None
 
 
 @pytest.mark.asyncio
@@ -134,3 +156,13 @@ async def test_ftp_connection_error():
         with pytest.raises(StorageBackendError, match="Failed to connect"):
             await backend.store("test", b"data")
 
+
+
+@pytest.mark.asyncio
+async def test_ftp_client_uses_configured_timeouts(mock_ftp_client):
+    backend = FTPStorageBackend("localhost", 21, "user", "pass", "/", connect_timeout=2.0, read_timeout=10.0)
+    
+    with patch("aioftp.Client", return_value=mock_ftp_client) as mock_client_class:
+        await backend._ensure_connected()
+        
+        mock_client_class.assert_called_once_with(connection_timeout=2.0, socket_timeout=10.0)
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.rebalance import VolumeRebalancer
+from app.storage.multi_volume import MultiVolumeStorageBackend, parse_volumes
+from app.utils.hash_ring import HashRing
+from tests.conftest import TestSessionLocal
+
+
+def test_adding_a_node_moves_only_its_share_of_keys():
+    keys = [f"blob-{i}" for i in range(10000)]
+    before = HashRing({"a": 1, "b": 1, "c": 1})
+    after = HashRing({"a": 1, "b": 1, "c": 1, "d": 1})
+    
+    moved = [key for key in keys if before.node(key) != after.node(key)]
+    
+    assert all(after.node(key) == "d" for key in moved)
+    assert 0.2 < len(moved) / len(keys) < 0.3
+
+
+def test_weights_set_the_share_of_keys():
+    ring = HashRing({"small": 1, "large": 3})
+    
+    share = sum(ring.node(f"blob-{i}") == "large" for i in range(10000)) / 10000
+    
+    assert 0.7 < share < 0.8
+
+
+def test_parse_volumes():
+    assert parse_volumes("/mnt/a=2, /mnt/b") == {"/mnt/a": 2.0, "/mnt/b": 1.0}
+
+
+async def store_blobs(db_session, backend, count):
+    for i in range(count):
+        await backend.store(f"blob-{i}", f"data {i}".encode())
+        db_session.add(BlobMetadata(id=f"blob-{i}", size=7, storage_backend="local", storage_path=f"blob-{i}"))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_added_volume_is_filled_by_the_rebalancer(db_session, tmp_path):
+    paths = [str(tmp_path / name) for name in ("a", "b", "c")]
+    await store_blobs(db_session, MultiVolumeStorageBackend({paths[0]: 1, paths[1]: 1}), 300)
+    
+    new = MultiVolumeStorageBackend({path: 1 for path in paths})
+    assert await new.retrieve("blob-7") == b"data 7"
+    report = await VolumeRebalancer(new, chunk_size=4, session_factory=TestSessionLocal).run_once()
+    
+    assert 50 < report["moved"] < 150
+    assert report["failed"] == 0
+    for i in range(300):
+        assert await new.volume(f"blob-{i}").retrieve(f"blob-{i}") == f"data {i}".encode()
+    assert (await VolumeRebalancer(new, session_factory=TestSessionLocal).run_once())["moved"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rebalancers_do_not_lose_blobs(db_session, tmp_path):
+    paths = [str(tmp_path / name) for name in ("a", "b", "c")]
+    await store_blobs(db_session, MultiVolumeStorageBackend({paths[0]: 1}), 40)
+    (tmp_path / "a" / "orphan").write_bytes(b"no metadata")
+    new = MultiVolumeStorageBackend({path: 1 for path in paths})
+    
+    reports = await asyncio.gather(
+        *(VolumeRebalancer(new, chunk_size=4, session_factory=TestSessionLocal).run_once() for _ in range(2))
+    )
+    
+    assert min(report["checked"] for report in reports) == 0
+    assert sum(report["failed"] for report in reports) == 0
+    for i in range(40):
+        assert await new.retrieve(f"blob-{i}") == f"data {i}".encode()
+    assert (tmp_path / "a" / "orphan").exists()
+
+
+@pytest.mark.asyncio
+async def test_staged_upload_commits_on_the_volume_it_started_on(tmp_path):
+    paths = [str(tmp_path / name) for name in ("a", "b")]
+    backend = MultiVolumeStorageBackend({path: 1 for path in paths})
+    
+    upload_id = await backend.begin_staged("blob")
+    await backend.stage_part("blob", upload_id, 0, 0, b"data")
+    await backend.commit_staged("blob", upload_id, [(0, None)])
+    
+    assert await backend.volume("blob").retrieve("blob") == b"data"
+
+
+async def misplaced_blob(db_session, tmp_path, checksum=None):
+    """A blob on volume "a" that belongs on "b" once "b" is added, and the backend with both."""
+    paths = [str(tmp_path / name) for name in ("a", "b")]
+    new = MultiVolumeStorageBackend({path: 1 for path in paths})
+    key = next(f"blob-{i}" for i in range(100) if new.volume(f"blob-{i}") is new.volumes[paths[1]])
+    await new.volumes[paths[0]].store(key, b"old data")
+    db_session.add(BlobMetadata(id=key, size=8, storage_backend="local", storage_path=key, checksum=checksum))
+    await db_session.commit()
+    return new, key
+
+
+@pytest.mark.asyncio
+async def test_blob_recreated_during_move_keeps_its_new_data(db_session, tmp_path, monkeypatch):
+    new, key = await misplaced_blob(db_session, tmp_path)
+    source = new.volumes[str(tmp_path / "a")]
+    read = source.retrieve_stream
+    
+    async def retrieve_stream(blob_id, chunk_size=256 * 1024):
+        async for chunk in read(blob_id, chunk_size):
+            yield chunk
+        # A client deletes the blob and uploads it again under the same ID.
+        await db_session.delete(await db_session.get(BlobMetadata, key))
+        await db_session.commit()
+        await new.delete(key)
+        await new.store(key, b"new data")
+        db_session.add(BlobMetadata(id=key, size=8, storage_backend="local", storage_path=key))
+        await db_session.commit()
+    
+    monkeypatch.setattr(source, "retrieve_stream", retrieve_stream)
+    
+    report = await VolumeRebalancer(new, chunk_size=4, session_factory=TestSessionLocal).run_once()
+    
+    assert report["moved"] == 0
+    assert await new.retrieve(key) == b"new data"
+
+
+@pytest.mark.asyncio
+async def test_move_never_replaces_a_file_on_the_target(db_session, tmp_path):
+    checksum = hashlib.sha256(b"old data").hexdigest()
+    new, key = await misplaced_blob(db_session, tmp_path, checksum)
+    target = new.volumes[str(tmp_path / "b")]
+    await target.store(key, b"other data")
+    rebalancer = VolumeRebalancer(new, session_factory=TestSessionLocal)
+    
+    assert (await rebalancer.run_once())["failed"] == 1
+    assert await target.retrieve(key) == b"other data"
+    
+    # Left by an earlier pass interrupted before it removed the old copy.
+    await target.store(key, b"old data")
+    assert (await rebalancer.run_once())["failed"] == 0
+    assert not await new.volumes[str(tmp_path / "a")].exists(key)
+    assert await new.retrieve(key) == b"old data"
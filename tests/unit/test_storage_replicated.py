@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.storage.base import StorageBackend
+from app.storage.replicated import ReplicatedStorageBackend, hedge_stats, pending_repairs
+from app.utils.exceptions import BlobNotFoundError, StorageBackendError
+
+
+class MemoryBackend(StorageBackend):
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.blobs: dict[str, bytes] = {}
+        self.delay = delay
+        self.fail = fail
+
+    async def store(self, blob_id: str, data: bytes, checksum: str | None = None) -> None:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise StorageBackendError("replica down")
+        self.blobs[blob_id] = data
+
+    async def retrieve(self, blob_id: str) -> bytes:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise StorageBackendError("replica down")
+        if blob_id not in self.blobs:
+            raise BlobNotFoundError(f"Blob {blob_id} not found")
+        return self.blobs[blob_id]
+
+    async def exists(self, blob_id: str) -> bool:
+        return blob_id in self.blobs
+
+    async def delete(self, blob_id: str) -> None:
+        self.blobs.pop(blob_id, None)
+
+
+@pytest.fixture(autouse=True)
+def clear_repairs():
+    pending_repairs.clear()
+    yield
+    pending_repairs.clear()
+
+
+@pytest.mark.asyncio
+async def test_store_acknowledges_after_quorum():
+    slow = MemoryBackend(delay=0.2)
+    replicas = {"a": MemoryBackend(), "b": MemoryBackend(), "slow": slow}
+    backend = ReplicatedStorageBackend(replicas, write_quorum=2)
+
+    await asyncio.wait_for(backend.store("blob", b"data"), timeout=0.1)
+
+    assert "blob" not in slow.blobs
+    await asyncio.sleep(0.25)
+    assert slow.blobs["blob"] == b"data"
+
+
+@pytest.mark.asyncio
+async def test_store_fails_when_quorum_unreachable():
+    replicas = {"a": MemoryBackend(), "b": MemoryBackend(fail=True), "c": MemoryBackend(fail=True)}
+    backend = ReplicatedStorageBackend(replicas, write_quorum=2)
+
+    with pytest.raises(StorageBackendError, match="quorum"):
+        await backend.store("blob", b"data")
+
+
+@pytest.mark.asyncio
+async def test_store_flags_failed_replica_for_repair():
+    replicas = {"a": MemoryBackend(), "b": MemoryBackend(), "c": MemoryBackend(fail=True)}
+    backend = ReplicatedStorageBackend(replicas, write_quorum=2)
+
+    await backend.store("blob", b"data")
+    await asyncio.sleep(0)
+
+    assert "blob" in pending_repairs
+
+
+@pytest.mark.asyncio
+async def test_retrieve_hedges_slow_replica():
+    slow = MemoryBackend(delay=1.0)
+    fast = MemoryBackend()
+    slow.blobs["blob"] = fast.blobs["blob"] = b"data"
+    backend = ReplicatedStorageBackend({"slow": slow, "fast": fast}, write_quorum=1, default_hedge_delay=0.01)
+    backend._read_order = lambda: ["slow", "fast"]
+    wins = hedge_stats.hedge_wins
+
+    assert await asyncio.wait_for(backend.retrieve("blob"), timeout=0.5) == b"data"
+    assert hedge_stats.hedge_wins == wins + 1
+
+
+@pytest.mark.asyncio
+async def test_read_miss_is_repaired():
+    holder = MemoryBackend()
+    empty = MemoryBackend()
+    holder.blobs["blob"] = b"data"
+    backend = ReplicatedStorageBackend({"empty": empty, "holder": holder}, write_quorum=1)
+    backend._read_order = lambda: ["empty", "holder"]
+
+    assert await backend.retrieve("blob") == b"data"
+    assert "blob" in pending_repairs
+
+    assert await backend.repair("blob") == 1
+    assert empty.blobs["blob"] == b"data"
+
+
+@pytest.mark.asyncio
+async def test_retrieve_not_found_on_all_replicas():
+    backend = ReplicatedStorageBackend({"a": MemoryBackend(), "b": MemoryBackend()}, write_quorum=1)
+
+    with pytest.raises(BlobNotFoundError):
+        await backend.retrieve("missing")
@@ -1,7 +1,11 @@
+import asyncio
+import base64
+import hashlib
+
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.storage.s3_compatible import S3CompatibleStorageBackend
+from app.storage.s3_compatible import S3CompatibleStorageBackend, hedge_stats
 from app.utils.exceptions import BlobNotFoundError, StorageBackendError
 
 
@@ -25,6 +29,28 @@ async def test_s3_store_success():
         assert "Authorization" in mock_put.call_args[1]["headers"]
 
 
+@pytest.mark.asyncio
+async def test_s3_store_sends_precomputed_checksum():
+    backend = S3CompatibleStorageBackend(
+        "https://s3.amazonaws.com",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+    )
+    checksum = hashlib.sha256(b"test data").hexdigest()
+    
+    with patch.object(backend.client, "put", new_callable=AsyncMock) as mock_put, \
+            patch("hashlib.sha256", wraps=hashlib.sha256) as mock_sha256:
+        mock_put.return_value = MagicMock(status_code=200)
+        
+        await backend.store("test-blob", b"test data", checksum)
+        
+        headers = mock_put.call_args[1]["headers"]
+        assert headers["x-amz-content-sha256"] == checksum
+        assert headers["x-amz-checksum-sha256"] == base64.b64encode(bytes.fromhex(checksum)).decode()
+        assert all(call.args[:1] != (b"test data",) for call in mock_sha256.call_args_list)
+
+
 @pytest.mark.asyncio
 async def test_s3_retrieve_success():
     backend = S3CompatibleStorageBackend(
@@ -101,3 +127,79 @@ async def test_s3_exists_false():
         
         assert result is False
 
+
+
+def test_s3_timeouts_configured():
+    backend = S3CompatibleStorageBackend(
+        "https://s3.amazonaws.com",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+        connect_timeout=2.0,
+        read_timeout=10.0,
+    )
+    
+    assert backend.client.timeout.connect == 2.0
+    assert backend.client.timeout.read == 10.0
+
+
+@pytest.mark.asyncio
+async def test_s3_retrieve_hedges_slow_request():
+    backend = S3CompatibleStorageBackend(
+        "https://s3.amazonaws.com",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+        hedge_reads=True,
+        default_hedge_delay=0.01,
+    )
+    
+    mock_response = AsyncMock()
+    mock_response.status_code = 200
+    mock_response.content = b"test data"
+    mock_response.raise_for_status = MagicMock()
+    calls = 0
+    
+    async def get(url, headers):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1.0)
+        return mock_response
+    
+    wins = hedge_stats.hedge_wins
+    with patch.object(backend.client, "get", side_effect=get):
+        result = await asyncio.wait_for(backend.retrieve("test-blob"), timeout=0.5)
+    
+    assert result == b"test data"
+    assert calls == 2
+    assert hedge_stats.hedge_wins == wins + 1
+
+
+@pytest.mark.asyncio
+async def test_s3_list_blobs_follows_continuation_token():
+    backend = S3CompatibleStorageBackend(
+        "https://s3.amazonaws.com",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+    )
+    pages = [
+        b'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+        b"<IsTruncated>true</IsTruncated><NextContinuationToken>next/token=</NextContinuationToken>"
+        b"<Contents><Key>a</Key><Size>3</Size><LastModified>2024-01-01T00:00:00.000Z</LastModified></Contents>"
+        b"</ListBucketResult>",
+        b"<ListBucketResult><IsTruncated>false</IsTruncated>"
+        b"<Contents><Key>b</Key><Size>5</Size></Contents></ListBucketResult>",
+    ]
+    
+    with patch.object(backend.client, "get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = [MagicMock(status_code=200, content=page) for page in pages]
+        
+        result = [page async for page in backend.list_blobs(page_size=1)]
+        
+        assert [[stored.key for stored in page] for page in result] == [["a"], ["b"]]
+        assert result[0][0].size == 3
+        assert result[0][0].modified_at.year == 2024
+        second_url = mock_get.call_args_list[1][0][0]
+        assert second_url.endswith("?continuation-token=next%2Ftoken%3D&list-type=2&max-keys=1")
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.models.blob_metadata import BlobMetadata
+from app.services.blob_service import BlobService
+from app.services.tiering import TierMigrator
+from app.storage.local import LocalStorageBackend
+from app.storage.tiered import AccessTracker, TieredStorageBackend
+from app.utils.exceptions import BlobNotFoundError
+
+
+class ColdBackend(LocalStorageBackend):
+    @property
+    def name(self) -> str:
+        return "cold"
+
+
+@pytest.fixture
+def tiered(tmp_path):
+    hot = LocalStorageBackend(str(tmp_path / "hot"))
+    cold = ColdBackend(str(tmp_path / "cold"))
+    return TieredStorageBackend(hot, cold, AccessTracker())
+
+
+@pytest.mark.asyncio
+async def test_tiered_store_writes_hot_tier(tiered):
+    await tiered.store("blob", b"data")
+
+    assert await tiered.hot.exists("blob") is True
+    assert await tiered.cold.exists("blob") is False
+    assert tiered.name == "local"
+
+
+@pytest.mark.asyncio
+async def test_tiered_retrieve_falls_back_to_cold(tiered):
+    await tiered.cold.store("blob", b"cold data")
+
+    assert await tiered.retrieve("blob") == b"cold data"
+    assert await tiered.exists("blob") is True
+
+    with pytest.raises(BlobNotFoundError):
+        await tiered.retrieve("missing")
+
+
+@pytest.mark.asyncio
+async def test_migrator_demotes_idle_blobs(db_session, tiered):
+    service = BlobService(tiered, db_session)
+    metadata = await service.create_blob("idle", b"idle data")
+    metadata.created_at = datetime.now(timezone.utc) - timedelta(days=30)
+    await service.create_blob("fresh", b"fresh data")
+    await db_session.commit()
+
+    migrator = TierMigrator(tiered, db_session, demote_after=timedelta(days=7), hot_max_size=1024)
+    result = await migrator.run_once()
+
+    assert result["demoted"] == 1
+    assert await tiered.cold.exists("idle") is True
+    assert await tiered.hot.exists("idle") is False
+    assert (await db_session.get(BlobMetadata, "idle")).storage_backend == "cold"
+    assert (await db_session.get(BlobMetadata, "fresh")).storage_backend == "local"
+
+
+@pytest.mark.asyncio
+async def test_migrator_demotes_oversized_blobs(db_session, tiered):
+    service = BlobService(tiered, db_session)
+    await service.create_blob("large", b"x" * 100)
+
+    migrator = TierMigrator(tiered, db_session, hot_max_size=10)
+    result = await migrator.run_once()
+
+    assert result["demoted"] == 1
+    assert await tiered.retrieve("large") == b"x" * 100
+
+
+@pytest.mark.asyncio
+async def test_migrator_promotes_repeatedly_read_blobs(db_session, tiered):
+    await tiered.cold.store("popular", b"popular data")
+    db_session.add(BlobMetadata(id="popular", size=12, storage_backend="cold", storage_path="popular"))
+    await db_session.commit()
+
+    for _ in range(3):
+        await tiered.retrieve("popular")
+
+    migrator = TierMigrator(tiered, db_session, promote_after_reads=3, hot_max_size=1024)
+    result = await migrator.run_once()
+
+    assert result["promoted"] == 1
+    assert await tiered.hot.exists("popular") is True
+    assert await tiered.cold.exists("popular") is False
+    metadata = await db_session.get(BlobMetadata, "popular")
+    assert metadata.storage_backend == "local"
+    assert metadata.last_accessed_at is not None
@@ -0,0 +1,56 @@
+import base64
+import os
+
+import pytest
+
+from app.config import settings
+from app.utils.base64_validator import encode_base64_stream
+
+HEADERS = {"Authorization": f"Bearer {settings.api_token}"}
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 7, 1000])
+async def test_stream_encoding_matches_whole_encoding(chunk_size):
+    data = os.urandom(1001)
+    
+    encoded = b"".join([chunk async for chunk in encode_base64_stream(chunked(data, chunk_size))])
+    
+    assert encoded == base64.b64encode(data)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 2, 3, 1000, 1001])
+async def test_streamed_response_is_identical_to_buffered(client, tmp_path, monkeypatch, size):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "stream_chunk_size", 7)
+    data = os.urandom(size)
+    await client.post("/v1/blobs", json={"id": "big", "data": base64.b64encode(data).decode()}, headers=HEADERS)
+    
+    monkeypatch.setattr(settings, "stream_response_threshold", 0)
+    buffered = await client.get("/v1/blobs/big", headers=HEADERS)
+    monkeypatch.setattr(settings, "stream_response_threshold", 1)
+    streamed = await client.get("/v1/blobs/big", headers=HEADERS)
+    
+    assert streamed.status_code == 200
+    assert streamed.content == buffered.content
+    assert streamed.headers["content-length"] == buffered.headers["content-length"]
+    assert streamed.headers["etag"] == buffered.headers["etag"]
+    assert base64.b64decode(streamed.json()["data"]) == data
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_of_missing_object_is_404(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    monkeypatch.setattr(settings, "stream_response_threshold", 1)
+    await client.post("/v1/blobs", json={"id": "gone", "data": base64.b64encode(b"data").decode()}, headers=HEADERS)
+    os.remove(tmp_path / "gone")
+    
+    response = await client.get("/v1/blobs/gone", headers=HEADERS)
+    
+    assert response.status_code == 404
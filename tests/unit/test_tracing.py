@@ -0,0 +1,84 @@
+import base64
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import AsyncMock, patch
+
+from app.config import settings
+from app.main import app
+from app.storage.s3_compatible import S3CompatibleStorageBackend
+from app.utils.tracing import InMemorySpanExporter, TracingMiddleware, tracer
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    tracer.configure(exporter, sample_rate=1.0)
+    yield exporter
+    tracer.configure(None, sample_rate=0.0)
+
+
+@pytest.fixture
+async def traced_client(client):
+    async with AsyncClient(transport=ASGITransport(app=TracingMiddleware(app)), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_request_spans_share_trace(exporter, traced_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    payload = {"id": "traced-blob", "data": base64.b64encode(b"hello").decode()}
+    await traced_client.post("/v1/blobs", json=payload, headers=headers)
+    exporter.clear()
+    
+    response = await traced_client.get("/v1/blobs/traced-blob", headers=headers)
+    
+    assert response.status_code == 200
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["GET /v1/blobs/{blob_id}"]
+    assert root.parent_id is None
+    assert root.attributes["http.status_code"] == 200
+    for name in ("auth.verify_token", "metadata_lookup", "storage.local.retrieve", "base64_encode"):
+        assert spans[name].trace_id == root.trace_id
+        assert spans[name].parent_id == root.span_id
+
+
+@pytest.mark.asyncio
+async def test_incoming_traceparent_is_continued(exporter, traced_client):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    headers = {"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    
+    await traced_client.get("/", headers=headers)
+    
+    (root,) = exporter.spans
+    assert root.trace_id == trace_id
+    assert root.parent_id == "00f067aa0ba902b7"
+
+
+@pytest.mark.asyncio
+async def test_unsampled_request_records_nothing(exporter, traced_client):
+    tracer.sample_rate = 0.0
+    
+    await traced_client.get("/")
+    
+    assert len(exporter.spans) == 0
+
+
+@pytest.mark.asyncio
+async def test_trace_id_propagated_to_s3(exporter):
+    backend = S3CompatibleStorageBackend(
+        "https://s3.amazonaws.com",
+        "test-bucket",
+        "access-key",
+        "secret-key",
+    )
+    root = tracer.start_trace("test")
+    
+    with patch.object(backend.client, "head", new_callable=AsyncMock) as mock_head:
+        mock_head.return_value.status_code = 200
+        with tracer.activate(root):
+            await backend.exists("test-blob")
+    
+    sent = mock_head.call_args[1]["headers"]["traceparent"]
+    assert sent.startswith(f"00-{root.trace_id}-")
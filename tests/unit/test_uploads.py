@@ -0,0 +1,138 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.blob_data import BlobData
+from app.models.tenant_usage import TenantUsage
+from app.models.upload_session import UploadSession
+from app.services.uploads import UploadService
+from app.storage.database import DatabaseStorageBackend
+from app.storage.local import STAGING_DIR, LocalStorageBackend
+from app.storage.s3_compatible import S3CompatibleStorageBackend
+from app.utils.exceptions import InvalidUploadError
+
+HEADERS = {"Authorization": f"Bearer {settings.api_token}"}
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "upload_min_chunk_size", 1)
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "local_storage_path", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_parts_in_any_order_are_committed_in_place(client, local_storage, small_chunks):
+    response = await client.post("/v1/uploads", json={"id": "big", "size": 10, "chunk_size": 4}, headers=HEADERS)
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+    assert response.json()["parts"] == 3
+    
+    for number, chunk in ((2, b"89"), (0, b"0123")):
+        response = await client.put(f"/v1/uploads/{upload_id}/parts/{number}", content=chunk, headers=HEADERS)
+        assert response.status_code == 204
+    
+    state = (await client.get(f"/v1/uploads/{upload_id}", headers=HEADERS)).json()
+    assert state["received"] == [[0, 4], [8, 10]]
+    assert (await client.post(f"/v1/uploads/{upload_id}/complete", headers=HEADERS)).status_code == 400
+    
+    await client.put(f"/v1/uploads/{upload_id}/parts/1", content=b"4567", headers=HEADERS)
+    response = await client.post(f"/v1/uploads/{upload_id}/complete", headers=HEADERS)
+    
+    assert response.status_code == 201
+    assert response.json()["size"] == 10
+    blob = (await client.get("/v1/blobs/big", headers=HEADERS)).json()
+    assert base64.b64decode(blob["data"]) == b"0123456789"
+    assert list((local_storage / STAGING_DIR).iterdir()) == []
+    assert (await client.get(f"/v1/uploads/{upload_id}", headers=HEADERS)).status_code == 404
+    usage = (await client.get("/v1/usage", headers=HEADERS)).json()
+    assert (usage["bytes_used"], usage["blob_count"]) == (10, 1)
+
+
+@pytest.mark.asyncio
+async def test_part_of_wrong_size_is_rejected(client, local_storage, small_chunks):
+    response = await client.post("/v1/uploads", json={"id": "big", "size": 10, "chunk_size": 4}, headers=HEADERS)
+    upload_id = response.json()["upload_id"]
+    
+    response = await client.put(f"/v1/uploads/{upload_id}/parts/2", content=b"8", headers=HEADERS)
+    
+    assert response.status_code == 400
+    assert (await client.put(f"/v1/uploads/{upload_id}/parts/3", content=b"", headers=HEADERS)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_database_backend_stages_chunk_rows(db_session, small_chunks):
+    service = UploadService(DatabaseStorageBackend(db_session), db_session)
+    session = await service.create_session("acme/blob", 6, 4, "acme")
+    
+    await service.put_part(session.id, 1, b"ef", "acme")
+    await service.put_part(session.id, 0, b"abcd", "acme")
+    metadata = await service.commit(session.id, "acme")
+    
+    assert metadata.size == 6
+    ids = list(await db_session.scalars(select(BlobData.id)))
+    assert ids == ["acme/blob"]
+    assert (await db_session.get(BlobData, "acme/blob")).data == b"abcdef"
+    assert (await db_session.get(TenantUsage, "acme")).bytes_used == 6
+
+
+@pytest.mark.asyncio
+async def test_in_memory_assembly_is_size_limited(db_session, small_chunks, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "upload_max_in_memory_size", 8)
+    
+    with pytest.raises(InvalidUploadError):
+        await UploadService(DatabaseStorageBackend(db_session), db_session).create_session("blob", 9, 4)
+    
+    await UploadService(LocalStorageBackend(str(tmp_path)), db_session).create_session("blob", 9, 4)
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_uses_multipart_upload(db_session, small_chunks):
+    backend = S3CompatibleStorageBackend("https://s3.amazonaws.com", "test-bucket", "access-key", "secret-key")
+    created = MagicMock(
+        status_code=200,
+        content=b"<InitiateMultipartUploadResult><UploadId>up-1</UploadId></InitiateMultipartUploadResult>",
+    )
+    part = MagicMock(status_code=200, headers={"etag": '"etag-1"'})
+    completed = MagicMock(status_code=200, content=b"<CompleteMultipartUploadResult/>")
+    service = UploadService(backend, db_session)
+    
+    with patch.object(backend.client, "request", new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = [created, part, part, completed]
+        session = await service.create_session("blob", 6, 4)
+        await service.put_part(session.id, 1, b"ef")
+        await service.put_part(session.id, 0, b"abcd")
+        await service.commit(session.id)
+    
+    methods = [(call.args[0], call.args[1].split("?", 1)[1]) for call in mock_request.call_args_list]
+    assert methods == [
+        ("POST", "uploads="),
+        ("PUT", "partNumber=2&uploadId=up-1"),
+        ("PUT", "partNumber=1&uploadId=up-1"),
+        ("POST", "uploadId=up-1"),
+    ]
+    body = mock_request.call_args_list[-1].kwargs["content"].decode()
+    assert body.index("<PartNumber>1</PartNumber>") < body.index("<PartNumber>2</PartNumber>")
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_purged(db_session, tmp_path, small_chunks):
+    backend = LocalStorageBackend(str(tmp_path))
+    service = UploadService(backend, db_session)
+    session = await service.create_session("blob", 4, 4)
+    await service.put_part(session.id, 0, b"abcd")
+    session.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+    
+    assert await service.purge_expired() == 1
+    
+    assert await db_session.get(UploadSession, session.id) is None
+    assert list((tmp_path / STAGING_DIR).iterdir()) == []